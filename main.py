@@ -1,20 +1,26 @@
 import sys
 import os
 import json
+import threading
+import multiprocessing
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QStackedWidget, QFrame, QLabel
+    QPushButton, QStackedWidget, QFrame, QLabel, QMessageBox
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont, QGuiApplication, QIcon
 from widgets.order_entry_widget import OrderEntryWidget
-from models.db import create_db
+from models.db import warm_up_pool
+from sqlalchemy.exc import OperationalError
+from models.migrations import check_schema_version, SchemaVersionError
 from widgets.orders_db_widget import OrdersDBWidget
 from widgets.clients_db_widget import ClientsDBWidget
 from widgets.dashboard_widget import DashboardWidget
 from widgets.production_sort_dialog import ProductionSortDialog
-
-DONE_ORDERS_FILE = "done_orders_store.json"
+from widgets.change_listener import ChangeListener
+from widgets.connection_status import ConnectionStatusLabel
+from widgets.pdf_render_service import RenderProgressLabel, get_render_service
+from printing.pdf_cache import invalidate_orders
 
 BTN_SIDEBAR = {
     "dashboard": """
@@ -202,6 +208,12 @@ class MainWindow(QMainWindow):
         sidebar_layout.addWidget(self.btn_production_sort)
         sidebar_layout.addStretch(1)
 
+        self.render_progress = RenderProgressLabel()
+        sidebar_layout.addWidget(self.render_progress, alignment=Qt.AlignLeft | Qt.AlignBottom)
+
+        self.connection_status = ConnectionStatusLabel()
+        sidebar_layout.addWidget(self.connection_status, alignment=Qt.AlignLeft | Qt.AlignBottom)
+
         # DODAJ LEGENDĘ KOLORÓW NA DOLE, LEWA STRONA
         legend = create_color_legend()
         sidebar_layout.addWidget(legend, alignment=Qt.AlignLeft | Qt.AlignBottom)
@@ -216,7 +228,7 @@ class MainWindow(QMainWindow):
         self.pages.addWidget(self.clients_db)
         self.orders_db = OrdersDBWidget(
             order_entry_factory=lambda **kwargs: self.create_order_entry_widget(**kwargs),
-            refresh_dashboard_callback=self.dashboard.refresh_cards,
+            refresh_dashboard_callback=lambda: self.dashboard.request_refresh("orders_db"),
             show_order_entry_callback=self.show_order_entry
         )
         self.pages.addWidget(self.orders_db)
@@ -245,6 +257,34 @@ class MainWindow(QMainWindow):
 
         self.switch_page(0, self.btn_dashboard, "dashboard")
 
+        # Zmiany z innych stanowisk (LISTEN/NOTIFY) odświeżają tylko dotknięte wiersze i fiszki
+        self.change_listener = ChangeListener(self)
+        self.change_listener.changed.connect(self.apply_database_changes)
+        self.change_listener.connected_changed.connect(self.on_change_listener_connected)
+        self.change_listener.start()
+
+    def apply_database_changes(self, changes):
+        if changes["orders"]:
+            # Zamówienie zmienione na innym stanowisku - jego zapisane PDF-y są nieaktualne
+            invalidate_orders(changes["orders"])
+            self.dashboard.refresh_orders_by_id(changes["orders"])
+            self.orders_db.refresh_orders_by_id(changes["orders"])
+        if changes["clients"]:
+            self.clients_db.refresh_clients_by_id(changes["clients"])
+            # Nazwa klienta jest na fiszkach - sprawdzamy tablicę przez znacznik zmian
+            self.dashboard.request_refresh("clients_changed")
+
+    def on_change_listener_connected(self, connected):
+        self.dashboard.live_updates = connected
+        if connected:
+            # Zmiany sprzed nawiązania nasłuchu mogły umknąć
+            self.dashboard.request_refresh("listener_connected")
+
+    def closeEvent(self, event):
+        self.change_listener.stop()
+        get_render_service().shutdown()
+        super().closeEvent(event)
+
     def set_sidebar_active(self, active_btn, active_name):
         for btn, name in self.sidebar_buttons:
             if btn is active_btn:
@@ -273,7 +313,7 @@ class MainWindow(QMainWindow):
     def show_order_entry(self, edit_order=None, copy_order=None, after_save_callback=None, new_client=None):
         from PySide6.QtCore import QTimer
         def after_save():
-            self.dashboard.refresh_cards()
+            self.dashboard.request_refresh("save")
             QTimer.singleShot(0, lambda: self.switch_page(0, self.btn_dashboard, "dashboard"))
         widget = self.create_order_entry_widget(
             edit_order=edit_order,
@@ -302,8 +342,24 @@ class MainWindow(QMainWindow):
         dlg.exec()
 
 def main():
-    create_db()
+    # Połączenia z bazą otwierają się w tle, gdy budujemy okno
+    threading.Thread(target=warm_up_pool, name="db-warm-up", daemon=True).start()
     app = QApplication(sys.argv)
+    # Przy starcie tylko sprawdzamy wersję schematu; migracje: python -m models.migrations upgrade
+    try:
+        check_schema_version()
+    except SchemaVersionError as e:
+        QMessageBox.critical(None, "Baza danych", str(e))
+        sys.exit(1)
+    except OperationalError as e:
+        QMessageBox.critical(
+            None, "Baza danych",
+            f"Nie można połączyć się z bazą danych. Sprawdź sieć i ustawienia w config.ini.\n\n{e.orig}"
+        )
+        sys.exit(1)
+    # Jednorazowe przeniesienie starego pliku z zamówieniami "zrobionymi" do bazy
+    from widgets.done_orders_store import done_orders_store, DONE_ORDERS_FILE
+    imported = done_orders_store.import_file()
     main_window = MainWindow()
     screen = QGuiApplication.primaryScreen()
     if screen:
@@ -312,7 +368,14 @@ def main():
         main_window.showMaximized()
     else:
         main_window.showMaximized()
+    if imported is not None:
+        QMessageBox.information(
+            main_window, "Zamówienia zrobione",
+            f"Zaimportowano stan 'zrobione' dla {imported} zamówień z pliku {DONE_ORDERS_FILE}."
+        )
     sys.exit(app.exec())
 
 if __name__ == '__main__':
+    # Procesy generujące PDF (widgets/pdf_render_service.py) w wersji spakowanej do .exe
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,67 @@
+import json
+from sqlalchemy import text
+
+# Kanał, na którym baza ogłasza zmiany zamówień, pozycji i klientów
+CHANGES_CHANNEL = "etykiety_changes"
+
+NOTIFY_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION etykiety_notify_change() RETURNS trigger AS $$
+DECLARE
+    row_data RECORD;
+    changed_order_id INTEGER;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_data := OLD;
+    ELSE
+        row_data := NEW;
+    END IF;
+    IF TG_TABLE_NAME = 'order_items' THEN
+        changed_order_id := row_data.order_id;
+    ELSIF TG_TABLE_NAME = 'orders' THEN
+        changed_order_id := row_data.id;
+    END IF;
+    PERFORM pg_notify('{CHANGES_CHANNEL}', json_build_object(
+        'table', TG_TABLE_NAME,
+        'op', TG_OP,
+        'id', row_data.id,
+        'order_id', changed_order_id
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+NOTIFY_TABLES = ("orders", "order_items", "clients")
+
+def install_change_triggers(connection):
+    """
+    Zakłada (lub odtwarza) triggery NOTIFY na tabelach zamówień, pozycji i klientów.
+    Każda zmiana wiersza wysyła na kanał CHANGES_CHANNEL JSON z nazwą tabeli i id.
+    """
+    connection.execute(text(NOTIFY_FUNCTION_SQL))
+    for table in NOTIFY_TABLES:
+        trigger = f"{table}_notify_change"
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger} ON {table}"))
+        connection.execute(text(
+            f"CREATE TRIGGER {trigger} AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE PROCEDURE etykiety_notify_change()"
+        ))
+
+def group_notifications(payloads):
+    """
+    Zamienia listę payloadów NOTIFY na {"orders": {id, ...}, "clients": {id, ...}}.
+    Zmiana pozycji zamówienia jest traktowana jako zmiana samego zamówienia.
+    """
+    changes = {"orders": set(), "clients": set()}
+    for payload in payloads:
+        try:
+            data = json.loads(payload)
+        except (TypeError, ValueError):
+            continue
+        if data.get("table") in ("orders", "order_items"):
+            if data.get("order_id") is not None:
+                changes["orders"].add(data["order_id"])
+        elif data.get("table") == "clients":
+            if data.get("id") is not None:
+                changes["clients"].add(data["id"])
+    return changes
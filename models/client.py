@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, Sequence, func, select, text
 from sqlalchemy.orm import relationship
-from .db import Base, Session
+from .db import Base
 from sqlalchemy.event import listens_for
 
 CLIENT_NR_START = 567  # numeracja klientów zaczyna się od 000567
@@ -22,22 +22,66 @@ class Client(Base):
     delivery_street = Column(String)
     delivery_postal_code = Column(String)
     delivery_city = Column(String)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())  # znacznik zmian do odświeżania
     orders = relationship("Order", back_populates="client")
 
     __table_args__ = (
         UniqueConstraint('client_number', name='uq_client_number'),
     )
 
+# Numery klientów pochodzą z sekwencji w bazie - bez skanowania tabeli i bez wyścigu
+# między stanowiskami (nextval jest atomowe i nigdy nie zwraca dwa razy tej samej wartości)
+client_number_seq = Sequence("client_number_seq", start=CLIENT_NR_START, metadata=Base.metadata)
+
+# Ustawia sekwencję co najmniej na podaną wartość (i na największy istniejący numer),
+# żeby nextval nie zwrócił numeru, który jest już zajęty
+SYNC_CLIENT_NUMBER_SEQ_SQL = text("""
+    SELECT setval('client_number_seq', GREATEST(
+        (SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM client_number_seq),
+        (SELECT COALESCE(MAX(CAST(client_number AS INTEGER)), 0) FROM clients WHERE client_number ~ '^[0-9]+$'),
+        :floor
+    ), true)
+""")
+
+# To samo bez skanowania tabeli - po ręcznie wpisanym numerze
+BUMP_CLIENT_NUMBER_SEQ_SQL = text("""
+    SELECT setval('client_number_seq', GREATEST(
+        (SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM client_number_seq),
+        :number
+    ), true)
+""")
+
+def format_client_number(number):
+    return f"{number:06d}"
+
+def sync_client_number_seq(connection, floor=CLIENT_NR_START - 1):
+    connection.execute(SYNC_CLIENT_NUMBER_SEQ_SQL, {"floor": floor})
+
+def peek_next_client_number(session):
+    """
+    Podgląd numeru, który dostanie następny klient (bez rezerwowania go).
+    Tylko do wyświetlenia - właściwy numer nadaje sekwencja przy zapisie.
+    """
+    last_value, is_called = session.execute(text("SELECT last_value, is_called FROM client_number_seq")).one()
+    return format_client_number(last_value + 1 if is_called else last_value)
+
+def reserve_client_numbers(session, count):
+    """
+    Rezerwuje count numerów klientów naraz (np. do importu) w jednym zapytaniu.
+    Numery są unikalne; przy równoczesnym imporcie z innego stanowiska mogą nie być kolejne.
+    """
+    if count <= 0:
+        return []
+    numbers = session.execute(
+        text("SELECT nextval('client_number_seq') FROM generate_series(1, :count)"), {"count": count}
+    ).scalars().all()
+    return [format_client_number(number) for number in numbers]
+
 @listens_for(Client, "before_insert")
 def before_insert_client(mapper, connection, target):
-    # Automatyczne nadanie numeru klienta w formacie 000567, 000568, ...
-    session = Session()
-    try:
-        last = session.query(Client).order_by(Client.client_number.desc()).first()
-        if last and last.client_number and last.client_number.isdigit():
-            next_nr = max(int(last.client_number) + 1, CLIENT_NR_START)
-        else:
-            next_nr = CLIENT_NR_START
-        target.client_number = f"{next_nr:06d}"
-    finally:
-        session.close()
\ No newline at end of file
+    # Automatyczne nadanie numeru klienta w formacie 000567, 000568, ... w tej samej transakcji
+    if not target.client_number:
+        target.client_number = format_client_number(connection.execute(select(client_number_seq.next_value())).scalar())
+    elif target.client_number.isdigit():
+        # Numer wpisany ręcznie - przesuwamy sekwencję, żeby go później nie przydzieliła
+        connection.execute(BUMP_CLIENT_NUMBER_SEQ_SQL, {"number": int(target.client_number)})
\ No newline at end of file
@@ -0,0 +1,64 @@
+import os
+import socket
+import configparser
+
+# Ustawienia połączenia z bazą: najpierw wartości domyślne, potem plik config.ini
+# (sekcja [database]), na końcu zmienne środowiskowe ETYKIETY_DB_* - każde kolejne źródło nadpisuje poprzednie.
+CONFIG_FILE = os.environ.get(
+    "ETYKIETY_CONFIG",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.ini"),
+)
+
+DEFAULTS = {
+    "url": "postgresql+psycopg2://postgres@localhost:5432/etykiety_db",
+    "pool_size": 5,
+    "max_overflow": 5,
+    "pool_timeout": 10,          # s - czekanie na wolne połączenie z puli
+    "pool_recycle": 1800,        # s - starsze połączenia są otwierane na nowo
+    "pool_pre_ping": True,       # sprawdzenie połączenia przed użyciem (np. po restarcie serwera)
+    "connect_timeout": 5,        # s
+    "statement_timeout": 30000,  # ms, 0 = bez limitu
+    "application_name": "etykiety",
+    "warm_up_connections": 2,
+}
+
+def _convert(key, value):
+    default = DEFAULTS[key]
+    if isinstance(default, bool):
+        return str(value).strip().lower() in ("1", "true", "yes", "tak", "on")
+    if isinstance(default, int):
+        return int(value)
+    return value
+
+def load_db_config(config_file=CONFIG_FILE, environ=os.environ):
+    config = dict(DEFAULTS)
+    parser = configparser.ConfigParser()
+    if parser.read(config_file, encoding="utf-8") and parser.has_section("database"):
+        for key, value in parser.items("database"):
+            if key in DEFAULTS:
+                config[key] = _convert(key, value)
+    for key in DEFAULTS:
+        env_value = environ.get(f"ETYKIETY_DB_{key.upper()}")
+        if env_value is not None:
+            config[key] = _convert(key, env_value)
+    return config
+
+def connection_application_name(config):
+    """Nazwa widoczna w pg_stat_activity, np. "etykiety@BIURO-2" (limit Postgresa: 63 znaki)."""
+    return f"{config['application_name']}@{socket.gethostname()}"[:63]
+
+def engine_options(config):
+    """Argumenty create_engine dla danej konfiguracji."""
+    options = f"-c statement_timeout={config['statement_timeout']}"
+    return {
+        "pool_size": config["pool_size"],
+        "max_overflow": config["max_overflow"],
+        "pool_timeout": config["pool_timeout"],
+        "pool_recycle": config["pool_recycle"],
+        "pool_pre_ping": config["pool_pre_ping"],
+        "connect_args": {
+            "application_name": connection_application_name(config),
+            "connect_timeout": config["connect_timeout"],
+            "options": options,
+        },
+    }
\ No newline at end of file
@@ -0,0 +1,142 @@
+import sys
+import argparse
+import datetime
+import numpy as np
+from sqlalchemy import func
+from .db import Session
+from .order import Order
+from .orderitem import OrderItem
+
+# Zużycie materiału przez zamówienia: powierzchnia etykiet, długość taśmy i powierzchnia
+# materiału (taśma z naddatkiem na brzegach) w podziale na zamówienie / dzień / tydzień i materiał.
+# Raport z wiersza poleceń:
+#     python -m models.material_consumption --od 2025-03-03 --do 2025-03-09 --wg week
+#
+# Przyjęte uproszczenia: etykiety idą jednym rzędem, wysokość etykiety biegnie wzdłuż taśmy,
+# szerokość - w poprzek.
+
+LABEL_GAP_MM = 3.0      # odstęp między kolejnymi etykietami na taśmie
+SIDE_MARGIN_MM = 2.0    # naddatek materiału z każdej strony etykiety
+
+# Klucz okresu liczony w bazie - tydzień w tej samej postaci co w zestawieniu produkcji ("2025-T07")
+PERIODS = {
+    "order": lambda: Order.order_number,
+    "day": lambda: func.to_char(Order.delivery_date, "YYYY-MM-DD"),
+    "week": lambda: func.to_char(Order.delivery_date, 'IYYY-"T"IW'),
+}
+PERIOD_LABELS = {"order": "Zamówienie", "day": "Dzień", "week": "Tydzień"}
+CONSUMPTION_COLUMNS = ["Etykiety [szt.]", "Pow. etykiet [m²]", "Taśma [mb]", "Materiał [m²]"]
+_KEY_SEPARATOR = "\x1f"
+
+def load_item_arrays(session, start_date=None, end_date=None, period="week"):
+    """
+    Pozycje zamówień z podanego zakresu dat dostawy jako tablice NumPy
+    (jedno zapytanie, same kolumny - bez obiektów ORM). Puste liczby to NaN.
+    """
+    query = (
+        session.query(
+            PERIODS[period](), OrderItem.material, OrderItem.quantity_type,
+            OrderItem.width, OrderItem.height, OrderItem.ordered_quantity, OrderItem.roll_length,
+        )
+        .join(OrderItem, Order.id == OrderItem.order_id)
+        .filter(Order.delivery_date.isnot(None))
+    )
+    if start_date:
+        query = query.filter(Order.delivery_date >= start_date)
+    if end_date:
+        query = query.filter(Order.delivery_date <= end_date)
+    rows = query.all()
+    columns = list(zip(*rows)) if rows else [()] * 7
+
+    def numbers(values):
+        return np.array([np.nan if value is None else float(value) for value in values], dtype=float)
+
+    return {
+        "period": np.array([value or "" for value in columns[0]], dtype=str),
+        "material": np.array([value or "" for value in columns[1]], dtype=str),
+        "quantity_type": np.array([(value or "").lower() for value in columns[2]], dtype=str),
+        "width": numbers(columns[3]),
+        "height": numbers(columns[4]),
+        "quantity": numbers(columns[5]),
+        "roll_length": numbers(columns[6]),
+    }
+
+def compute_consumption(items, gap_mm=LABEL_GAP_MM, margin_mm=SIDE_MARGIN_MM):
+    """
+    Zużycie dla każdej pozycji naraz (działania na całych tablicach). Typ ilości
+    "rolek" to rolki * nawój etykiet, każdy inny to tysiące etykiet - jak w zestawieniu
+    produkcji. Pozycje bez wymiarów lub ilości liczą się jako 0.
+    Zwraca słownik tablic: labels, label_area_m2, web_length_m, material_area_m2.
+    """
+    quantity = np.nan_to_num(items["quantity"])
+    is_rolls = np.char.startswith(items["quantity_type"], "rol")
+    labels = np.where(is_rolls, quantity * np.nan_to_num(items["roll_length"]), quantity * 1000.0)
+    width = np.nan_to_num(items["width"])
+    height = np.nan_to_num(items["height"])
+    has_size = (width > 0) & (height > 0)
+    labels_with_size = np.where(has_size, labels, 0.0)
+    web_length_m = labels_with_size * (height + gap_mm) / 1000.0
+    return {
+        "labels": labels,
+        "label_area_m2": labels_with_size * width * height / 1e6,
+        "web_length_m": web_length_m,
+        "material_area_m2": web_length_m * (width + 2 * margin_mm) / 1000.0,
+    }
+
+def aggregate_consumption(items, consumption):
+    """
+    Sumy zużycia dla (okres, materiał). Zwraca posortowane wiersze
+    (okres, materiał, etykiety, pow. etykiet m², taśma mb, materiał m²).
+    """
+    if not len(items["period"]):
+        return []
+    keys = np.char.add(np.char.add(items["period"], _KEY_SEPARATOR), items["material"])
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    sums = [
+        np.bincount(inverse, weights=consumption[name], minlength=len(unique_keys))
+        for name in ("labels", "label_area_m2", "web_length_m", "material_area_m2")
+    ]
+    result = []
+    for index, key in enumerate(unique_keys):
+        period, material = str(key).split(_KEY_SEPARATOR, 1)
+        result.append((period, material) + tuple(float(values[index]) for values in sums))
+    return result
+
+def material_consumption(session, start_date=None, end_date=None, period="week",
+                         gap_mm=LABEL_GAP_MM, margin_mm=SIDE_MARGIN_MM):
+    """Zużycie materiału w zakresie dat w podziale na okres ("order", "day", "week") i materiał."""
+    items = load_item_arrays(session, start_date, end_date, period)
+    return aggregate_consumption(items, compute_consumption(items, gap_mm, margin_mm))
+
+def format_report(rows, period="week"):
+    header = [PERIOD_LABELS[period], "Materiał"] + CONSUMPTION_COLUMNS
+    lines = [header] + [
+        [period_key, material, f"{labels:,.0f}".replace(",", " ")]
+        + [f"{value:,.2f}".replace(",", " ").replace(".", ",") for value in values]
+        for period_key, material, labels, *values in rows
+    ]
+    widths = [max(len(line[column]) for line in lines) for column in range(len(header))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) if column < 2 else cell.rjust(width)
+                  for column, (cell, width) in enumerate(zip(line, widths)))
+        for line in lines
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zużycie materiału przez zamówienia")
+    parser.add_argument("--od", dest="start_date", type=datetime.date.fromisoformat, help="data dostawy od (RRRR-MM-DD)")
+    parser.add_argument("--do", dest="end_date", type=datetime.date.fromisoformat, help="data dostawy do (RRRR-MM-DD)")
+    parser.add_argument("--wg", dest="period", choices=sorted(PERIODS), default="week", help="podział: zamówienie, dzień, tydzień")
+    parser.add_argument("--odstep", dest="gap_mm", type=float, default=LABEL_GAP_MM, help="odstęp między etykietami [mm]")
+    parser.add_argument("--naddatek", dest="margin_mm", type=float, default=SIDE_MARGIN_MM, help="naddatek z każdej strony [mm]")
+    args = parser.parse_args(argv)
+    session = Session()
+    try:
+        rows = material_consumption(session, args.start_date, args.end_date, args.period, args.gap_mm, args.margin_mm)
+    finally:
+        session.close()
+    print(format_report(rows, args.period))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
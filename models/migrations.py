@@ -0,0 +1,239 @@
+import sys
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from .db import engine
+
+# Wersja schematu trzymana w bazie w jednym wierszu tabeli schema_version.
+# Aplikacja przy starcie tylko ją odczytuje; migracje uruchamia się ręcznie:
+#     python -m models.migrations upgrade
+#     python -m models.migrations status
+
+# Stała blokada (pg_advisory_xact_lock) - dwa stanowiska nie migrują bazy jednocześnie
+MIGRATION_LOCK_ID = 4211
+
+# Migracja 1 to zamrożony schemat z chwili wprowadzenia wersjonowania - nie zależy od
+# bieżących modeli. Każda późniejsza zmiana schematu to osobna, numerowana migracja.
+BASE_SCHEMA_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS clients (
+        id SERIAL PRIMARY KEY,
+        client_number VARCHAR(6),
+        name VARCHAR,
+        short_name VARCHAR,
+        contact_person VARCHAR,
+        phone VARCHAR,
+        email VARCHAR,
+        street VARCHAR,
+        postal_code VARCHAR,
+        city VARCHAR,
+        nip VARCHAR,
+        delivery_company VARCHAR,
+        delivery_street VARCHAR,
+        delivery_postal_code VARCHAR,
+        delivery_city VARCHAR,
+        updated_at TIMESTAMP WITHOUT TIME ZONE,
+        CONSTRAINT uq_client_number UNIQUE (client_number)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS orders (
+        id SERIAL PRIMARY KEY,
+        order_number VARCHAR,
+        order_date DATE,
+        delivery_date DATE,
+        client_id INTEGER REFERENCES clients (id),
+        notes TEXT,
+        payment_term VARCHAR,
+        updated_at TIMESTAMP WITHOUT TIME ZONE,
+        is_done BOOLEAN DEFAULT false NOT NULL,
+        done_at TIMESTAMP WITHOUT TIME ZONE,
+        done_by VARCHAR
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS order_items (
+        id SERIAL PRIMARY KEY,
+        order_id INTEGER REFERENCES orders (id),
+        width NUMERIC(10, 2),
+        height NUMERIC(10, 2),
+        material VARCHAR,
+        ordered_quantity NUMERIC(14, 3),
+        quantity_type VARCHAR,
+        roll_length NUMERIC(12, 2),
+        core VARCHAR,
+        price NUMERIC(12, 4),
+        price_type VARCHAR,
+        zam_rolki INTEGER
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS order_sequence (
+        id SERIAL PRIMARY KEY,
+        last_number INTEGER NOT NULL
+    )
+    """,
+)
+
+# Kolumny, których może brakować w bazach sprzed wersjonowania (zakładanych przez create_all).
+# Tekstowe kolumny liczbowe pozycji w takich bazach zamienia dopiero migracja 3.
+BASE_SCHEMA_COLUMNS = (
+    ("clients", "short_name", "VARCHAR"),
+    ("clients", "updated_at", "TIMESTAMP WITHOUT TIME ZONE"),
+    ("orders", "payment_term", "VARCHAR"),
+    ("orders", "updated_at", "TIMESTAMP WITHOUT TIME ZONE"),
+    ("orders", "is_done", "BOOLEAN DEFAULT false NOT NULL"),
+    ("orders", "done_at", "TIMESTAMP WITHOUT TIME ZONE"),
+    ("orders", "done_by", "VARCHAR"),
+    ("order_items", "price", "NUMERIC(12, 4)"),
+    ("order_items", "price_type", "VARCHAR"),
+    ("order_items", "zam_rolki", "INTEGER"),
+)
+
+BASE_SCHEMA_INDEXES = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_clients_client_number ON clients (client_number)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_orders_order_number ON orders (order_number)",
+    "CREATE INDEX IF NOT EXISTS ix_orders_delivery_date ON orders (delivery_date)",
+    "CREATE INDEX IF NOT EXISTS ix_orders_client_id ON orders (client_id)",
+    "CREATE INDEX IF NOT EXISTS ix_orders_is_done ON orders (is_done)",
+    "CREATE INDEX IF NOT EXISTS ix_orders_order_number_seq "
+    "ON orders (CAST(substring(order_number, '^[0-9]+') AS INTEGER))",
+    "CREATE INDEX IF NOT EXISTS ix_order_items_order_id ON order_items (order_id)",
+)
+
+def migration_001_base_schema(connection):
+    """Tabele, brakujące kolumny (np. payment_term, zam_rolki, updated_at, is_done) i indeksy."""
+    for statement in BASE_SCHEMA_TABLES:
+        connection.execute(text(statement))
+    for table, column, column_type in BASE_SCHEMA_COLUMNS:
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {column_type}"))
+    for statement in BASE_SCHEMA_INDEXES:
+        connection.execute(text(statement))
+
+def migration_002_client_number_seq(connection):
+    """Sekwencja numerów klientów ustawiona za największym istniejącym numerem."""
+    from .client import client_number_seq, sync_client_number_seq
+    client_number_seq.create(connection, checkfirst=True)
+    sync_client_number_seq(connection)
+
+def migration_003_numeric_order_items(connection):
+    """Tekstowe wymiary / ilości / ceny pozycji zamienione na kolumny liczbowe."""
+    from .numeric_migration import migrate_order_items_to_numeric, print_report
+    print_report(migrate_order_items_to_numeric(connection))
+
+def migration_004_change_notifications(connection):
+    """Triggery NOTIFY na zamówieniach, pozycjach i klientach."""
+    from .change_notifications import install_change_triggers
+    install_change_triggers(connection)
+
+PRODUCTION_SUMMARY_TABLE = (
+    """
+    CREATE TABLE IF NOT EXISTS production_summary (
+        id SERIAL PRIMARY KEY,
+        iso_year INTEGER NOT NULL,
+        iso_week INTEGER NOT NULL,
+        material VARCHAR,
+        width NUMERIC(10, 2),
+        height NUMERIC(10, 2),
+        quantity NUMERIC NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_production_summary_week ON production_summary (iso_year, iso_week)",
+)
+
+def migration_005_production_summary(connection):
+    """Tabela production_summary z zestawieniem produkcji, wypełniona z istniejących zamówień."""
+    from .production_summary import rebuild_summary
+    for statement in PRODUCTION_SUMMARY_TABLE:
+        connection.execute(text(statement))
+    rebuild_summary(connection)
+
+def migration_006_single_order_sequence_row(connection):
+    """Licznik numerów zamówień zebrany w jeden wiersz o stałym id, za największym numerem zamówienia."""
+    from .order_sequence import sync_order_sequence
+    sync_order_sequence(connection)
+
+# Kolejność ma znaczenie; nowe migracje dopisujemy wyłącznie na końcu
+MIGRATIONS = [
+    migration_001_base_schema,
+    migration_002_client_number_seq,
+    migration_003_numeric_order_items,
+    migration_004_change_notifications,
+    migration_005_production_summary,
+    migration_006_single_order_sequence_row,
+]
+LATEST_VERSION = len(MIGRATIONS)
+
+class SchemaVersionError(Exception):
+    def __init__(self, current, latest):
+        self.current = current
+        self.latest = latest
+        if current is None or current < latest:
+            message = (
+                f"Baza danych wymaga aktualizacji (wersja {current or 0}, wymagana {latest}).\n"
+                f"Uruchom: python -m models.migrations upgrade"
+            )
+        else:
+            message = (
+                f"Baza danych ma nowszą wersję schematu ({current}) niż ta wersja programu ({latest}).\n"
+                f"Zaktualizuj program."
+            )
+        super().__init__(message)
+
+def get_schema_version(engine=engine):
+    """Wersja schematu zapisana w bazie albo None, jeśli baza nie była jeszcze migrowana."""
+    with engine.connect() as connection:
+        try:
+            return connection.execute(text("SELECT version FROM schema_version")).scalar()
+        except ProgrammingError:
+            # Brak tabeli schema_version - baza sprzed migracji
+            return None
+
+def check_schema_version(engine=engine):
+    """Szybkie sprawdzenie przy starcie - jedno zapytanie. Rzuca SchemaVersionError."""
+    current = get_schema_version(engine)
+    if current != LATEST_VERSION:
+        raise SchemaVersionError(current, LATEST_VERSION)
+    return current
+
+def upgrade(engine=engine, target=LATEST_VERSION):
+    """
+    Wykonuje brakujące migracje po kolei. Każda migracja idzie w osobnej transakcji
+    razem z podbiciem numeru wersji, więc przerwana aktualizacja nie zostawia bazy
+    w połowie kroku. Zwraca listę wykonanych migracji.
+    """
+    applied = []
+    for version in range(1, target + 1):
+        with engine.begin() as connection:
+            # Migracje danych mogą trwać dłużej niż zwykły limit zapytań z config.ini;
+            # bez limitu także czekanie na blokadę, gdy migruje inne stanowisko
+            connection.execute(text("SET LOCAL statement_timeout = 0"))
+            connection.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+            connection.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+            current = connection.execute(text("SELECT version FROM schema_version")).scalar()
+            if current is None:
+                connection.execute(text("INSERT INTO schema_version (version) VALUES (0)"))
+                current = 0
+            if current >= version:
+                continue
+            migration = MIGRATIONS[version - 1]
+            print(f"Migracja {version}: {migration.__doc__}")
+            migration(connection)
+            connection.execute(text("UPDATE schema_version SET version = :version"), {"version": version})
+            applied.append(migration.__name__)
+    return applied
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "status"
+    if command == "upgrade":
+        applied = upgrade()
+        print(f"Wykonano migracji: {len(applied)}. Wersja schematu: {get_schema_version()}")
+    elif command == "status":
+        print(f"Wersja schematu w bazie: {get_schema_version()}, wymagana: {LATEST_VERSION}")
+    else:
+        print("Użycie: python -m models.migrations [upgrade|status]")
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,63 @@
+from decimal import Decimal
+from sqlalchemy import inspect, text, String
+from .orderitem import OrderItem, NUMERIC_ITEM_COLUMNS, INTEGER_ITEM_COLUMNS
+from utils.numbers import parse_decimal, parse_int
+
+# Kopia pozycji sprzed zmiany typów - zostaje w bazie, żeby nic nie przepadło
+BACKUP_TABLE = "order_items_text_backup"
+MIGRATED_COLUMNS = NUMERIC_ITEM_COLUMNS + INTEGER_ITEM_COLUMNS
+
+def needs_numeric_migration(connection):
+    columns = {column["name"]: column["type"] for column in inspect(connection).get_columns("order_items")}
+    return any(isinstance(columns.get(name), String) for name in MIGRATED_COLUMNS)
+
+def _parse_for_column(column_name, raw):
+    column_type = OrderItem.__table__.c[column_name].type
+    if column_name in INTEGER_ITEM_COLUMNS:
+        return parse_int(raw)
+    value = parse_decimal(raw)
+    if value is None:
+        return None
+    # Wartość musi zmieścić się w NUMERIC(precision, scale) kolumny
+    value = value.quantize(Decimal(1).scaleb(-column_type.scale))
+    if abs(value) >= Decimal(10) ** (column_type.precision - column_type.scale):
+        raise ValueError(f"Liczba poza zakresem kolumny: {raw!r}")
+    return value
+
+def migrate_order_items_to_numeric(connection):
+    """
+    Zamienia tekstowe kolumny wymiarów, ilości i cen w order_items na liczbowe.
+    Istniejące napisy są parsowane ("12,5", "10 000", "100 m"); nieczytelne wartości
+    stają się NULL i są zwracane jako lista (id pozycji, id zamówienia, kolumna, wartość).
+    Wołane w transakcji migracji, a oryginalne dane zostają w tabeli BACKUP_TABLE.
+    """
+    problems = []
+    if not needs_numeric_migration(connection):
+        return problems
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {BACKUP_TABLE} AS SELECT * FROM order_items"))
+    columns_sql = ", ".join(MIGRATED_COLUMNS)
+    rows = connection.execute(text(f"SELECT id, order_id, {columns_sql} FROM order_items")).mappings().all()
+    parsed = []
+    for row in rows:
+        values = {"id": row["id"]}
+        for column_name in MIGRATED_COLUMNS:
+            try:
+                values[column_name] = _parse_for_column(column_name, row[column_name])
+            except ValueError:
+                values[column_name] = None
+                problems.append((row["id"], row["order_id"], column_name, row[column_name]))
+        parsed.append(values)
+    for column_name in MIGRATED_COLUMNS:
+        column_type = OrderItem.__table__.c[column_name].type.compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE order_items ALTER COLUMN {column_name} TYPE {column_type} USING NULL"))
+    if parsed:
+        assignments = ", ".join(f"{name} = :{name}" for name in MIGRATED_COLUMNS)
+        connection.execute(text(f"UPDATE order_items SET {assignments} WHERE id = :id"), parsed)
+    return problems
+
+def print_report(problems):
+    if not problems:
+        return
+    print(f"Pozycje zamówień z nieczytelnymi liczbami ({len(problems)}), oryginały w tabeli {BACKUP_TABLE}:")
+    for item_id, order_id, column_name, raw in problems:
+        print(f"  pozycja {item_id} (zamówienie {order_id}): {column_name} = {raw!r}")
\ No newline at end of file
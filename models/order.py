@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Text, Index, cast, func, false
 from sqlalchemy.orm import relationship
 from .db import Base
 
@@ -7,9 +7,19 @@ class Order(Base):
     id = Column(Integer, primary_key=True)
     order_number = Column(String, unique=True, index=True)
     order_date = Column(Date)
-    delivery_date = Column(Date)
-    client_id = Column(Integer, ForeignKey("clients.id"))
+    delivery_date = Column(Date, index=True)
+    client_id = Column(Integer, ForeignKey("clients.id"), index=True)
     notes = Column(Text)
     payment_term = Column(String)  # Dodane pole na termin płatności
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())  # znacznik zmian do odświeżania
+    # Stan "zrobione" (zdjęte z tablicy) - wspólny dla wszystkich stanowisk
+    is_done = Column(Boolean, default=False, server_default=false(), nullable=False, index=True)
+    done_at = Column(DateTime)
+    done_by = Column(String)
     client = relationship("Client", back_populates="orders")
-    items = relationship("OrderItem", back_populates="order")
\ No newline at end of file
+    items = relationship("OrderItem", back_populates="order", order_by="OrderItem.id")
+
+# Część liczbowa numeru "000567/TER" - do sortowania numerycznego po stronie bazy.
+# Indeks funkcyjny musi mieć dokładnie to samo wyrażenie, żeby Postgres go użył.
+order_number_seq = cast(func.substring(Order.__table__.c.order_number, "^[0-9]+"), Integer)
+Index("ix_orders_order_number_seq", order_number_seq)
@@ -1,45 +1,99 @@
-from sqlalchemy import Column, Integer
-from .db import Base, Session
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy import Column, Integer, update, func, text
+from .db import Base
 
 ORDER_NR_START = 567   # numeracja zamówień zaczyna się od 000567
+SEQUENCE_ROW_ID = 1    # licznik jest zawsze w jednym wierszu o tym id
 
 class OrderSequence(Base):
     __tablename__ = "order_sequence"
     id = Column(Integer, primary_key=True)
     last_number = Column(Integer, nullable=False, default=ORDER_NR_START - 1)
 
+def format_order_number(number):
+    return f"{number:06d}/TER"
+
+# Wartość licznika nie mniejsza niż żaden istniejący wiersz licznika ani numer zamówienia
+# (starsze bazy miały wiersz licznika o dowolnym id nadanym przez autoincrement)
+ORDER_SEQUENCE_FLOOR_SQL = text("""
+    SELECT GREATEST(
+        (SELECT COALESCE(MAX(last_number), 0) FROM order_sequence),
+        (SELECT COALESCE(MAX(CAST(split_part(order_number, '/', 1) AS INTEGER)), 0)
+         FROM orders WHERE order_number ~ '^[0-9]+/'),
+        :floor
+    )
+""")
+
+def sync_order_sequence(connection, floor=ORDER_NR_START - 1):
+    """
+    Zostawia jeden wiersz licznika o id SEQUENCE_ROW_ID, ustawiony za największym
+    numerem z dotychczasowych wierszy licznika i z zamówień.
+    """
+    connection.execute(text("LOCK TABLE order_sequence IN EXCLUSIVE MODE"))
+    last = connection.execute(ORDER_SEQUENCE_FLOOR_SQL, {"floor": floor}).scalar()
+    connection.execute(text("DELETE FROM order_sequence"))
+    connection.execute(
+        text("INSERT INTO order_sequence (id, last_number) VALUES (:id, :last)"),
+        {"id": SEQUENCE_ROW_ID, "last": last},
+    )
+
+def ensure_sequence_row(session):
+    """
+    Zakłada wiersz licznika, jeśli go nie ma (bezpieczne przy równoczesnym wywołaniu).
+    Nowy wiersz startuje za największym istniejącym numerem zamówienia.
+    """
+    session.execute(
+        text(
+            "INSERT INTO order_sequence (id, last_number) "
+            f"SELECT :id, ({ORDER_SEQUENCE_FLOOR_SQL.text}) "
+            "ON CONFLICT (id) DO NOTHING"
+        ),
+        {"id": SEQUENCE_ROW_ID, "floor": ORDER_NR_START - 1},
+    )
+
+def reserve_order_numbers(session, count):
+    """
+    Rezerwuje count kolejnych numerów zamówień jednym poleceniem UPDATE ... RETURNING.
+    UPDATE blokuje wiersz licznika do końca transakcji wywołującego, więc dwa stanowiska
+    nie dostaną tego samego numeru. Funkcja niczego nie zatwierdza - numery przepadają
+    razem z wycofaną transakcją, a utrwalają się razem z zapisem zamówień.
+    """
+    if count <= 0:
+        return []
+    statement = (
+        update(OrderSequence)
+        .where(OrderSequence.id == SEQUENCE_ROW_ID)
+        .values(last_number=OrderSequence.last_number + count)
+        .returning(OrderSequence.last_number)
+    )
+    last = session.execute(statement).scalar()
+    if last is None:
+        ensure_sequence_row(session)
+        last = session.execute(statement).scalar()
+    return [format_order_number(number) for number in range(last - count + 1, last + 1)]
+
 def get_next_order_number(session):
     """
     Zwraca kolejny unikalny numer zamówienia w formacie 000567/TER.
     Numer nigdy się nie powtórzy ani nie zmniejszy nawet po usunięciu zamówienia.
+    Numer jest przydzielany w transakcji wywołującego - zatwierdza go dopiero jego commit.
     """
-    try:
-        seq = session.query(OrderSequence).one()
-    except NoResultFound:
-        seq = OrderSequence(last_number=ORDER_NR_START - 1)
-        session.add(seq)
-        session.commit()
-    seq.last_number += 1
-    session.commit()
-    return f"{seq.last_number:06d}/TER"
+    return reserve_order_numbers(session, 1)[0]
 
 def set_last_order_number(session, order_number):
     """
     Ustawia ostatni numer zamówienia na podstawie numeru w formacie 000567/TER.
     Dzięki temu można nadpisać licznik jeżeli zamówienie było anulowane przed zapisem.
-    Funkcja wyciąga liczbę z numeru (przed ukośnikiem).
+    Funkcja wyciąga liczbę z numeru (przed ukośnikiem). Licznik nigdy się nie cofa.
     """
     try:
         num = int(order_number.split('/')[0])
     except Exception:
         return
-    try:
-        seq = session.query(OrderSequence).one()
-    except NoResultFound:
-        seq = OrderSequence(last_number=ORDER_NR_START - 1)
-        session.add(seq)
-        session.commit()
-    if num > seq.last_number:
-        seq.last_number = num
-        session.commit()
\ No newline at end of file
+    statement = (
+        update(OrderSequence)
+        .where(OrderSequence.id == SEQUENCE_ROW_ID)
+        .values(last_number=func.greatest(OrderSequence.last_number, num))
+    )
+    if session.execute(statement).rowcount == 0:
+        ensure_sequence_row(session)
+        session.execute(statement)
\ No newline at end of file
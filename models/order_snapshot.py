@@ -0,0 +1,185 @@
+from types import SimpleNamespace
+from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import joinedload, selectinload
+from .db import Session
+from .client import Client
+from .order import Order, order_number_seq
+from .orderitem import OrderItem
+from utils.numbers import parse_decimal
+
+# Pola kopiowane do "migawek" - nazwy takie same jak w modelach ORM,
+# dzięki czemu widoki i wydruki mogą używać migawki zamiast obiektu z bazy.
+ORDER_FIELDS = (
+    "id", "order_number", "order_date", "delivery_date", "client_id", "notes", "payment_term",
+    "is_done", "done_at", "done_by",
+)
+CLIENT_FIELDS = (
+    "id", "client_number", "name", "short_name", "contact_person", "phone", "email",
+    "street", "postal_code", "city", "nip", "delivery_company", "delivery_street",
+    "delivery_postal_code", "delivery_city",
+)
+ITEM_FIELDS = (
+    "id", "order_id", "width", "height", "material", "ordered_quantity", "quantity_type",
+    "roll_length", "core", "price", "price_type", "zam_rolki",
+)
+
+def _copy_fields(obj, fields):
+    return SimpleNamespace(**{field: getattr(obj, field, None) for field in fields})
+
+def snapshot_order(order):
+    """
+    Zamienia zamówienie ORM (z załadowanym klientem i pozycjami) na zwykły obiekt
+    niezależny od sesji - można go bezpiecznie trzymać po zamknięciu sesji.
+    """
+    snapshot = _copy_fields(order, ORDER_FIELDS)
+    snapshot.client = _copy_fields(order.client, CLIENT_FIELDS) if order.client else None
+    snapshot.items = [_copy_fields(item, ITEM_FIELDS) for item in order.items]
+    return snapshot
+
+def query_orders(session):
+    """
+    Zapytanie o zamówienia razem z klientem (JOIN) i pozycjami (jedno zapytanie IN),
+    czyli stała liczba zapytań niezależnie od liczby zamówień.
+    """
+    return session.query(Order).options(
+        joinedload(Order.client),
+        selectinload(Order.items),
+    )
+
+def _like(text):
+    return f"%{text.strip()}%"
+
+def apply_order_filters(query, filters):
+    """
+    Nakłada filtry przeglądarki zamówień jako warunki WHERE.
+    filters: słownik z kluczami client, date_from, date_to, material, width, height, notes
+    (puste wartości są pomijane).
+    """
+    if not filters:
+        return query
+    client = filters.get("client")
+    if client:
+        query = query.filter(Order.client.has(or_(
+            Client.name.ilike(_like(client)),
+            Client.short_name.ilike(_like(client)),
+            Client.client_number.ilike(_like(client)),
+        )))
+    if filters.get("date_from"):
+        query = query.filter(Order.delivery_date >= filters["date_from"])
+    if filters.get("date_to"):
+        query = query.filter(Order.delivery_date <= filters["date_to"])
+    # Materiał i wymiary muszą pasować do tej samej pozycji zamówienia
+    item_conditions = []
+    if filters.get("material"):
+        item_conditions.append(OrderItem.material.ilike(_like(filters["material"])))
+    for key in ("width", "height"):
+        try:
+            value = parse_decimal(filters.get(key))
+        except ValueError:
+            value = None
+        if value is not None:
+            item_conditions.append(getattr(OrderItem, key) == value)
+    if item_conditions:
+        query = query.filter(Order.items.any(and_(*item_conditions)))
+    if filters.get("notes"):
+        query = query.filter(Order.notes.ilike(_like(filters["notes"])))
+    return query
+
+def _sort_columns(sort_key):
+    if sort_key == "order_number":
+        return [order_number_seq, Order.order_number]
+    if sort_key in ("client", "phone", "city"):
+        return [{"client": Client.name, "phone": Client.phone, "city": Client.city}[sort_key]]
+    return [getattr(Order, sort_key)]
+
+def apply_order_sort(query, sort_key="order_number", descending=False):
+    if sort_key in ("client", "phone", "city"):
+        query = query.outerjoin(Client, Order.client_id == Client.id)
+    columns = _sort_columns(sort_key)
+    if descending:
+        columns = [column.desc() for column in columns] + [Order.id.desc()]
+    else:
+        columns = [column.asc() for column in columns] + [Order.id.asc()]
+    return query.order_by(*columns)
+
+def load_order_snapshots(session=None, start_date=None, end_date=None, order_ids=None,
+                         filters=None, sort_key="order_number", descending=False, limit=None, offset=0,
+                         done=None):
+    """
+    Zwraca listę migawek zamówień. Zakres dat wysyłki, lista id,
+    stan "zrobione" (done=True/False), filtry i sortowanie są realizowane w SQL,
+    a limit/offset pozwalają pobierać dane stronami.
+    """
+    own_session = session is None
+    if own_session:
+        session = Session()
+    try:
+        query = query_orders(session)
+        if start_date:
+            query = query.filter(Order.delivery_date >= start_date)
+        if end_date:
+            query = query.filter(Order.delivery_date <= end_date)
+        if order_ids is not None:
+            query = query.filter(Order.id.in_(list(order_ids)))
+        if done is not None:
+            query = query.filter(Order.is_done == done)
+        query = apply_order_filters(query, filters)
+        query = apply_order_sort(query, sort_key, descending)
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        return [snapshot_order(order) for order in query.all()]
+    finally:
+        if own_session:
+            session.close()
+
+def count_orders(filters=None, session=None):
+    own_session = session is None
+    if own_session:
+        session = Session()
+    try:
+        return apply_order_filters(session.query(Order.id), filters).count()
+    finally:
+        if own_session:
+            session.close()
+
+def load_order_snapshot(order_id, session=None):
+    """Migawka pojedynczego zamówienia albo None, jeśli zamówienie nie istnieje."""
+    snapshots = load_order_snapshots(session, order_ids=[order_id])
+    return snapshots[0] if snapshots else None
+
+def load_client_snapshots(session=None, search_field=None, search_text="", client_ids=None):
+    """
+    Migawki klientów posortowane po numerze, opcjonalnie filtrowane (ILIKE) po jednym polu
+    i/lub ograniczone do podanych id.
+    """
+    own_session = session is None
+    if own_session:
+        session = Session()
+    try:
+        query = session.query(Client).order_by(Client.client_number.asc())
+        if search_field and search_text:
+            query = query.filter(getattr(Client, search_field).ilike(_like(search_text.lower())))
+        if client_ids is not None:
+            query = query.filter(Client.id.in_(list(client_ids)))
+        return [_copy_fields(client, CLIENT_FIELDS) for client in query.all()]
+    finally:
+        if own_session:
+            session.close()
+
+def get_change_token(session=None):
+    """
+    Tani "odcisk" stanu zamówień: liczba zamówień i ostatnie znaczniki zmian
+    zamówień i klientów. Jeśli się nie zmienił, nie trzeba przeładowywać widoków.
+    """
+    own_session = session is None
+    if own_session:
+        session = Session()
+    try:
+        orders_count, orders_updated = session.query(func.count(Order.id), func.max(Order.updated_at)).one()
+        clients_updated = session.query(func.max(Client.updated_at)).scalar()
+        return (orders_count, orders_updated, clients_updated)
+    finally:
+        if own_session:
+            session.close()
@@ -1,20 +1,83 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, insert
+from sqlalchemy.orm import relationship, validates
 from .db import Base
+from utils.numbers import parse_decimal, parse_int
+
+# Kolumny liczbowe pozycji - wartości z formularza ("12,5", "10 000") są zamieniane w walidatorze
+NUMERIC_ITEM_COLUMNS = ("width", "height", "ordered_quantity", "roll_length", "price")
+INTEGER_ITEM_COLUMNS = ("zam_rolki",)
 
 class OrderItem(Base):
     __tablename__ = "order_items"
     id = Column(Integer, primary_key=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
-    width = Column(String)
-    height = Column(String)
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
+    width = Column(Numeric(10, 2))             # mm
+    height = Column(Numeric(10, 2))            # mm
     material = Column(String)
-    ordered_quantity = Column(String)
+    ordered_quantity = Column(Numeric(14, 3))
     quantity_type = Column(String)
-    roll_length = Column(String)
+    roll_length = Column(Numeric(12, 2))
     core = Column(String)
-    price = Column(String)        # NOWE POLE
+    price = Column(Numeric(12, 4))        # NOWE POLE
     price_type = Column(String)   # NOWE POLE
-    zam_rolki = Column(String)      # NOWE POLE
+    zam_rolki = Column(Integer)      # NOWE POLE
+
+    order = relationship("Order", back_populates="items")
+
+    @validates(*NUMERIC_ITEM_COLUMNS)
+    def _validate_decimal(self, key, value):
+        return parse_decimal(value)
+
+    @validates(*INTEGER_ITEM_COLUMNS)
+    def _validate_int(self, key, value):
+        return parse_int(value)
+
+def normalize_item_values(values):
+    """Wartości pozycji z formularza zamienione tak jak w walidatorach (Decimal / int)."""
+    values = dict(values)
+    for key in NUMERIC_ITEM_COLUMNS:
+        if key in values:
+            values[key] = parse_decimal(values[key])
+    for key in INTEGER_ITEM_COLUMNS:
+        if key in values:
+            values[key] = parse_int(values[key])
+    return values
 
-    order = relationship("Order", back_populates="items")
\ No newline at end of file
+def save_order_items(session, order_id, items):
+    """
+    Zapisuje pozycje zamówienia jako różnicę względem bazy, w transakcji sesji:
+    - pozycja z "id" istniejącej pozycji - UPDATE tylko zmienionych kolumn,
+    - pozycja bez "id" - wszystkie nowe idą jednym wielowierszowym INSERT,
+    - pozycje zamówienia, których nie ma na liście - jeden DELETE.
+    Zwraca (dodane, zmienione, usunięte).
+    """
+    existing = {
+        item.id: item
+        for item in session.query(OrderItem).filter(OrderItem.order_id == order_id)
+    }
+    new_rows = []
+    kept_ids = set()
+    updated = 0
+    for values in items:
+        values = normalize_item_values(values)
+        item = existing.get(values.pop("id", None))
+        if item is None:
+            values["order_id"] = order_id
+            new_rows.append(values)
+            continue
+        kept_ids.add(item.id)
+        changed = False
+        for key, value in values.items():
+            if getattr(item, key) != value:
+                setattr(item, key, value)
+                changed = True
+        updated += changed
+    removed_ids = [item_id for item_id in existing if item_id not in kept_ids]
+    if removed_ids:
+        session.query(OrderItem).filter(OrderItem.id.in_(removed_ids)).delete(synchronize_session=False)
+        for item_id in removed_ids:
+            session.expunge(existing[item_id])
+    if new_rows:
+        # INSERT z Core omija walidatory - wartości są już znormalizowane wyżej
+        session.execute(insert(OrderItem), new_rows)
+    return len(new_rows), updated, len(removed_ids)
\ No newline at end of file
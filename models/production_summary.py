@@ -0,0 +1,165 @@
+import sys
+import datetime
+from sqlalchemy import (
+    Column, Integer, String, Numeric, Index, select, insert, delete, func, case, extract, and_, or_, text
+)
+from .db import Base, engine
+from .order import Order
+from .orderitem import OrderItem
+
+# Zestawienie produkcji trzymane w tabeli production_summary: suma ilości [tyś.]
+# dla tygodnia dostawy (ISO), materiału i rozmiaru. Po każdym zapisie / przesunięciu /
+# usunięciu zamówienia przeliczane są tylko tygodnie, których zmiana dotyczy
+# (refresh_summary_weeks, w tej samej transakcji co zmiana zamówienia).
+# Sprawdzenie zgodności z danymi i przebudowa:
+#     python -m models.production_summary check
+#     python -m models.production_summary rebuild
+
+# Blokada pg_advisory_xact_lock(SUMMARY_LOCK_ID, rok * 100 + tydzień) - dwa stanowiska
+# nie przeliczają tego samego tygodnia jednocześnie
+SUMMARY_LOCK_ID = 4212
+
+class ProductionSummary(Base):
+    __tablename__ = "production_summary"
+    id = Column(Integer, primary_key=True)
+    iso_year = Column(Integer, nullable=False)
+    iso_week = Column(Integer, nullable=False)
+    material = Column(String)
+    width = Column(Numeric(10, 2))
+    height = Column(Numeric(10, 2))
+    quantity = Column(Numeric, nullable=False)   # tyś. etykiet, bez zaokrąglania
+
+    __table_args__ = (Index("ix_production_summary_week", "iso_year", "iso_week"),)
+
+SUMMARY_KEY_COLUMNS = ("iso_year", "iso_week", "material", "width", "height")
+
+def quantity_in_thousands():
+    """
+    Ilość pozycji w tysiącach etykiet jako wyrażenie SQL:
+    typ "tyś" 1:1, typ "rolki" - ilość rolek * nawój / 1000, inne typy 1:1.
+    Brakujące wartości liczą się jako 0.
+    """
+    quantity_type = func.lower(func.coalesce(OrderItem.quantity_type, ""))
+    ordered = func.coalesce(OrderItem.ordered_quantity, 0)
+    return case(
+        (quantity_type.like("ty%"), ordered),
+        (quantity_type.like("rol%"), ordered * func.coalesce(OrderItem.roll_length, 0) / 1000),
+        else_=ordered,
+    )
+
+def week_of(day):
+    """(rok ISO, tydzień ISO) dla daty."""
+    iso = day.isocalendar()
+    return (iso[0], iso[1])
+
+def week_dates(week):
+    """Zakres dat [poniedziałek, następny poniedziałek) tygodnia (rok ISO, tydzień ISO)."""
+    monday = datetime.date.fromisocalendar(week[0], week[1], 1)
+    return monday, monday + datetime.timedelta(days=7)
+
+def live_summary_select(weeks=None):
+    """SELECT liczący zestawienie z zamówień; weeks ogranicza je do podanych tygodni."""
+    iso_year = extract("isoyear", Order.delivery_date).cast(Integer)
+    iso_week = extract("week", Order.delivery_date).cast(Integer)
+    query = (
+        select(
+            iso_year.label("iso_year"), iso_week.label("iso_week"),
+            OrderItem.material, OrderItem.width, OrderItem.height,
+            func.sum(quantity_in_thousands()).label("quantity"),
+        )
+        .join_from(Order, OrderItem, Order.id == OrderItem.order_id)
+        # Tylko pozycje z wypełnioną szerokością
+        .where(OrderItem.width.isnot(None), Order.delivery_date.isnot(None))
+        .group_by(iso_year, iso_week, OrderItem.material, OrderItem.width, OrderItem.height)
+    )
+    if weeks is not None:
+        # Zakresy dat zamiast porównania tygodni - korzysta z indeksu na delivery_date
+        query = query.where(or_(*[
+            and_(Order.delivery_date >= start, Order.delivery_date < end)
+            for start, end in map(week_dates, weeks)
+        ]))
+    return query
+
+def order_weeks(session, order_ids):
+    """Tygodnie dostawy podanych zamówień w obecnym stanie transakcji."""
+    dates = session.execute(
+        select(Order.delivery_date).where(Order.id.in_(list(order_ids)), Order.delivery_date.isnot(None))
+    ).scalars()
+    return {week_of(day) for day in dates}
+
+def refresh_summary_weeks(session, weeks):
+    """
+    Przelicza zestawienie dla podanych tygodni w transakcji sesji (widzi jej
+    niezatwierdzone zmiany). Wołane po zapisie / przesunięciu / usunięciu zamówienia
+    z tygodniami sprzed i po zmianie.
+    """
+    weeks = sorted(set(weeks))
+    if not weeks:
+        return
+    session.flush()
+    for year, week in weeks:
+        session.execute(
+            text("SELECT pg_advisory_xact_lock(:lock_id, :key)"),
+            {"lock_id": SUMMARY_LOCK_ID, "key": year * 100 + week},
+        )
+    session.execute(delete(ProductionSummary).where(or_(*[
+        and_(ProductionSummary.iso_year == year, ProductionSummary.iso_week == week)
+        for year, week in weeks
+    ])))
+    session.execute(insert(ProductionSummary).from_select(
+        list(SUMMARY_KEY_COLUMNS) + ["quantity"], live_summary_select(weeks)
+    ))
+
+def rebuild_summary(connection):
+    """Przelicza całe zestawienie od zera (migracja, polecenie rebuild)."""
+    # Przeliczanie pojedynczych tygodni z innych stanowisk czeka do końca przebudowy
+    connection.execute(text("LOCK TABLE production_summary IN EXCLUSIVE MODE"))
+    connection.execute(delete(ProductionSummary))
+    connection.execute(insert(ProductionSummary).from_select(
+        list(SUMMARY_KEY_COLUMNS) + ["quantity"], live_summary_select()
+    ))
+
+def _summary_rows(connection, query):
+    return {tuple(row[:5]): row[5] for row in connection.execute(query)}
+
+def diff_summary(connection):
+    """
+    Porównuje tabelę z zestawieniem policzonym na nowo z zamówień.
+    Zwraca listę (klucz, w tabeli, w danych) dla różniących się wierszy.
+    """
+    stored = _summary_rows(connection, select(
+        *[getattr(ProductionSummary, name) for name in SUMMARY_KEY_COLUMNS], ProductionSummary.quantity
+    ))
+    live = _summary_rows(connection, live_summary_select())
+    differences = []
+    for key in sorted(set(stored) | set(live), key=lambda key: tuple(str(part) for part in key)):
+        if stored.get(key) != live.get(key):
+            differences.append((key, stored.get(key), live.get(key)))
+    return differences
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "check"
+    if command == "check":
+        with engine.begin() as connection:
+            connection.execute(text("SET LOCAL statement_timeout = 0"))
+            differences = diff_summary(connection)
+            for key, stored, live in differences:
+                print(f"{key}: w tabeli {stored}, z zamówień {live}")
+            if differences:
+                rebuild_summary(connection)
+                print(f"Różnic: {len(differences)} - zestawienie przebudowane.")
+            else:
+                print("Zestawienie zgodne z zamówieniami.")
+        return 1 if differences else 0
+    if command == "rebuild":
+        with engine.begin() as connection:
+            connection.execute(text("SET LOCAL statement_timeout = 0"))
+            rebuild_summary(connection)
+        print("Zestawienie przebudowane.")
+        return 0
+    print("Użycie: python -m models.production_summary [check|rebuild]")
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
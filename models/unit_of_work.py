@@ -0,0 +1,164 @@
+import time
+import threading
+from contextlib import contextmanager
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, OperationalError, InterfaceError
+from .db import Session, engine
+
+# Przerwy między kolejnymi próbami po utracie połączenia (s)
+RETRY_DELAYS = (0.2, 0.5, 1.0)
+# W wątku GUI każda próba przy niedziałającym serwerze to do connect_timeout sekund
+# zamrożonego okna - tylko jedna szybka próba (świeże połączenie po restarcie serwera)
+GUI_RETRY_DELAYS = (0.2,)
+# Kody SQLSTATE błędów serwera oznaczające zerwane połączenie: klasa 08 (connection exception)
+# i 57P (zamknięcie serwera, serwer jeszcze nie przyjmuje połączeń)
+DISCONNECT_SQLSTATES = ("08", "57P")
+
+class CommitUncertainError(Exception):
+    """
+    Połączenie zerwało się w trakcie COMMIT - nie wiadomo, czy zmiany zostały zapisane,
+    więc transakcji nie powtarzamy automatycznie (np. zamówienie mogłoby zapisać się dwa razy).
+    """
+
+def is_disconnect(error):
+    """Czy błąd oznacza zerwane / niedostępne połączenie (restart serwera, przerwa w sieci)."""
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+    if isinstance(error, OperationalError):
+        # Błąd bez kodu SQLSTATE pochodzi od sterownika (brak połączenia, zerwane gniazdo);
+        # z kodem zgłosił go serwer przy działającym połączeniu (limit czasu, zakleszczenie,
+        # konflikt serializacji, brak miejsca na dysku) - chyba że to kod rozłączenia
+        code = getattr(error.orig, "pgcode", None)
+        return code is None or code.startswith(DISCONNECT_SQLSTATES)
+    return isinstance(error, InterfaceError)
+
+def _retry_delays():
+    """Przerwy między próbami dla bieżącego wątku; w wątku GUI bez ponowień, gdy baza już nie odpowiada."""
+    if threading.current_thread() is not threading.main_thread():
+        return RETRY_DELAYS
+    return GUI_RETRY_DELAYS if connection_health.ok else ()
+
+class ConnectionHealth:
+    """
+    Stan połączenia z bazą widziany przez aplikację. Każde udane / nieudane
+    zapytanie przez run_read / run_transaction go aktualizuje; widoki mogą się
+    zapisać przez add_listener(callback(ok, message)). Callback może być wołany z dowolnego wątku.
+    """
+
+    def __init__(self):
+        self.ok = True
+        self.message = ""
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _set(self, ok, message):
+        with self._lock:
+            if ok == self.ok and message == self.message:
+                return
+            self.ok, self.message = ok, message
+        for callback in list(self._listeners):
+            callback(ok, message)
+
+    def report_ok(self):
+        if not self.ok:
+            self._set(True, "")
+
+    def report_failure(self, error):
+        self._set(False, str(error).splitlines()[0] if str(error) else error.__class__.__name__)
+
+connection_health = ConnectionHealth()
+
+def _rollback_quietly(session):
+    # Po zerwanym połączeniu sam rollback też może się nie udać
+    try:
+        session.rollback()
+    except Exception:
+        pass
+
+def _after_disconnect(delay):
+    # Wszystkie połączenia w puli mogą być martwe (np. po restarcie serwera) - zamykamy je
+    engine.dispose()
+    time.sleep(delay)
+
+@contextmanager
+def session_scope(session_factory=Session):
+    """Jedna jednostka pracy: sesja zatwierdzana na końcu bloku, wycofywana przy błędzie."""
+    session = session_factory()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        _rollback_quietly(session)
+        raise
+    finally:
+        session.close()
+
+def run_read(fn, *args, session_factory=Session, **kwargs):
+    """
+    Wykonuje fn(session, *args, **kwargs) tylko do odczytu. Po zerwaniu połączenia
+    próbuje ponownie (z przerwami RETRY_DELAYS) na świeżym połączeniu.
+    """
+    delays = _retry_delays()
+    for attempt in range(len(delays) + 1):
+        session = session_factory()
+        try:
+            result = fn(session, *args, **kwargs)
+            connection_health.report_ok()
+            return result
+        except Exception as e:
+            _rollback_quietly(session)
+            if not is_disconnect(e):
+                raise
+            connection_health.report_failure(e)
+            if attempt == len(delays):
+                raise
+            _after_disconnect(delays[attempt])
+        finally:
+            session.close()
+
+def run_transaction(fn, *args, session_factory=Session, **kwargs):
+    """
+    Wykonuje fn(session, *args, **kwargs) jako jedną transakcję i ją zatwierdza.
+    Jeśli połączenie zerwie się przed COMMIT, cała transakcja jest powtarzana od początku
+    na nowej sesji - fn musi więc budować wszystkie zmiany od zera przy każdym wywołaniu.
+    Zerwanie w trakcie samego COMMIT kończy się CommitUncertainError.
+    W wątku GUI ponowień jest mniej (GUI_RETRY_DELAYS), żeby okno nie zamierało na długo.
+    """
+    delays = _retry_delays()
+    for attempt in range(len(delays) + 1):
+        session = session_factory()
+        committing = False
+        try:
+            result = fn(session, *args, **kwargs)
+            # Wszystko oprócz samego COMMIT wysyłamy wcześniej - tylko COMMIT jest "niepewny"
+            session.flush()
+            committing = True
+            session.commit()
+            connection_health.report_ok()
+            return result
+        except Exception as e:
+            _rollback_quietly(session)
+            if not is_disconnect(e):
+                raise
+            connection_health.report_failure(e)
+            if committing:
+                raise CommitUncertainError(
+                    "Połączenie z bazą zerwało się podczas zapisu - sprawdź, czy zmiany zostały zapisane."
+                ) from e
+            if attempt == len(delays):
+                raise
+            _after_disconnect(delays[attempt])
+        finally:
+            session.close()
+
+def check_connection(session):
+    """Najprostsze zapytanie - do sprawdzania, czy baza znów odpowiada."""
+    session.execute(text("SELECT 1"))
+    return True
\ No newline at end of file
@@ -1,14 +1,14 @@
 from fpdf import FPDF
-import os
-import sys
-import webbrowser
 import datetime
+from utils.numbers import format_decimal
+from printing.pdf_output import pdf_to_bytes, save_pdf, open_pdf
+from printing.pdf_resources import add_dejavu_fonts, string_width, COMPANY_LINES
 
 def orderitem_to_pdf_dict(orderitem):
     def format_cena(cena, cena_typ):
         if not cena:
             return ""
-        cena_str = str(cena)
+        cena_str = format_decimal(cena)
         typ = str(cena_typ).lower()
         typ = typ.replace(".", "").replace(" ", "")
         typ = (typ.replace("ę", "e")
@@ -29,36 +29,36 @@ def orderitem_to_pdf_dict(orderitem):
 
     if isinstance(orderitem, dict):
         cena_typ = orderitem.get("price_type") or orderitem.get("CenaTyp") or ""
-        width = str(orderitem.get("Szerokość", orderitem.get("width", "")))
-        height = str(orderitem.get("Wysokość", orderitem.get("height", "")))
+        width = format_decimal(orderitem.get("Szerokość", orderitem.get("width", "")))
+        height = format_decimal(orderitem.get("Wysokość", orderitem.get("height", "")))
         wymiar = f"{width} x {height}" if width and height else width or height
         cena = orderitem.get("Cena", orderitem.get("price", ""))
         miara = orderitem.get("quantity_type") or orderitem.get("Typ ilości") or ""
         return {
             "Wymiar": wymiar,
             "Rodzaj materiału": orderitem.get("Rodzaj materiału", orderitem.get("material", "")),
-            "Ilość na rolce": orderitem.get("nawój/długość", orderitem.get("roll_length", "")),
+            "Ilość na rolce": format_decimal(orderitem.get("nawój/długość", orderitem.get("roll_length", ""))),
             "Średnica rdzenia": orderitem.get("Średnica rdzenia", orderitem.get("core", "")),
-            "Ilość": orderitem.get("zam. ilość", orderitem.get("ordered_quantity", "")),
+            "Ilość": format_decimal(orderitem.get("zam. ilość", orderitem.get("ordered_quantity", ""))),
             "Miara": miara,
-            "zam. rolki": orderitem.get("zam. rolki", orderitem.get("zam_rolki", "")),
+            "zam. rolki": format_decimal(orderitem.get("zam. rolki", orderitem.get("zam_rolki", ""))),
             "Cena": format_cena(cena, cena_typ)
         }
     else:
         cena_typ = getattr(orderitem, "price_type", "") or getattr(orderitem, "CenaTyp", "")
-        width = str(getattr(orderitem, "Szerokość", getattr(orderitem, "width", "")))
-        height = str(getattr(orderitem, "Wysokość", getattr(orderitem, "height", "")))
+        width = format_decimal(getattr(orderitem, "Szerokość", getattr(orderitem, "width", "")))
+        height = format_decimal(getattr(orderitem, "Wysokość", getattr(orderitem, "height", "")))
         wymiar = f"{width} x {height}" if width and height else width or height
         cena = getattr(orderitem, "Cena", getattr(orderitem, "price", ""))
         miara = getattr(orderitem, "quantity_type", "") or getattr(orderitem, "Typ ilości", "")
         return {
             "Wymiar": wymiar,
             "Rodzaj materiału": getattr(orderitem, "Rodzaj materiału", getattr(orderitem, "material", "")),
-            "Ilość na rolce": getattr(orderitem, "nawój_długość", getattr(orderitem, "roll_length", "")),
+            "Ilość na rolce": format_decimal(getattr(orderitem, "nawój_długość", getattr(orderitem, "roll_length", ""))),
             "Średnica rdzenia": getattr(orderitem, "Średnica rdzenia", getattr(orderitem, "core", "")),
-            "Ilość": getattr(orderitem, "zam_ilość", getattr(orderitem, "ordered_quantity", "")),
+            "Ilość": format_decimal(getattr(orderitem, "zam_ilość", getattr(orderitem, "ordered_quantity", ""))),
             "Miara": miara,
-            "zam. rolki": getattr(orderitem, "zam. rolki", getattr(orderitem, "zam_rolki", "")),
+            "zam. rolki": format_decimal(getattr(orderitem, "zam. rolki", getattr(orderitem, "zam_rolki", ""))),
             "Cena": format_cena(cena, cena_typ)
         }
 
@@ -90,7 +90,8 @@ class PDFGenerator:
     def __init__(self, order):
         self.order = order
 
-    def generate_pdf(self, filename="output.pdf"):
+    def render(self):
+        """Rysuje potwierdzenie i zwraca dokument fpdf."""
         pdf = FPDF(orientation="P", unit="mm", format="A4")
         pdf.set_auto_page_break(auto=True, margin=5)
         left_margin = 10
@@ -98,12 +99,7 @@ class PDFGenerator:
         top_margin = 10
         pdf.set_margins(left=left_margin, top=top_margin, right=right_margin)
         pdf.add_page()
-
-        folder = os.path.dirname(__file__)
-        font_regular = os.path.join(folder, "DejaVuSans.ttf")
-        font_bold = os.path.join(folder, "DejaVuSans-Bold.ttf")
-        pdf.add_font("DejaVu", "", font_regular, uni=True)
-        pdf.add_font("DejaVu", "B", font_bold, uni=True)
+        add_dejavu_fonts(pdf)
 
         color_accent = (77, 144, 254)
         color_header_bg = (0, 0, 0)
@@ -113,20 +109,11 @@ class PDFGenerator:
 
         # --- Dane firmy Termedia ---
         pdf.set_xy(left_margin, 15)
-        pdf.set_font("DejaVu", "B", 13.5)
         pdf.set_text_color(0, 0, 0)
-        pdf.cell(0, 7, "TERMEDIA", ln=1, align="L")
-        pdf.set_font("DejaVu", "", 8)
-        pdf.set_x(left_margin)
-        pdf.cell(0, 4, "ul. Przemysłowa 60", ln=1, align="L")
-        pdf.set_x(left_margin)
-        pdf.cell(0, 4, "43-110 Tychy", ln=1, align="L")
-        pdf.set_x(left_margin)
-        pdf.cell(0, 4, "bok@termedialabels.pl", ln=1, align="L")
-        pdf.set_x(left_margin)
-        pdf.cell(0, 4, "www.termedialabels.pl", ln=1, align="L")
-        pdf.set_x(left_margin)
-        pdf.cell(0, 4, "+48 503 179 658", ln=1, align="L")
+        for style, size, height, text in COMPANY_LINES:
+            pdf.set_font("DejaVu", style, size)
+            pdf.set_x(left_margin)
+            pdf.cell(0, height, text, ln=1, align="L")
         pdf.ln(1)
 
         # --- Blok "Zamówienie" i nr zamówienia ---
@@ -230,7 +217,7 @@ class PDFGenerator:
         # Dane produkcji
         pdf.set_x(left_margin)
         pdf.set_font("DejaVu", "B", 10.5)
-        prod_title_width = pdf.get_string_width("Dane produkcji") + 10
+        prod_title_width = string_width(pdf, "Dane produkcji") + 10
         pdf.set_fill_color(180, 200, 245)
         pdf.set_text_color(40, 80, 160)
         pdf.cell(prod_title_width, 9, "Dane produkcji", ln=1, fill=True)
@@ -313,29 +300,22 @@ class PDFGenerator:
         pdf.set_text_color(130, 130, 130)
         pdf.set_y(284)
         center_text = "Wygenerowano automatycznie przez LabelOrderManager"
-        text_width = pdf.get_string_width(center_text)
+        text_width = string_width(pdf, center_text)
         page_center = 105
         pdf.set_x(page_center - text_width / 2)
         pdf.cell(text_width, 3, center_text, align="C")
+        return pdf
 
-        pdf.output(filename)
-
-        abs_path = os.path.abspath(filename)
-        if sys.platform.startswith("win"):
-            os.startfile(abs_path)
-        elif sys.platform.startswith("darwin"):
-            os.system(f'open "{abs_path}"')
-        else:
-            try:
-                webbrowser.open(f'file://{abs_path}')
-            except Exception:
-                os.system(f'xdg-open "{abs_path}"')
+    def to_bytes(self):
+        return pdf_to_bytes(self.render())
 
-def export_order_to_pdf(order, client, order_items, filename):
-    output_dir = os.path.dirname(filename)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir, exist_ok=True)
+    def generate_pdf(self, filename="output.pdf", open_viewer=True):
+        save_pdf(self.to_bytes(), filename)
+        if open_viewer:
+            open_pdf(filename)
 
+def order_to_pdf_data(order, client, order_items):
+    """Słownik danych potwierdzenia (klucze jak w PDFGenerator) z zamówienia, klienta i pozycji."""
     client_dict = client_to_pdf_dict(client) if client else {}
     order_items_dicts = [orderitem_to_pdf_dict(item) for item in (order_items or [])]
     order_data = dict(order) if isinstance(order, dict) else {}
@@ -380,5 +360,14 @@ def export_order_to_pdf(order, client, order_items, filename):
         if key in order_data and isinstance(order_data[key], (datetime.date, datetime.datetime)):
             order_data[key] = order_data[key].strftime("%Y-%m-%d")
 
-    pdfgen = PDFGenerator(order_data)
-    pdfgen.generate_pdf(filename)
\ No newline at end of file
+    return order_data
+
+def render_order_confirmation(order, client, order_items):
+    """Potwierdzenie zamówienia dla klienta jako bajty PDF."""
+    return PDFGenerator(order_to_pdf_data(order, client, order_items)).to_bytes()
+
+def export_order_to_pdf(order, client, order_items, filename, open_viewer=True):
+    save_pdf(render_order_confirmation(order, client, order_items), filename)
+    if open_viewer:
+        open_pdf(filename)
+    return filename
\ No newline at end of file
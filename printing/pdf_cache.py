@@ -0,0 +1,108 @@
+import os
+import json
+import shutil
+import hashlib
+
+# Podręczny katalog z gotowymi PDF-ami. Klucz to skrót treści, która trafia na wydruk
+# (nagłówek zamówienia, dane klienta, pozycje), więc niezmienione zamówienie nie jest
+# generowane ponownie. Najdawniej używane pliki są usuwane po przekroczeniu limitu rozmiaru.
+
+PDF_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".etykiety", "pdf_cache")
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+# Podbić po zmianie wyglądu wydruków - stare pliki przestaną pasować
+RENDER_VERSION = 1
+# Pola zamówienia, które nie trafiają na wydruk
+IGNORED_ORDER_FIELDS = ("is_done", "done_at", "done_by")
+
+def _stable_order(data):
+    order = {key: value for key, value in data["order"].items() if key not in IGNORED_ORDER_FIELDS}
+    return {"order": order, "client": data["client"], "items": data["items"]}
+
+def content_key(kind, payload):
+    """
+    Skrót SHA-256 treści wydruku. payload jak dla printing.render_jobs
+    (wynik order_to_plain albo ich lista dla wydruku zbiorczego).
+    """
+    if isinstance(payload, list):
+        content = [_stable_order(data) for data in payload]
+    else:
+        content = _stable_order(payload)
+    text = json.dumps([RENDER_VERSION, kind, content], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class PdfCache:
+    """
+    Pliki "<prefiks>_<skrót>.pdf"; prefiks to "<id zamówienia>_<rodzaj wydruku>"
+    albo "batch" dla wydruków zbiorczych.
+    """
+
+    def __init__(self, directory=PDF_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, prefix, key):
+        return os.path.join(self.directory, f"{prefix}_{key}.pdf")
+
+    def get(self, prefix, key):
+        """Ścieżka zapisanego PDF albo None. Trafienie odświeża czas użycia (LRU)."""
+        path = self._path(prefix, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, prefix, key, source_path):
+        os.makedirs(self.directory, exist_ok=True)
+        # Najpierw kopia tymczasowa, żeby przerwany zapis nie zostawił uciętego pliku
+        path = self._path(prefix, key)
+        shutil.copyfile(source_path, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        # Starsze wersje tego samego wydruku zamówienia nie będą już potrzebne
+        if prefix != "batch":
+            self.invalidate(prefix, keep=path)
+        self.evict()
+        return path
+
+    def invalidate(self, prefix, keep=None):
+        """
+        Usuwa zapisane PDF-y o danym prefiksie; sam id zamówienia obejmuje wszystkie
+        jego wydruki (np. po zapisie lub usunięciu zamówienia).
+        """
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(f"{prefix}_") and path != keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def evict(self):
+        """Usuwa najdawniej używane pliki, aż katalog zmieści się w limicie."""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for mtime, size, path in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+pdf_cache = PdfCache()
+
+def invalidate_orders(order_ids):
+    for order_id in order_ids:
+        pdf_cache.invalidate(str(order_id))
\ No newline at end of file
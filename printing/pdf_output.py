@@ -0,0 +1,34 @@
+import os
+import sys
+import webbrowser
+
+# Zapis i podgląd gotowych PDF-ów. Generatory (order_confirmation, production_ticket)
+# zwracają bajty; zapis na dysk i otwarcie przeglądarki to osobne, opcjonalne kroki.
+
+def pdf_to_bytes(pdf):
+    """Dokument fpdf2 jako bytes (output() bez argumentów zwraca bytearray)."""
+    return bytes(pdf.output())
+
+def save_pdf(data, target):
+    """Zapisuje bajty PDF do pliku o podanej ścieżce albo do otwartego obiektu pliku (tryb binarny)."""
+    if hasattr(target, "write"):
+        target.write(data)
+        return target
+    folder = os.path.dirname(target)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder, exist_ok=True)
+    with open(target, "wb") as f:
+        f.write(data)
+    return target
+
+def open_pdf(path):
+    abs_path = os.path.abspath(path)
+    if sys.platform.startswith("win"):
+        os.startfile(abs_path)
+    elif sys.platform.startswith("darwin"):
+        os.system(f'open "{abs_path}"')
+    else:
+        try:
+            webbrowser.open(f'file://{abs_path}')
+        except Exception:
+            os.system(f'xdg-open "{abs_path}"')
\ No newline at end of file
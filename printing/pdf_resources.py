@@ -0,0 +1,44 @@
+import os
+
+# Wspólne zasoby wydruków, liczone raz na proces (także w procesach puli wydruków).
+#
+# Sparsowana czcionka należy do konkretnego dokumentu fpdf (każdy dokument osadza
+# własny podzbiór znaków), więc przy wydruku zbiorczym używamy jednego dokumentu
+# (patrz render_production_tickets). Między dokumentami współdzielone są pomiary
+# szerokości tekstu - zależą tylko od czcionki, rozmiaru i tekstu.
+
+FONT_DIR = os.path.dirname(os.path.abspath(__file__))
+FONT_FAMILY = "DejaVu"
+FONT_FILES = (
+    ("", os.path.join(FONT_DIR, "DejaVuSans.ttf")),
+    ("B", os.path.join(FONT_DIR, "DejaVuSans-Bold.ttf")),
+)
+
+# Stały blok danych firmy na potwierdzeniu: (styl, rozmiar, wysokość wiersza, tekst)
+COMPANY_LINES = (
+    ("B", 13.5, 7, "TERMEDIA"),
+    ("", 8, 4, "ul. Przemysłowa 60"),
+    ("", 8, 4, "43-110 Tychy"),
+    ("", 8, 4, "bok@termedialabels.pl"),
+    ("", 8, 4, "www.termedialabels.pl"),
+    ("", 8, 4, "+48 503 179 658"),
+)
+
+# Po przekroczeniu limitu pamięć podręczna szerokości jest czyszczona
+MAX_CACHED_WIDTHS = 50000
+_string_widths = {}
+
+def add_dejavu_fonts(pdf):
+    for style, path in FONT_FILES:
+        pdf.add_font(FONT_FAMILY, style, path)
+
+def string_width(pdf, text):
+    """pdf.get_string_width(text) zapamiętane dla (czcionka, styl, rozmiar, tekst)."""
+    text = str(text)
+    key = (pdf.font_family, pdf.font_style, pdf.font_size_pt, text)
+    width = _string_widths.get(key)
+    if width is None:
+        if len(_string_widths) >= MAX_CACHED_WIDTHS:
+            _string_widths.clear()
+        width = _string_widths[key] = pdf.get_string_width(text)
+    return width
\ No newline at end of file
@@ -1,9 +1,10 @@
 from fpdf import FPDF
 import os
-import sys
-import webbrowser
 import datetime
 import re
+from utils.numbers import format_decimal
+from printing.pdf_output import pdf_to_bytes, save_pdf, open_pdf
+from printing.pdf_resources import add_dejavu_fonts, string_width
 
 def format_pdf_value(value):
     if isinstance(value, (datetime.date, datetime.datetime)):
@@ -13,7 +14,7 @@ def format_pdf_value(value):
 def format_cena(cena, cena_typ):
     if not cena:
         return ""
-    cena_str = str(cena)
+    cena_str = format_decimal(cena)
     typ = str(cena_typ).lower()
     typ = typ.replace(".", "").replace(" ", "")
     typ = (typ.replace("ę", "e")
@@ -37,11 +38,11 @@ def get_dynamic_col_widths(pdf, headers, rows, total_width, min_width=10, max_wi
     n = len(headers)
     col_widths = [min_width] * n
     for i, header in enumerate(headers):
-        w = pdf.get_string_width(str(header)) + 2 * padding
+        w = string_width(pdf, header) + 2 * padding
         col_widths[i] = max(col_widths[i], min(w, max_width))
     for row in rows:
         for i, val in enumerate(row):
-            w = pdf.get_string_width(str(val)) + 2 * padding
+            w = string_width(pdf, val) + 2 * padding
             col_widths[i] = max(col_widths[i], min(w, max_width))
     sum_width = sum(col_widths)
     # Skalowanie aby suma szerokości = total_width
@@ -55,15 +56,15 @@ def get_dynamic_col_widths(pdf, headers, rows, total_width, min_width=10, max_wi
     return col_widths
 
 def orderitem_to_pdf_row(orderitem):
-    width = str(getattr(orderitem, "width", getattr(orderitem, "Szerokość", "")))
-    height = str(getattr(orderitem, "height", getattr(orderitem, "Wysokość", "")))
+    width = format_decimal(getattr(orderitem, "width", getattr(orderitem, "Szerokość", "")))
+    height = format_decimal(getattr(orderitem, "height", getattr(orderitem, "Wysokość", "")))
     wymiar = f"{width}x{height}" if width and height else width or height
     material = getattr(orderitem, "material", getattr(orderitem, "Rodzaj materiału", ""))
-    roll_length = getattr(orderitem, "roll_length", getattr(orderitem, "nawój/długość", ""))
+    roll_length = format_decimal(getattr(orderitem, "roll_length", getattr(orderitem, "nawój/długość", "")))
     core = getattr(orderitem, "core", getattr(orderitem, "Średnica rdzenia", ""))
-    ordered_quantity = getattr(orderitem, "ordered_quantity", getattr(orderitem, "zam. ilość", ""))
+    ordered_quantity = format_decimal(getattr(orderitem, "ordered_quantity", getattr(orderitem, "zam. ilość", "")))
     miara = getattr(orderitem, "quantity_type", getattr(orderitem, "Typ ilości", ""))
-    zam_rolki = getattr(orderitem, "zam. rolki", getattr(orderitem, "zam_rolki", ""))
+    zam_rolki = format_decimal(getattr(orderitem, "zam. rolki", getattr(orderitem, "zam_rolki", "")))
     cena = getattr(orderitem, "Cena", getattr(orderitem, "price", ""))
     cena_typ = getattr(orderitem, "price_type", getattr(orderitem, "CenaTyp", ""))
     cena_sufix = format_cena(cena, cena_typ)
@@ -81,12 +82,16 @@ class ProductionTicketPDF(FPDF):
         self.page_height = 210
         self.ticket_height = 90
         self.ticket_spacing = 6
+        add_dejavu_fonts(self)
 
-        folder = os.path.dirname(__file__)
-        font_regular = os.path.join(folder, "DejaVuSans.ttf")
-        font_bold = os.path.join(folder, "DejaVuSans-Bold.ttf")
-        self.add_font("DejaVu", "", font_regular, uni=True)
-        self.add_font("DejaVu", "B", font_bold, uni=True)
+    def add_order_page(self, order, client, order_items):
+        """Strona A5 z dwoma egzemplarzami biletu zamówienia rozdzielonymi linią cięcia."""
+        self.add_page()
+        # Pierwszy bilet - zwyczajnie
+        self.ticket(order, client, order_items, y_offset=0)
+        self.draw_cut_mark()
+        # Drugi bilet - przesuwamy w dół o 0,5 cm (5mm)
+        self.ticket(order, client, order_items, y_offset=self.ticket_height + self.ticket_spacing, table_full_width=True)
 
     def draw_cut_mark(self):
         y_cut = self.page_height / 2
@@ -128,7 +133,7 @@ class ProductionTicketPDF(FPDF):
         # Tło pod "Data zamówienia:" – dokładnie pod tekst
         self.set_font("DejaVu", "B", 8)
         date_order_label = "Data zamówienia:"
-        date_order_label_w = self.get_string_width(date_order_label) + 6  # +6mm margines
+        date_order_label_w = string_width(self, date_order_label) + 6  # +6mm margines
         date_order_x = x + 58
         date_order_y = y
         self.set_fill_color(*black)
@@ -139,7 +144,7 @@ class ProductionTicketPDF(FPDF):
 
         # Tło pod "Data wysyłki:" – przesunięte o 1,5cm w prawo
         wysylka_label = "Data wysyłki:"
-        wysylka_label_w = self.get_string_width(wysylka_label) + 6
+        wysylka_label_w = string_width(self, wysylka_label) + 6
         wysylka_x = date_order_x + date_order_label_w + 15  # 1,5 cm dalej
         wysylka_y = y
         self.set_fill_color(*black)
@@ -247,33 +252,43 @@ def clean_filename(name):
     import re
     return re.sub(r'[^a-zA-Z0-9._-]', '_', name)
 
-def export_production_ticket(order, client, order_items, filename=None):
-    output_dir = r"c:\produkcja"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir, exist_ok=True)
+PRODUCTION_OUTPUT_DIR = r"c:\produkcja"
+
+def production_output_path(filename):
+    if not os.path.exists(PRODUCTION_OUTPUT_DIR):
+        os.makedirs(PRODUCTION_OUTPUT_DIR, exist_ok=True)
+    return os.path.join(PRODUCTION_OUTPUT_DIR, filename)
+
+def render_production_ticket(order, client, order_items):
+    """Bilet produkcyjny zamówienia (strona A5 z dwoma egzemplarzami) jako bajty PDF."""
+    pdf = ProductionTicketPDF()
+    pdf.add_order_page(order, client, order_items)
+    return pdf_to_bytes(pdf)
+
+def render_production_tickets(orders):
+    """
+    Bilety produkcyjne wielu zamówień (np. całego dnia z pulpitu) w jednym PDF -
+    strona na zamówienie. Jeden obiekt ProductionTicketPDF, więc czcionki są
+    wczytywane raz. orders: migawki zamówień z polami client i items.
+    """
+    pdf = ProductionTicketPDF()
+    for order in orders:
+        pdf.add_order_page(order, order.client, order.items)
+    return pdf_to_bytes(pdf)
+
+def export_production_ticket(order, client, order_items, filename=None, open_viewer=True):
     safe_order = clean_filename(str(getattr(order, "order_number", getattr(order, "Nr zamówienia", "zamowienie"))))
     safe_name = clean_filename(str(getattr(client, "name", getattr(client, "Firma", "klient"))))
     if not filename:
         filename = f"{safe_order}_{safe_name}_PRODUKCJA.pdf"
-    output_path = os.path.join(output_dir, filename)
-
-    pdf = ProductionTicketPDF()
-    pdf.add_page()
-    # Pierwszy bilet - zwyczajnie
-    pdf.ticket(order, client, order_items, y_offset=0)
-    pdf.draw_cut_mark()
-    # Drugi bilet - przesuwamy w dół o 0,5 cm (5mm)
-    pdf.ticket(order, client, order_items, y_offset=pdf.ticket_height + pdf.ticket_spacing, table_full_width=True)
+    output_path = save_pdf(render_production_ticket(order, client, order_items), production_output_path(filename))
+    if open_viewer:
+        open_pdf(output_path)
+    return output_path
 
-    pdf.output(output_path)
-
-    abs_path = os.path.abspath(output_path)
-    if sys.platform.startswith("win"):
-        os.startfile(abs_path)
-    elif sys.platform.startswith("darwin"):
-        os.system(f'open "{abs_path}"')
-    else:
-        try:
-            webbrowser.open(f'file://{abs_path}')
-        except Exception:
-            os.system(f'xdg-open "{abs_path}"')
\ No newline at end of file
+def export_production_tickets(orders, filename, open_viewer=True):
+    """Zapis wydruku zbiorczego (render_production_tickets) w PRODUCTION_OUTPUT_DIR. Zwraca ścieżkę pliku."""
+    output_path = save_pdf(render_production_tickets(orders), production_output_path(filename))
+    if open_viewer:
+        open_pdf(output_path)
+    return output_path
\ No newline at end of file
@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+from printing.order_confirmation import render_order_confirmation
+from printing.production_ticket import render_production_ticket, render_production_tickets
+from printing.pdf_output import save_pdf
+
+# Zadania generowania PDF uruchamiane w osobnych procesach (widgets/pdf_render_service.py).
+# Dostają zwykłe dane (słowniki z datami / Decimal), nie obiekty ORM ani Qt,
+# i nigdy same nie otwierają podglądu - robi to okno po zakończeniu zadania.
+
+def order_to_plain(order):
+    """Migawka zamówienia (z client i items) jako słowniki do przekazania do procesu."""
+    fields = {key: value for key, value in vars(order).items() if key not in ("client", "items")}
+    client = getattr(order, "client", None)
+    return {
+        "order": fields,
+        "client": dict(vars(client)) if client is not None else None,
+        "items": [dict(vars(item)) for item in getattr(order, "items", [])],
+    }
+
+def order_from_plain(data):
+    order = SimpleNamespace(**data["order"])
+    order.client = SimpleNamespace(**data["client"]) if data["client"] is not None else None
+    order.items = [SimpleNamespace(**item) for item in data["items"]]
+    return order
+
+def _confirmation(data):
+    order = order_from_plain(data)
+    return render_order_confirmation(order, order.client, order.items)
+
+def _production_ticket(data):
+    order = order_from_plain(data)
+    return render_production_ticket(order, order.client, order.items)
+
+def _production_tickets(orders_data):
+    return render_production_tickets([order_from_plain(data) for data in orders_data])
+
+# Rodzaj wydruku -> funkcja zwracająca bajty PDF
+RENDERERS = {
+    "confirmation": _confirmation,
+    "production": _production_ticket,
+    "production_batch": _production_tickets,
+}
+
+def render_job(kind, payload, output_path):
+    """Punkt wejścia w procesie roboczym: generuje PDF i zapisuje go. Zwraca ścieżkę pliku."""
+    return save_pdf(RENDERERS[kind](payload), output_path)
\ No newline at end of file
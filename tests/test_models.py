@@ -42,6 +42,30 @@ def test_order_sequence(db_session):
     newer = get_next_order_number(db_session)
     assert newer.startswith("001000")
 
+def test_reserve_order_numbers_contiguous(db_session):
+    from models.order_sequence import reserve_order_numbers
+    numbers = reserve_order_numbers(db_session, 5)
+    values = [int(number.split("/")[0]) for number in numbers]
+    assert values == list(range(values[0], values[0] + 5))
+    # Licznik się nie cofa - kolejny numer nie powtarza zarezerwowanych
+    set_last_order_number(db_session, numbers[1])
+    following = get_next_order_number(db_session)
+    assert int(following.split("/")[0]) == values[-1] + 1
+    db_session.commit()
+
+def test_sync_order_sequence_collapses_rows(db_session):
+    from models.order_sequence import OrderSequence, SEQUENCE_ROW_ID, sync_order_sequence
+    last = db_session.get(OrderSequence, SEQUENCE_ROW_ID).last_number
+    # Wiersz licznika z innym id, jak w bazach sprzed stałego id
+    db_session.add(OrderSequence(id=SEQUENCE_ROW_ID + 4, last_number=last + 100))
+    db_session.flush()
+    sync_order_sequence(db_session.connection())
+    db_session.expire_all()
+    rows = db_session.query(OrderSequence).all()
+    assert [(row.id, row.last_number) for row in rows] == [(SEQUENCE_ROW_ID, last + 100)]
+    assert get_next_order_number(db_session).startswith(f"{last + 101:06d}")
+    db_session.rollback()
+
 def test_create_order_and_item(db_session):
     client = db_session.query(Client).first()
     order = Order(
@@ -68,4 +92,206 @@ def test_create_order_and_item(db_session):
     db_session.commit()
     found_order = db_session.query(Order).filter_by(order_number="001000/TER").first()
     assert found_order is not None
-    assert len(found_order.items) > 0
\ No newline at end of file
+    assert len(found_order.items) > 0
+
+def test_done_state_in_database(db_session):
+    from widgets.done_orders_store import done_orders_store
+    order = db_session.query(Order).filter_by(order_number="001000/TER").first()
+    done_orders_store.mark_done(order.id)
+    assert done_orders_store.is_done(order.id)
+    db_session.expire_all()
+    assert db_session.get(Order, order.id).done_at is not None
+    done_orders_store.remove(order.id)
+    assert not done_orders_store.is_done(order.id)
+
+def test_reserve_client_numbers(db_session):
+    from models.client import reserve_client_numbers
+    numbers = reserve_client_numbers(db_session, 3)
+    db_session.commit()
+    assert len(set(numbers)) == 3
+    assert all(len(nr) == 6 and nr.isdigit() for nr in numbers)
+    client = Client(name="Firma po rezerwacji")
+    db_session.add(client)
+    db_session.commit()
+    assert int(client.client_number) > max(int(nr) for nr in numbers)
+
+def test_order_item_numeric_columns(db_session):
+    from decimal import Decimal
+    order = db_session.query(Order).filter_by(order_number="001000/TER").first()
+    item = OrderItem(order_id=order.id, width="50,5", height="100", ordered_quantity="10 000",
+                     roll_length="1 000", price="12,50", zam_rolki="10")
+    db_session.add(item)
+    db_session.commit()
+    db_session.refresh(item)
+    assert item.width == Decimal("50.5")
+    assert item.ordered_quantity == Decimal("10000")
+    assert item.zam_rolki == 10
+    with pytest.raises(ValueError):
+        OrderItem(width="abc")
+
+def test_run_transaction_commits_and_reads(db_session):
+    from models.unit_of_work import run_read, run_transaction
+    client_id = run_transaction(lambda session: session.query(Client).filter_by(email="test@firma.pl").first().id)
+    name = run_read(lambda session: session.query(Client.name).filter_by(id=client_id).scalar())
+    assert name == "Firma Testowa"
+
+def test_is_disconnect_by_sqlstate():
+    from types import SimpleNamespace
+    from sqlalchemy.exc import OperationalError
+    from models.unit_of_work import is_disconnect
+    def error(pgcode):
+        return OperationalError("SELECT 1", {}, SimpleNamespace(pgcode=pgcode))
+    # Zakleszczenie, konflikt serializacji, brak miejsca, limit czasu - połączenie działa
+    for pgcode in ("40P01", "40001", "53100", "57014", "55P03"):
+        assert not is_disconnect(error(pgcode))
+    # Zamknięcie serwera albo błąd sterownika bez kodu - połączenie zerwane
+    for pgcode in ("57P01", "08006", None):
+        assert is_disconnect(error(pgcode))
+
+def test_save_order_items_diff(db_session):
+    from decimal import Decimal
+    from models.orderitem import save_order_items
+    order = db_session.query(Order).filter_by(order_number="001000/TER").first()
+    save_order_items(db_session, order.id, [
+        {"id": None, "width": "30", "height": "40", "material": "Termo"},
+        {"id": None, "width": "60", "height": "80", "material": "Folia"},
+    ])
+    db_session.commit()
+    first, second = sorted(db_session.query(OrderItem).filter_by(order_id=order.id).all(), key=lambda i: i.id)[-2:]
+    assert save_order_items(db_session, order.id, [
+        {"id": first.id, "width": "30,0", "height": "45", "material": "Termo"},
+        {"id": None, "width": "70", "height": "90", "material": "Folia"},
+    ])[0] == 1
+    db_session.commit()
+    db_session.expire_all()
+    items = db_session.query(OrderItem).filter_by(order_id=order.id).order_by(OrderItem.id).all()
+    assert [item.width for item in items] == [Decimal("30"), Decimal("70")]
+    assert items[0].id == first.id and items[0].height == Decimal("45")
+    assert db_session.get(OrderItem, second.id) is None
+
+def test_weekly_production_summary_in_sql(db_session):
+    from widgets.production_sorter import get_weekly_production_summary
+    client = db_session.query(Client).filter_by(email="test@firma.pl").first()
+    order = Order(order_number="009001/TER", order_date=datetime.date(2030, 1, 2),
+                  delivery_date=datetime.date(2030, 1, 9), client_id=client.id)
+    db_session.add(order)
+    db_session.flush()
+    db_session.add_all([
+        OrderItem(order_id=order.id, width="50", height="30", material="Termo",
+                  ordered_quantity="5", quantity_type="tyś"),
+        OrderItem(order_id=order.id, width="50", height="30", material="Termo",
+                  ordered_quantity="4", quantity_type="rolki", roll_length="500"),
+        OrderItem(order_id=order.id, width=None, height="30", material="Termo",
+                  ordered_quantity="7", quantity_type="tyś"),
+    ])
+    db_session.commit()
+    summary = get_weekly_production_summary(datetime.date(2030, 1, 1), datetime.date(2030, 1, 31), session=db_session)
+    assert len(summary) == 1
+    (week, material, width, height), qty = summary[0]
+    assert (week, material) == ("2030-T02", "Termo")
+    assert qty == pytest.approx(7.0)
+
+def test_production_summary_refresh(db_session):
+    from models.production_summary import refresh_summary_weeks, order_weeks, week_of, diff_summary, ProductionSummary
+    client = db_session.query(Client).filter_by(email="test@firma.pl").first()
+    order = Order(order_number="009002/TER", order_date=datetime.date(2031, 3, 3),
+                  delivery_date=datetime.date(2031, 3, 5), client_id=client.id)
+    db_session.add(order)
+    db_session.flush()
+    db_session.add(OrderItem(order_id=order.id, width="40", height="20", material="Folia",
+                             ordered_quantity="3", quantity_type="tyś"))
+    refresh_summary_weeks(db_session, order_weeks(db_session, [order.id]))
+    db_session.commit()
+    week = week_of(order.delivery_date)
+    stored = db_session.query(ProductionSummary).filter_by(iso_year=week[0], iso_week=week[1]).all()
+    assert [(row.material, float(row.quantity)) for row in stored] == [("Folia", 3.0)]
+    assert not [diff for diff in diff_summary(db_session.connection()) if diff[0][:2] == week]
+
+def test_production_pivot_dimensions(db_session):
+    from widgets.production_sorter import get_production_pivot
+    rows = get_production_pivot(db_session, ["day", "client"], datetime.date(2030, 1, 1), datetime.date(2030, 1, 31))
+    assert rows == [(datetime.date(2030, 1, 9), "Firma Testowa", pytest.approx(7.0))]
+
+def test_material_consumption(db_session):
+    from models.material_consumption import material_consumption
+    rows = material_consumption(db_session, datetime.date(2030, 1, 1), datetime.date(2030, 1, 31), "week",
+                                gap_mm=0, margin_mm=0)
+    assert len(rows) == 1
+    period, material, labels, label_area, web_length, material_area = rows[0]
+    assert (period, material) == ("2030-T02", "Termo")
+    # 5 tyś. + 4 rolki po 500 z wymiarami 50x30 oraz 7 tyś. bez szerokości
+    assert labels == pytest.approx(14000)
+    assert label_area == pytest.approx(7000 * 50 * 30 / 1e6)
+    assert web_length == pytest.approx(7000 * 30 / 1000)
+    assert material_area == pytest.approx(label_area)
+
+def test_pdf_cache_lru_and_invalidation(tmp_path):
+    import os
+    from printing.pdf_cache import PdfCache, content_key
+    payload = {"order": {"id": 1, "order_number": "000001/TER", "is_done": False}, "client": None, "items": []}
+    key = content_key("production", payload)
+    done_payload = dict(payload, order=dict(payload["order"], is_done=True))
+    assert content_key("production", done_payload) == key
+    assert content_key("confirmation", payload) != key
+    source = tmp_path / "source.pdf"
+    source.write_bytes(b"x" * 100)
+    cache = PdfCache(str(tmp_path / "cache"), max_bytes=250)
+    first = cache.put("1_production", key, str(source))
+    os.utime(first, (1, 1))
+    cache.put("2_production", key, str(source))
+    cache.put("3_production", key, str(source))
+    assert cache.get("1_production", key) is None
+    assert cache.get("3_production", key) is not None
+    cache.invalidate("3")
+    assert cache.get("3_production", key) is None
+
+def _order_snapshot(order_id, order_number):
+    from types import SimpleNamespace
+    from decimal import Decimal
+    client = SimpleNamespace(
+        id=1, client_number="000567", name="Firma Testowa", short_name="FT", contact_person="Jan Kowalski",
+        phone="123456789", email="test@firma.pl", street="Testowa 1", postal_code="00-001", city="Warszawa",
+        nip="1234567890", delivery_company="Kurier", delivery_street="Dostawcza 2",
+        delivery_postal_code="00-002", delivery_city="Warszawa", updated_at=None,
+    )
+    item = SimpleNamespace(
+        id=order_id, order_id=order_id, width=Decimal("50"), height=Decimal("100"), material="Folia PET",
+        ordered_quantity=Decimal("10"), quantity_type="tyś", roll_length=Decimal("500"), core="76",
+        price=Decimal("12.5"), price_type="tyś", zam_rolki=20,
+    )
+    return SimpleNamespace(
+        id=order_id, order_number=order_number, order_date=datetime.date(2025, 6, 1),
+        delivery_date=datetime.date(2025, 6, 10), client_id=1, notes="Testowe zamówienie",
+        payment_term="14 dni", updated_at=None, is_done=False, done_at=None, done_by=None,
+        client=client, items=[item],
+    )
+
+def test_render_pdf_bytes_without_database(tmp_path):
+    import io
+    import pickle
+    from printing.order_confirmation import render_order_confirmation
+    from printing.production_ticket import render_production_ticket, render_production_tickets
+    from printing.pdf_output import save_pdf
+    from printing.render_jobs import order_to_plain, order_from_plain
+    order = _order_snapshot(1, "000567/TER")
+    other = _order_snapshot(2, "000568/TER")
+    results = [
+        render_order_confirmation(order, order.client, order.items),
+        render_production_ticket(order, order.client, order.items),
+        render_production_tickets([order, other]),
+    ]
+    for data in results:
+        assert isinstance(data, bytes)
+        assert data.startswith(b"%PDF")
+    buffer = io.BytesIO()
+    save_pdf(results[0], buffer)
+    assert buffer.getvalue() == results[0]
+    path = save_pdf(results[0], str(tmp_path / "pdf" / "potwierdzenie.pdf"))
+    with open(path, "rb") as f:
+        assert f.read() == results[0]
+    # Zadania puli procesów dostają dane przez pickle
+    plain = order_to_plain(order)
+    restored = pickle.loads(pickle.dumps(plain))
+    assert restored == plain
+    restored_order = order_from_plain(restored)
+    assert render_production_ticket(restored_order, restored_order.client, restored_order.items).startswith(b"%PDF")
\ No newline at end of file
@@ -0,0 +1,70 @@
+# utils/numbers.py
+# Zamiana liczb wpisywanych przez użytkownika ("12,5", "10 000", "100 m") na Decimal/int i z powrotem
+
+import re
+from decimal import Decimal, InvalidOperation
+
+# Liczba z separatorami, opcjonalnie z jednostką na końcu (np. "76 mm", "100 m", "1 000 szt")
+_NUMBER_RE = re.compile(r"^([+-]?[0-9][0-9.,]*)[^0-9.,]*$")
+_SPACES = (" ", " ", " ", "\t")
+
+def parse_decimal(value):
+    """
+    Zwraca Decimal albo None dla pustej wartości. Akceptuje przecinek dziesiętny,
+    spacje jako separator tysięcy i jednostkę na końcu. Dla nieczytelnej wartości
+    rzuca ValueError.
+    """
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    text = str(value).strip()
+    for space in _SPACES:
+        text = text.replace(space, "")
+    if not text:
+        return None
+    match = _NUMBER_RE.match(text)
+    if not match:
+        raise ValueError(f"Nieprawidłowa liczba: {value!r}")
+    number = match.group(1)
+    if "," in number and "." in number:
+        # Ostatni z separatorów jest dziesiętny, drugi oddziela tysiące
+        decimal_sep = "," if number.rfind(",") > number.rfind(".") else "."
+        thousands_sep = "." if decimal_sep == "," else ","
+        number = number.replace(thousands_sep, "").replace(decimal_sep, ".")
+    elif number.count(",") > 1 or number.count(".") > 1:
+        number = number.replace(",", "").replace(".", "")
+    else:
+        number = number.replace(",", ".")
+    try:
+        return Decimal(number)
+    except InvalidOperation:
+        raise ValueError(f"Nieprawidłowa liczba: {value!r}")
+
+def parse_int(value):
+    """Jak parse_decimal, ale wynik musi być liczbą całkowitą."""
+    number = parse_decimal(value)
+    if number is None:
+        return None
+    if number != number.to_integral_value():
+        raise ValueError(f"Oczekiwano liczby całkowitej: {value!r}")
+    return int(number)
+
+def format_decimal(value):
+    """
+    Liczba do wyświetlenia: bez zbędnych zer po przecinku, z przecinkiem dziesiętnym
+    ("12,5", "50"). Tekst i None są zwracane bez zmian / jako pusty napis.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, float):
+        value = Decimal(str(value))
+    if isinstance(value, Decimal):
+        if value == value.to_integral_value():
+            return str(value.quantize(Decimal(1)))
+        return format(value.normalize(), "f").replace(".", ",")
+    return str(value)
\ No newline at end of file
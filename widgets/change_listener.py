@@ -0,0 +1,74 @@
+import select
+import time
+from PySide6.QtCore import QThread, Signal
+from models.db import engine
+from models.change_notifications import CHANGES_CHANNEL, group_notifications
+from models.unit_of_work import connection_health
+
+class ChangeListener(QThread):
+    """
+    Wątek nasłuchujący LISTEN na kanale zmian bazy. Zmiany z innych stanowisk
+    są zbierane przez krótką chwilę i wysyłane jednym sygnałem changed(dict)
+    w postaci {"orders": {id, ...}, "clients": {id, ...}}.
+    """
+    changed = Signal(object)
+    connected_changed = Signal(bool)
+
+    BATCH_SECONDS = 0.2
+    RECONNECT_SECONDS = 5
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._running = True
+
+    def stop(self):
+        self._running = False
+        self.wait(3000)
+
+    def run(self):
+        while self._running:
+            connection = None
+            try:
+                connection = engine.raw_connection()
+                # Połączenie z LISTEN nie może wrócić do puli - odłączamy je
+                connection.detach()
+                dbapi_connection = getattr(connection, "driver_connection", None) or connection.connection
+                dbapi_connection.autocommit = True
+                cursor = dbapi_connection.cursor()
+                cursor.execute(f"LISTEN {CHANGES_CHANNEL}")
+                connection_health.report_ok()
+                self.connected_changed.emit(True)
+                self._listen(dbapi_connection)
+            except Exception as e:
+                # Nasłuch pierwszy zauważa zerwane połączenie - pokazujemy to w pasku bocznym
+                connection_health.report_failure(e)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+            self.connected_changed.emit(False)
+            # Ponowna próba połączenia po chwili (np. restart serwera)
+            for _ in range(self.RECONNECT_SECONDS * 10):
+                if not self._running:
+                    return
+                time.sleep(0.1)
+
+    def _listen(self, dbapi_connection):
+        while self._running:
+            if select.select([dbapi_connection], [], [], 1.0) == ([], [], []):
+                continue
+            payloads = []
+            deadline = time.monotonic() + self.BATCH_SECONDS
+            while True:
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    payloads.append(dbapi_connection.notifies.pop(0).payload)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                select.select([dbapi_connection], [], [], remaining)
+            changes = group_notifications(payloads)
+            if changes["orders"] or changes["clients"]:
+                self.changed.emit(changes)
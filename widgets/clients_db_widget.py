@@ -3,9 +3,12 @@ from PySide6.QtWidgets import (
     QHeaderView, QLineEdit, QDialog, QFormLayout, QMessageBox, QScrollArea, QSizePolicy, QComboBox
 )
 from PySide6.QtGui import QFont, QColor, QBrush
-from PySide6.QtCore import Qt, QSettings
-from models.db import Session
-from models.client import Client, CLIENT_NR_START
+from PySide6.QtCore import Qt, QSettings, Signal
+from models.unit_of_work import run_read, run_transaction
+from models.client import Client, peek_next_client_number
+from models.order_snapshot import load_client_snapshots
+from widgets.data_loader import get_data_loader
+from widgets.connection_status import show_db_error
 
 class ClientEditDialog(QDialog):
     def __init__(self, client=None, parent=None):
@@ -21,17 +24,16 @@ class ClientEditDialog(QDialog):
         bigger_font.setPointSizeF(base_point_size * 1.2)
         self.setFont(bigger_font)
 
-        session = Session()
+        # Dla nowego klienta pokazujemy przewidywany numer; jeśli użytkownik go nie zmieni,
+        # numer nada sekwencja przy zapisie (dwa stanowiska nie dostaną tego samego)
+        self.suggested_number = None
         if client:
             nr = client.client_number
         else:
-            last = session.query(Client).order_by(Client.client_number.desc()).first()
-            if last and last.client_number and last.client_number.isdigit():
-                next_nr = max(int(last.client_number) + 1, CLIENT_NR_START)
-            else:
-                next_nr = CLIENT_NR_START
-            nr = f"{next_nr:06d}"
-        session.close()
+            try:
+                nr = self.suggested_number = run_read(peek_next_client_number)
+            except Exception:
+                nr = ""
 
         nr_font = QFont(bigger_font)
         nr_font.setPointSizeF(bigger_font.pointSizeF() * 1.3)
@@ -120,8 +122,11 @@ class ClientEditDialog(QDialog):
         self.resize(int(500*1.2), int(600*1.2))
 
     def get_data(self):
+        client_number = self.nr_edit.text().strip()
+        if not self.client and client_number == self.suggested_number:
+            client_number = None
         return {
-            "client_number": self.nr_edit.text().strip(),
+            "client_number": client_number,
             "name": self.name_edit.text().strip(),
             "short_name": self.short_name_edit.text().strip(),
             "contact_person": self.contact_edit.text().strip(),
@@ -138,6 +143,8 @@ class ClientEditDialog(QDialog):
         }
 
 class ClientsDBWidget(QWidget):
+    refreshed = Signal()
+
     SETTINGS_ORG = "twoja_aplikacja"
     SETTINGS_APP = "clients_db_widget"
     SETTINGS_COLUMNS = "column_widths"
@@ -229,6 +236,9 @@ class ClientsDBWidget(QWidget):
         btns_row.addWidget(self.btn_edit)
         btns_row.addWidget(self.btn_delete)
         btns_row.addStretch(1)
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #888;")
+        btns_row.addWidget(self.status_label)
         layout.addLayout(btns_row)
 
         table_container = QScrollArea()
@@ -282,6 +292,12 @@ class ClientsDBWidget(QWidget):
 
         self._last_search_field = self.SEARCH_FIELDS[0][1]
         self._last_search_text = ""
+        # Osobny klucz ładowania dla każdej instancji (np. okno wyboru klienta)
+        self._load_key = ("clients", id(self))
+        # Id klientów czekających na odświeżenie wierszy - dołączane do kolejnego zapytania
+        self._pending_client_ids = set()
+        self.destroyed.connect(lambda *args, key=self._load_key: get_data_loader().cancel(key))
+        self.destroyed.connect(lambda *args, key=(self._load_key, "rows"): get_data_loader().cancel(key))
         self.search_combo.currentIndexChanged.connect(self._on_search_combo_changed)
         self.refresh_clients()
 
@@ -306,56 +322,62 @@ class ClientsDBWidget(QWidget):
                     pass
 
     def refresh_clients(self, search_field=None, search_text=""):
+        get_data_loader().cancel((self._load_key, "rows"))
+        self._pending_client_ids.clear()
+        self.status_label.setText("Ładowanie…")
+        get_data_loader().submit(
+            self._load_key,
+            lambda session: load_client_snapshots(session, search_field, search_text),
+            on_result=self._fill_table,
+            on_error=lambda error: self.status_label.setText("Błąd połączenia z bazą"),
+        )
+
+    def refresh_clients_by_id(self, client_ids):
+        """
+        Odświeża tylko wiersze podanych klientów (np. po powiadomieniu z bazy).
+        Nowy klient zmienia kolejność numerów, więc wtedy przeładowujemy całą listę.
+        """
+        self._pending_client_ids |= set(client_ids)
+        client_ids = set(self._pending_client_ids)
+        search_field, search_text = self._last_search_field, self._last_search_text
+        get_data_loader().submit(
+            (self._load_key, "rows"),
+            lambda session: load_client_snapshots(session, search_field, search_text, client_ids=client_ids),
+            on_result=lambda clients: self._replace_rows(client_ids, clients),
+            on_error=lambda error: self._pending_client_ids.difference_update(client_ids),
+        )
+
+    def _client_row(self, client_id):
+        for row in range(self.table.rowCount()):
+            item = self.table.item(row, 0)
+            if item is not None and item.data(Qt.UserRole) == client_id:
+                return row
+        return -1
+
+    def _replace_rows(self, client_ids, clients):
+        self._pending_client_ids -= client_ids
+        by_id = {client.id: client for client in clients}
+        for client_id in client_ids:
+            row = self._client_row(client_id)
+            if row < 0 and client_id in by_id:
+                self.refresh_clients(self._last_search_field, self._last_search_text)
+                return
+        for client_id in client_ids:
+            row = self._client_row(client_id)
+            if row < 0:
+                continue
+            if client_id in by_id:
+                self._set_row(row, by_id[client_id])
+            else:
+                self.table.removeRow(row)
+        self.refreshed.emit()
+
+    def _fill_table(self, clients):
+        self.status_label.setText("")
         self.table.setRowCount(0)
-        session = Session()
-        query = session.query(Client).order_by(Client.client_number.asc())
-        if search_field and search_text:
-            search = f"%{search_text.lower()}%"
-            col = getattr(Client, search_field)
-            query = query.filter(col.ilike(search))
-        clients = query.all()
         for row, client in enumerate(clients):
             self.table.insertRow(row)
-            delivery_address = " ".join(filter(None, [
-                client.delivery_company,
-                client.delivery_street,
-                client.delivery_postal_code,
-                client.delivery_city
-            ]))
-            for col, val in enumerate([
-                client.client_number or "",
-                client.name or "",
-                getattr(client, "short_name", "") or "",
-                client.contact_person or "",
-                client.phone or "",
-                client.email or "",
-                client.street or "",
-                client.postal_code or "",
-                client.city or "",
-                client.nip or "",
-                delivery_address
-            ]):
-                item = QTableWidgetItem(val)
-                font = self.table.font()
-                if col == 0:
-                    font_bold = QFont(font)
-                    font_bold.setBold(True)
-                    item.setFont(font_bold)
-                else:
-                    item.setFont(font)
-                item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                item.setFlags(item.flags() | Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-                item.setToolTip(val)
-                item.setData(Qt.TextWrapAnywhere, False)
-                if row % 2 == 0:
-                    bg = QColor("#f2f2f2")
-                else:
-                    bg = QColor("#ffffff")
-                item.setBackground(QBrush(bg))
-                if col == 10:
-                    item.setBackground(QBrush(QColor("#fffbc7")))
-                self.table.setItem(row, col, item)
-        session.close()
+            self._set_row(row, client)
         self.btn_edit.setEnabled(False)
         self.btn_delete.setEnabled(False)
         self.table.clearSelection()
@@ -363,6 +385,50 @@ class ClientsDBWidget(QWidget):
         min_row_height = 22
         for row in range(self.table.rowCount()):
             self.table.setRowHeight(row, min_row_height)
+        self.refreshed.emit()
+
+    def _set_row(self, row, client):
+        delivery_address = " ".join(filter(None, [
+            client.delivery_company,
+            client.delivery_street,
+            client.delivery_postal_code,
+            client.delivery_city
+        ]))
+        for col, val in enumerate([
+            client.client_number or "",
+            client.name or "",
+            getattr(client, "short_name", "") or "",
+            client.contact_person or "",
+            client.phone or "",
+            client.email or "",
+            client.street or "",
+            client.postal_code or "",
+            client.city or "",
+            client.nip or "",
+            delivery_address
+        ]):
+            item = QTableWidgetItem(val)
+            font = self.table.font()
+            if col == 0:
+                font_bold = QFont(font)
+                font_bold.setBold(True)
+                item.setFont(font_bold)
+            else:
+                item.setFont(font)
+            item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+            item.setFlags(item.flags() | Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+            item.setToolTip(val)
+            item.setData(Qt.TextWrapAnywhere, False)
+            if row % 2 == 0:
+                bg = QColor("#f2f2f2")
+            else:
+                bg = QColor("#ffffff")
+            item.setBackground(QBrush(bg))
+            if col == 10:
+                item.setBackground(QBrush(QColor("#fffbc7")))
+            if col == 0:
+                item.setData(Qt.UserRole, client.id)
+            self.table.setItem(row, col, item)
 
     def search_clients(self):
         search_text = self.search_edit.text().strip()
@@ -381,11 +447,13 @@ class ClientsDBWidget(QWidget):
         row = self.table.currentRow()
         if row < 0:
             return None
-        client_number = self.table.item(row, 0).text()
-        session = Session()
-        client = session.query(Client).filter_by(client_number=client_number).first()
-        session.close()
-        return client
+        client_id = self.table.item(row, 0).data(Qt.UserRole)
+        try:
+            clients = run_read(load_client_snapshots, client_ids=[client_id])
+        except Exception as e:
+            show_db_error(self, e)
+            return None
+        return clients[0] if clients else None
 
     def add_client(self):
         dlg = ClientEditDialog(parent=self)
@@ -394,16 +462,21 @@ class ClientsDBWidget(QWidget):
             if not data["name"]:
                 QMessageBox.warning(self, "Błąd", "Nazwa firmy jest wymagana.")
                 return
-            session = Session()
-            exists = session.query(Client).filter_by(client_number=data["client_number"]).first()
-            if exists:
+
+            def insert_client(session):
+                if data["client_number"] and session.query(Client).filter_by(client_number=data["client_number"]).first():
+                    return False
+                session.add(Client(**data))
+                return True
+
+            try:
+                added = run_transaction(insert_client)
+            except Exception as e:
+                show_db_error(self, e)
+                return
+            if not added:
                 QMessageBox.warning(self, "Błąd", f"Numer klienta {data['client_number']} już istnieje.")
-                session.close()
                 return
-            client = Client(**data)
-            session.add(client)
-            session.commit()
-            session.close()
             self.refresh_clients(self._last_search_field, self._last_search_text)
 
     def edit_client(self):
@@ -414,18 +487,24 @@ class ClientsDBWidget(QWidget):
         dlg = ClientEditDialog(client, parent=self)
         if dlg.exec() == QDialog.Accepted:
             data = dlg.get_data()
-            session = Session()
-            dbclient = session.query(Client).filter_by(id=client.id).first()
-            if dbclient.client_number != data["client_number"]:
-                exists = session.query(Client).filter_by(client_number=data["client_number"]).first()
-                if exists:
-                    QMessageBox.warning(self, "Błąd", f"Numer klienta {data['client_number']} już istnieje.")
-                    session.close()
-                    return
-            for k, v in data.items():
-                setattr(dbclient, k, v)
-            session.commit()
-            session.close()
+
+            def update_client(session):
+                dbclient = session.query(Client).filter_by(id=client.id).first()
+                if dbclient.client_number != data["client_number"]:
+                    if session.query(Client).filter_by(client_number=data["client_number"]).first():
+                        return False
+                for k, v in data.items():
+                    setattr(dbclient, k, v)
+                return True
+
+            try:
+                updated = run_transaction(update_client)
+            except Exception as e:
+                show_db_error(self, e)
+                return
+            if not updated:
+                QMessageBox.warning(self, "Błąd", f"Numer klienta {data['client_number']} już istnieje.")
+                return
             self.refresh_clients(self._last_search_field, self._last_search_text)
 
     def delete_client(self):
@@ -440,8 +519,9 @@ class ClientsDBWidget(QWidget):
         )
         if ret != QMessageBox.Yes:
             return
-        session = Session()
-        session.delete(client)
-        session.commit()
-        session.close()
+        try:
+            run_transaction(lambda session: session.query(Client).filter_by(id=client.id).delete())
+        except Exception as e:
+            show_db_error(self, e)
+            return
         self.refresh_clients(self._last_search_field, self._last_search_text)
\ No newline at end of file
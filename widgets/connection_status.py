@@ -0,0 +1,52 @@
+from PySide6.QtWidgets import QLabel, QMessageBox
+from PySide6.QtGui import QFont
+from PySide6.QtCore import QTimer, Signal
+from models.unit_of_work import connection_health, is_disconnect, check_connection, CommitUncertainError
+from widgets.data_loader import get_data_loader
+
+def show_db_error(parent, error):
+    """Komunikat dla użytkownika po nieudanej operacji na bazie."""
+    if isinstance(error, CommitUncertainError):
+        QMessageBox.warning(parent, "Błąd zapisu", str(error))
+    elif is_disconnect(error):
+        QMessageBox.warning(
+            parent, "Brak połączenia z bazą",
+            "Nie można połączyć się z bazą danych. Sprawdź sieć i spróbuj ponownie za chwilę."
+        )
+    else:
+        QMessageBox.critical(parent, "Błąd bazy danych", str(error))
+
+class ConnectionStatusLabel(QLabel):
+    """
+    Wskaźnik połączenia z bazą w pasku bocznym. Po utracie połączenia co kilka
+    sekund sprawdza w tle, czy baza znów odpowiada.
+    """
+    health_changed = Signal(bool, str)   # z dowolnego wątku -> wątek GUI
+
+    PROBE_INTERVAL_MS = 5000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFont(QFont("Segoe UI", 9))
+        self._probe_timer = QTimer(self)
+        self._probe_timer.setInterval(self.PROBE_INTERVAL_MS)
+        self._probe_timer.timeout.connect(self._probe)
+        self.health_changed.connect(self._show)
+        connection_health.add_listener(self.health_changed.emit)
+        self.destroyed.connect(lambda *args, callback=self.health_changed.emit: connection_health.remove_listener(callback))
+        self._show(connection_health.ok, connection_health.message)
+
+    def _show(self, ok, message):
+        if ok:
+            self.setText("● Baza danych: połączono")
+            self.setStyleSheet("color: #2bbd5c;")
+            self.setToolTip("")
+            self._probe_timer.stop()
+        else:
+            self.setText("● Brak połączenia z bazą")
+            self.setStyleSheet("color: #d9534f; font-weight: bold;")
+            self.setToolTip(message)
+            self._probe_timer.start()
+
+    def _probe(self):
+        get_data_loader().submit("connection_probe", check_connection, on_error=lambda error: None)
\ No newline at end of file
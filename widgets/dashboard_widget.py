@@ -4,6 +4,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QFont
 from .day_box import DayBox  # zakładamy, że DayBox jest w osobnym pliku widgets/day_box.py
+from .data_loader import get_data_loader
+from .refresh_scheduler import RefreshScheduler
 
 DAY_BOX_WIDTH = 340   # Stała szerokość kontenera dnia (dopasuj do siebie)
 
@@ -22,6 +24,11 @@ class DashboardWidget(QWidget):
         label.setFont(QFont("Segoe UI", 16, QFont.Bold))
         header_layout.addWidget(label)
         header_layout.addStretch(1)
+        self.loading_label = QLabel("Ładowanie…")
+        self.loading_label.setFont(QFont("Segoe UI", 10))
+        self.loading_label.setStyleSheet("color: #888;")
+        self.loading_label.hide()
+        header_layout.addWidget(self.loading_label)
         self.show_done_checkbox = QCheckBox("Pokaż zrealizowane")
         self.show_done_checkbox.setChecked(False)
         header_layout.addWidget(self.show_done_checkbox)
@@ -43,17 +50,43 @@ class DashboardWidget(QWidget):
 
         self.day_boxes = []
         self.cards_per_day = {}
+        self.cards_by_order_id = {}
+        self._cards_show_done = False
+        # Id zamówień czekających na odświeżenie fiszek - dołączane do kolejnego zapytania
+        self._pending_order_ids = set()
+        # True, gdy działa nasłuch zmian z bazy (LISTEN/NOTIFY) - wtedy nie trzeba
+        # sprawdzać bazy przy każdej aktywacji okna
+        self.live_updates = False
         self.populate_days()
-        self.show_done_checkbox.stateChanged.connect(self.refresh_cards)
-        # Odświeżamy tablicę zawsze po powrocie okna na wierzch (np. po dodaniu/klonowaniu)
+        get_data_loader().loading_changed.connect(self._on_loading_changed)
+        # Wszystkie prośby o odświeżenie idą przez jeden harmonogram (debounce + znacznik zmian)
+        self.refresh_scheduler = RefreshScheduler(self.refresh_cards, "dashboard", parent=self)
+        self.show_done_checkbox.stateChanged.connect(lambda *args: self.request_refresh("show_done", force=True))
+        # Po powrocie okna na wierzch (np. po dodaniu/klonowaniu) sprawdzamy, czy coś się zmieniło
         self.installEventFilter(self)
-        self.refresh_cards()
+        self.request_refresh("start", force=True)
 
     def eventFilter(self, obj, event):
-        if obj == self and event.type() == 24:  # QEvent.WindowActivate
-            QTimer.singleShot(100, self.refresh_cards)
+        if obj == self and event.type() == 24 and not self.live_updates:  # QEvent.WindowActivate
+            self.request_refresh("activate")
         return super().eventFilter(obj, event)
 
+    def request_refresh(self, reason="", force=False):
+        self.refresh_scheduler.request(reason, force=force)
+
+    def _on_loading_changed(self, key, loading):
+        if key == "dashboard":
+            if loading:
+                self.loading_label.setText("Ładowanie…")
+                self.loading_label.setToolTip("")
+            self.loading_label.setVisible(loading)
+
+    def _load_failed(self, error):
+        # Fiszki zostają w ostatnim znanym stanie; kolejne odświeżenie spróbuje ponownie
+        self.loading_label.setText("Błąd ładowania zamówień")
+        self.loading_label.setToolTip(str(error))
+        self.loading_label.show()
+
     def get_days(self):
         from datetime import datetime, timedelta
         today = datetime.today()
@@ -74,6 +107,7 @@ class DashboardWidget(QWidget):
                 widget.deleteLater()
         self.day_boxes = []
         self.cards_per_day = {}
+        self.cards_by_order_id = {}
 
         days = self.get_days()
         for idx, day in enumerate(days):
@@ -105,47 +139,119 @@ class DashboardWidget(QWidget):
         self.updateGeometry()
 
     def refresh_cards(self):
-        from models.db import Session
-        from sqlalchemy.orm import joinedload
-        from models.order import Order
-        from widgets.order_card import OrderCard  # import tutaj, żeby uniknąć cyklicznych importów
-        from widgets.done_orders_store import done_orders_store
+        from models.order_snapshot import load_order_snapshots
 
         show_done = self.show_done_checkbox.isChecked()
-        # WYCZYŚĆ zamówienia w każdym DayBox
-        for box in self.day_boxes:
-            if hasattr(box, "clear_orders"):
-                box.clear_orders()
+        # Przycisk "Przywróć" zależy od trybu - po przełączeniu budujemy fiszki od nowa
+        if show_done != self._cards_show_done:
+            self.clear_cards()
+            self._cards_show_done = show_done
+
+        # Pełne przeładowanie obejmuje też zamówienia czekające na odświeżenie pojedynczych fiszek
+        get_data_loader().cancel("dashboard_rows")
+        self._pending_order_ids.clear()
+
+        # Tylko zamówienia z zakresu widocznych dni; filtr zrealizowanych też w SQL.
+        # Zapytanie idzie w tle, fiszki aktualizujemy po nadejściu wyniku.
+        days = self.get_days()
+        get_data_loader().submit(
+            "dashboard",
+            lambda session: load_order_snapshots(
+                session,
+                start_date=days[0].date(),
+                end_date=days[-1].date(),
+                done=show_done,
+            ),
+            on_result=self._apply_orders,
+            on_error=self._load_failed,
+        )
+
+    def refresh_orders_by_id(self, order_ids):
+        """
+        Odświeża fiszki tylko podanych zamówień (np. po powiadomieniu z bazy o zmianie
+        na innym stanowisku). Pozostałe fiszki zostają nietknięte. Nowe zapytanie zastępuje
+        wcześniejsze, jeszcze niezakończone - obejmuje więc także ich zamówienia.
+        """
+        from models.order_snapshot import load_order_snapshots
+
+        self._pending_order_ids |= set(order_ids)
+        order_ids = set(self._pending_order_ids)
+        show_done = self.show_done_checkbox.isChecked()
+        days = self.get_days()
+        get_data_loader().submit(
+            "dashboard_rows",
+            lambda session: load_order_snapshots(
+                session,
+                start_date=days[0].date(),
+                end_date=days[-1].date(),
+                order_ids=order_ids,
+                done=show_done,
+            ),
+            on_result=lambda orders: self._orders_refreshed(order_ids, orders),
+            on_error=lambda error: self._pending_order_ids.difference_update(order_ids),
+        )
 
-        session = Session()
-        # WYMUSZAJ NAJŚWIEŻSZE DANE Z BAZY
-        session.expire_all()
-        orders = session.query(Order).options(joinedload(Order.client)).order_by(Order.delivery_date.asc()).all()
-        session.close()
+    def _orders_refreshed(self, order_ids, orders):
+        self._pending_order_ids -= order_ids
+        self._apply_orders(orders, scope=order_ids)
 
+    def _apply_orders(self, orders, scope=None):
+        visible = {}
         for order in orders:
-            if order.delivery_date:
-                day_str = order.delivery_date.strftime("%Y-%m-%d")
-            else:
-                continue
-            is_done = done_orders_store.is_done(order.id)
-            if show_done:
-                if not is_done:
-                    continue
-            else:
-                if is_done:
-                    continue
+            day_str = order.delivery_date.strftime("%Y-%m-%d")
             if day_str in self.cards_per_day:
+                visible[order.id] = (order, self.cards_per_day[day_str])
+        self.reconcile_cards(visible, scope)
+
+    def reconcile_cards(self, visible, scope=None):
+        """
+        Porównuje fiszki na tablicy z aktualnymi zamówieniami (klucz: id zamówienia)
+        i tworzy / przesuwa / aktualizuje / usuwa tylko te, które się zmieniły.
+        visible: {order_id: (migawka zamówienia, DayBox)}
+        scope: jeśli podany, usuwane mogą być tylko fiszki zamówień z tego zbioru
+        """
+        from widgets.order_card import OrderCard  # import tutaj, żeby uniknąć cyklicznych importów
+
+        changed = False
+        for order_id in list(self.cards_by_order_id):
+            if order_id not in visible and (scope is None or order_id in scope):
+                card = self.cards_by_order_id.pop(order_id)
+                if card.day_box:
+                    card.day_box.remove_order(card)
+                changed = True
+
+        for order_id, (order, box) in visible.items():
+            card = self.cards_by_order_id.get(order_id)
+            if card is None:
                 card = OrderCard(order, self)
-                # Dodanie fiszki do DayBoxa
-                self.cards_per_day[day_str].add_order(card)
                 # Podłączanie sygnałów
                 if hasattr(card, "arrow_btn"):
                     card.arrow_btn.clicked.connect(card.toggle_details)
-                card.mouseDoubleClickEvent = lambda event, o=order: self.open_edit_order(o)
+                card.mouseDoubleClickEvent = lambda event, c=card: self.open_edit_order(c.order)
                 card.setAcceptDrops(False)
-        self.update()
-        self.adjust_day_box_sizes()
+                self.cards_by_order_id[order_id] = card
+                box.add_order(card)
+                changed = True
+                continue
+            old_signature = card.signature
+            card.set_order(order)
+            if card.day_box is not box:
+                if card.day_box:
+                    card.day_box.remove_order(card, delete=False)
+                box.add_order(card)
+                changed = True
+            elif card.signature != old_signature:
+                changed = True
+
+        if changed:
+            self.update()
+            self.adjust_day_box_sizes()
+
+    def clear_cards(self):
+        for box in self.day_boxes:
+            if hasattr(box, "clear_orders"):
+                box.clear_orders()
+        self.cards_by_order_id = {}
 
     def archive_order_card(self, card):
         card.setParent(None)
@@ -156,15 +262,41 @@ class DashboardWidget(QWidget):
         w.show()
         # Automatycznie odśwież po zamknięciu okna edycji:
         if hasattr(w, "finished"):
-            w.finished.connect(self.refresh_cards)
+            w.finished.connect(lambda *args: self.request_refresh("edit"))
+
+    def print_day_tickets(self, day_box):
+        """Bilety produkcyjne wszystkich zamówień z kolumny dnia w jednym PDF."""
+        from PySide6.QtWidgets import QMessageBox
+        from printing.production_ticket import production_output_path
+        from printing.render_jobs import order_to_plain
+        from printing.pdf_output import open_pdf
+        from .pdf_render_service import get_render_service
+        orders = [card.order for card in day_box.orders]
+        if not orders:
+            QMessageBox.information(self, "Brak zamówień", "W tym dniu nie ma zamówień do wydruku.")
+            return
+        get_render_service().submit(
+            "production_batch", [order_to_plain(order) for order in orders],
+            production_output_path(f"PRODUKCJA_{day_box.day.strftime('%Y-%m-%d')}.pdf"),
+            on_result=open_pdf,
+            on_error=lambda error: QMessageBox.critical(self, "Błąd PDF", f"Wystąpił błąd podczas generowania PDF:\n{error}"),
+        )
 
     def handle_drop(self, order_id, target_day):
-        from models.db import Session
         from models.order import Order
-        session = Session()
-        order = session.query(Order).filter_by(id=order_id).one_or_none()
-        if order:
-            order.delivery_date = target_day
-            session.commit()
-        session.close()
-        self.refresh_cards()
\ No newline at end of file
+        from models.production_summary import order_weeks, refresh_summary_weeks, week_of
+        from models.unit_of_work import run_transaction
+        from widgets.connection_status import show_db_error
+
+        def move_order(session):
+            weeks = order_weeks(session, [order_id])
+            session.query(Order).filter_by(id=order_id).update(
+                {"delivery_date": target_day}, synchronize_session=False
+            )
+            refresh_summary_weeks(session, weeks | {week_of(target_day)})
+
+        try:
+            run_transaction(move_order)
+        except Exception as e:
+            show_db_error(self, e)
+        self.request_refresh("drop")
\ No newline at end of file
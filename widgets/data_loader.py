@@ -0,0 +1,122 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from sqlalchemy.orm import scoped_session
+from models.db import Session
+from models.unit_of_work import run_read
+
+# Osobna sesja dla każdego wątku puli - sesje SQLAlchemy nie są bezpieczne między wątkami
+worker_session = scoped_session(Session)
+
+MAX_WORKER_THREADS = 4
+
+class _JobSignals(QObject):
+    finished = Signal(object, int, object)   # klucz, generacja, wynik
+    failed = Signal(object, int, object)     # klucz, generacja, wyjątek
+
+class _Job(QRunnable):
+    def __init__(self, key, generation, fn, args, kwargs):
+        super().__init__()
+        # Zadanie trzymamy sami (patrz DataLoader._jobs), Qt nie może go usunąć
+        self.setAutoDelete(False)
+        self.key = key
+        self.generation = generation
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = _JobSignals()
+
+    def run(self):
+        try:
+            # Po zerwaniu połączenia odczyt jest ponawiany (patrz models.unit_of_work)
+            result = run_read(self.fn, *self.args, session_factory=worker_session, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(self.key, self.generation, e)
+        else:
+            self.signals.finished.emit(self.key, self.generation, result)
+
+class DataLoader(QObject):
+    """
+    Wykonuje zapytania do bazy w puli wątków i oddaje wyniki (zwykłe migawki,
+    nie obiekty ORM) do wątku GUI przez sygnały Qt.
+
+    Każde zadanie ma klucz (np. "dashboard"). Nowe zadanie z tym samym kluczem
+    unieważnia poprzednie: jeśli jeszcze nie wystartowało - zdejmujemy je z kolejki,
+    a jeśli już trwa - jego wynik zostanie po prostu pominięty.
+    """
+    loading_changed = Signal(object, bool)   # klucz, czy trwa ładowanie
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(MAX_WORKER_THREADS)
+        self._generations = {}
+        self._callbacks = {}
+        self._queued = {}
+        self._jobs = set()
+
+    def submit(self, key, fn, *args, on_result=None, on_error=None, **kwargs):
+        """
+        Uruchamia fn(session, *args, **kwargs) w tle. on_result(wynik) / on_error(wyjątek)
+        są wołane w wątku GUI i tylko dla najnowszego zadania o danym kluczu.
+        """
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+
+        stale = self._queued.pop(key, None)
+        if stale is not None and self.pool.tryTake(stale):
+            self._jobs.discard(stale)
+            self._callbacks.pop((key, stale.generation), None)
+
+        job = _Job(key, generation, fn, args, kwargs)
+        job.signals.finished.connect(self._on_finished)
+        job.signals.failed.connect(self._on_failed)
+        self._callbacks[(key, generation)] = (on_result, on_error)
+        self._queued[key] = job
+        self._jobs.add(job)
+        self.loading_changed.emit(key, True)
+        self.pool.start(job)
+        return generation
+
+    def is_loading(self, key):
+        return any(job.key == key for job in self._jobs)
+
+    def cancel(self, key):
+        """Unieważnia wszystkie zadania o danym kluczu."""
+        self._generations[key] = self._generations.get(key, 0) + 1
+        stale = self._queued.pop(key, None)
+        if stale is not None and self.pool.tryTake(stale):
+            self._jobs.discard(stale)
+        for callback_key in [k for k in self._callbacks if k[0] == key]:
+            self._callbacks.pop(callback_key, None)
+        self.loading_changed.emit(key, self.is_loading(key))
+
+    def _finish_job(self, key, generation):
+        for job in list(self._jobs):
+            if job.key == key and job.generation == generation:
+                self._jobs.discard(job)
+                if self._queued.get(key) is job:
+                    del self._queued[key]
+        callbacks = self._callbacks.pop((key, generation), (None, None))
+        if generation == self._generations.get(key):
+            self.loading_changed.emit(key, False)
+            return callbacks
+        return (None, None)
+
+    def _on_finished(self, key, generation, result):
+        on_result, _ = self._finish_job(key, generation)
+        if on_result:
+            on_result(result)
+
+    def _on_failed(self, key, generation, error):
+        # Bez on_error błąd jest pomijany; utratę połączenia i tak pokazuje connection_health
+        _, on_error = self._finish_job(key, generation)
+        if on_error:
+            on_error(error)
+
+_data_loader = None
+
+def get_data_loader():
+    """Wspólna instancja DataLoader (tworzona przy pierwszym użyciu, w wątku GUI)."""
+    global _data_loader
+    if _data_loader is None:
+        _data_loader = DataLoader()
+    return _data_loader
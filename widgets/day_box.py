@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import (
-    QGroupBox, QVBoxLayout, QWidget, QLabel, QMessageBox, QSizePolicy
+    QGroupBox, QVBoxLayout, QWidget, QLabel, QMessageBox, QSizePolicy, QPushButton
 )
 from PySide6.QtCore import Qt, QByteArray, QDataStream
 from PySide6.QtGui import QFont
@@ -66,6 +66,13 @@ class DayBox(QGroupBox):
         header_layout.addWidget(name_label)
         header_layout.addWidget(date_label)
 
+        print_button = QPushButton("🖨 Bilety produkcji")
+        print_button.setFont(QFont("Segoe UI", 9))
+        print_button.setToolTip("Wszystkie bilety produkcyjne z tego dnia w jednym PDF")
+        print_button.setStyleSheet(f"color: {color['fg']}; border: 1px solid {color['fg']}; border-radius: 5px; padding: 2px 6px;")
+        print_button.clicked.connect(lambda: self.dashboard.print_day_tickets(self))
+        header_layout.addWidget(print_button)
+
         self.orders = []
         self.max_orders = 20
 
@@ -104,21 +111,37 @@ class DayBox(QGroupBox):
         event.acceptProposedAction()
 
     def add_order(self, card):
-        self.orders.append(card)
-        self.orders_layout.addWidget(card)
-        self.orders_container.adjustSize()
-        self.adjustSize()
-        parent = self.parent()
-        if parent:
-            parent.adjustSize()
+        # Fiszki w dniu ułożone po numerze zamówienia - wstawiamy w odpowiednie miejsce
+        position = len(self.orders)
+        for i, existing in enumerate(self.orders):
+            if (card.order.order_number or "") < (existing.order.order_number or ""):
+                position = i
+                break
+        self.orders.insert(position, card)
+        self.orders_layout.insertWidget(position, card)
+        card.day_box = self
+        self._update_size()
+
+    def remove_order(self, card, delete=True):
+        if card in self.orders:
+            self.orders.remove(card)
+        self.orders_layout.removeWidget(card)
+        card.day_box = None
+        if delete:
+            card.setParent(None)
+            card.deleteLater()
+        self._update_size()
 
     def clear_orders(self):
         for card in self.orders:
             card.setParent(None)
             card.deleteLater()
         self.orders = []
+        self._update_size()
+
+    def _update_size(self):
         self.orders_container.adjustSize()
         self.adjustSize()
         parent = self.parent()
         if parent:
-            parent.adjustSize()
\ No newline at end of file
+            parent.adjustSize()
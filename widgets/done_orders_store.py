@@ -1,46 +1,67 @@
 import os
 import json
+import socket
+import getpass
+from sqlalchemy import func
+from models.unit_of_work import run_read, run_transaction
+from models.order import Order
 
 DONE_ORDERS_FILE = "done_orders_store.json"
 
+def current_user():
+    """Kto oznaczył zamówienie - użytkownik systemu i nazwa stanowiska."""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "?"
+    return f"{user}@{socket.gethostname()}"
+
 class DoneOrdersStore:
-    def __init__(self, filename=DONE_ORDERS_FILE):
-        self.filename = filename
-        self.done_ids = set()
-        self.load()
-
-    def load(self):
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                self.done_ids = set(data)
-            except Exception:
-                self.done_ids = set()
-        else:
-            self.done_ids = set()
-
-    def save(self):
-        try:
-            with open(self.filename, "w", encoding="utf-8") as f:
-                json.dump(list(self.done_ids), f)
-        except Exception:
-            pass
+    """
+    Stan "zrobione" zamówień trzymany w bazie (kolumny is_done / done_at / done_by),
+    więc jest wspólny dla wszystkich stanowisk i znika razem z usuniętym zamówieniem.
+    """
 
     def is_done(self, order_id):
-        return order_id in self.done_ids
+        return run_read(
+            lambda session: bool(session.query(Order.is_done).filter(Order.id == order_id).scalar())
+        )
+
+    def _set_done(self, order_ids, done):
+        values = {"is_done": done, "done_at": func.now() if done else None,
+                  "done_by": current_user() if done else None}
+        return run_transaction(
+            lambda session: session.query(Order).filter(Order.id.in_(list(order_ids))).update(
+                values, synchronize_session=False
+            )
+        )
 
     def mark_done(self, order_id):
-        self.done_ids.add(order_id)
-        self.save()
+        self._set_done([order_id], True)
+
+    def remove(self, order_id):
+        self._set_done([order_id], False)
 
     def clear_all(self):
-        self.done_ids.clear()
-        self.save()
+        run_transaction(
+            lambda session: session.query(Order).filter(Order.is_done == True).update(
+                {"is_done": False, "done_at": None, "done_by": None}, synchronize_session=False
+            )
+        )
 
-    def remove(self, order_id):
-        if order_id in self.done_ids:
-            self.done_ids.remove(order_id)
-            self.save()
+    def import_file(self, filename=DONE_ORDERS_FILE):
+        """
+        Jednorazowy import starego pliku done_orders_store.json do bazy.
+        Id zamówień, których już nie ma, są pomijane. Po imporcie plik dostaje
+        rozszerzenie .imported, żeby nie importować go ponownie.
+        Zwraca liczbę oznaczonych zamówień albo None, jeśli pliku nie ma.
+        """
+        if not os.path.exists(filename):
+            return None
+        with open(filename, "r", encoding="utf-8") as f:
+            order_ids = {int(order_id) for order_id in json.load(f)}
+        count = self._set_done(order_ids, True) if order_ids else 0
+        os.replace(filename, filename + ".imported")
+        return count
 
 done_orders_store = DoneOrdersStore()
\ No newline at end of file
@@ -8,6 +8,7 @@ from datetime import datetime, date, timedelta
 from models.db import Session
 from models.orderitem import OrderItem
 from widgets.done_orders_store import done_orders_store
+from widgets.connection_status import show_db_error
 from widgets.order_details_dialog import OrderDetailsDialog
 
 def count_workdays(start_date, end_date):
@@ -22,62 +23,56 @@ def count_workdays(start_date, end_date):
             count += step
     return count
 
+def get_gradient_for_shipping_days(workdays_left):
+    if workdays_left is None:
+        return "#ffffff", "#ffffff"
+    if workdays_left < 0:
+        return "#ff6666", "#ffffff"
+    elif workdays_left == 0:
+        return "#ffe600", "#ffffff"
+    elif workdays_left == 1:
+        return "#ffc966", "#ffffff"
+    elif workdays_left == 2:
+        return "#b2d7ff", "#ffffff"
+    elif workdays_left == 3:
+        return "#b5e7b2", "#ffffff"
+    elif workdays_left == 4:
+        return "#cccccc", "#ffffff"
+    else:
+        return "#ffffff", "#ffffff"
+
+def get_delivery_date(order):
+    if hasattr(order, "delivery_date") and order.delivery_date is not None:
+        if isinstance(order.delivery_date, datetime):
+            return order.delivery_date.date()
+        elif isinstance(order.delivery_date, date):
+            return order.delivery_date
+        else:
+            try:
+                return datetime.strptime(str(order.delivery_date), "%Y-%m-%d").date()
+            except Exception:
+                return None
+    return None
+
+def card_signature(order):
+    """
+    Wszystko, co fiszka pokazuje - jeśli się nie zmieniło, fiszki nie trzeba odświeżać.
+    Dzisiejsza data wchodzi w sygnaturę, bo od niej zależy kolor fiszki.
+    """
+    client_name = order.client.name if getattr(order, "client", None) else None
+    return (order.order_number, client_name, get_delivery_date(order), date.today())
+
 class OrderCard(QFrame):
     def __init__(self, order, dashboard, parent=None):
         super().__init__(parent)
         self.order = order
         self.dashboard = dashboard
         self.details_dialog = None
-
-        today = date.today()
-        delivery_date = None
-        if hasattr(order, "delivery_date") and order.delivery_date is not None:
-            if isinstance(order.delivery_date, datetime):
-                delivery_date = order.delivery_date.date()
-            elif isinstance(order.delivery_date, date):
-                delivery_date = order.delivery_date
-            else:
-                try:
-                    delivery_date = datetime.strptime(str(order.delivery_date), "%Y-%m-%d").date()
-                except Exception:
-                    delivery_date = None
-
-        if delivery_date:
-            workdays_left = count_workdays(today, delivery_date)
-        else:
-            workdays_left = None
-
-        def get_gradient_for_shipping_days(workdays_left):
-            if workdays_left is None:
-                return "#ffffff", "#ffffff"
-            if workdays_left < 0:
-                return "#ff6666", "#ffffff"
-            elif workdays_left == 0:
-                return "#ffe600", "#ffffff"
-            elif workdays_left == 1:
-                return "#ffc966", "#ffffff"
-            elif workdays_left == 2:
-                return "#b2d7ff", "#ffffff"
-            elif workdays_left == 3:
-                return "#b5e7b2", "#ffffff"
-            elif workdays_left == 4:
-                return "#cccccc", "#ffffff"
-            else:
-                return "#ffffff", "#ffffff"
-
-        grad_start, grad_end = get_gradient_for_shipping_days(workdays_left)
+        self.day_box = None
+        self.signature = None
 
         self.setFrameShape(QFrame.Box)
         self.setLineWidth(2)
-        self.setStyleSheet(
-            "QFrame {{"
-            "    background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 {start}, stop:1 {end});"
-            "    border: 2px solid #7eb7e6;"
-            "    border-radius: 4px;"
-            "    max-width: 100%;"
-            "}}"
-            .format(start=grad_start, end=grad_end)
-        )
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Minimum)
 
         layout = QVBoxLayout(self)
@@ -86,20 +81,16 @@ class OrderCard(QFrame):
 
         header_row = QHBoxLayout()
         header_row.setSpacing(8)
-        if hasattr(order, 'client') and order.client:
-            client_name = order.client.name
-        else:
-            client_name = "—"
 
-        klient_label = QLabel(client_name)
-        klient_label.setFont(QFont("Segoe UI", 9, QFont.Bold))
-        klient_label.setStyleSheet("color: #2574a9")
-        klient_label.setWordWrap(True)
-        klient_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+        self.klient_label = QLabel()
+        self.klient_label.setFont(QFont("Segoe UI", 9, QFont.Bold))
+        self.klient_label.setStyleSheet("color: #2574a9")
+        self.klient_label.setWordWrap(True)
+        self.klient_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
 
-        nr_label = QLabel("Zamówienie: {}".format(order.order_number))
-        nr_label.setFont(QFont("Segoe UI", 9, QFont.Bold))
-        nr_label.setStyleSheet(
+        self.nr_label = QLabel()
+        self.nr_label.setFont(QFont("Segoe UI", 9, QFont.Bold))
+        self.nr_label.setStyleSheet(
             "QLabel {{"
             "    background: #111;"
             "    color: #fff;"
@@ -109,11 +100,11 @@ class OrderCard(QFrame):
             "    font-weight: bold;"
             "}}"
         )
-        nr_label.setMinimumWidth(150)
-        nr_label.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Preferred)
+        self.nr_label.setMinimumWidth(150)
+        self.nr_label.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Preferred)
 
-        header_row.addWidget(klient_label, stretch=2)
-        header_row.addWidget(nr_label, stretch=0)
+        header_row.addWidget(self.klient_label, stretch=2)
+        header_row.addWidget(self.nr_label, stretch=0)
         header_row.addStretch(1)
 
         self.arrow_btn = QToolButton()
@@ -140,6 +131,38 @@ class OrderCard(QFrame):
             self.restore_btn.clicked.connect(self.restore_to_dashboard)
         layout.addLayout(btn_row)
         self.setMouseTracking(True)
+        self.set_order(order)
+
+    def set_order(self, order):
+        """Aktualizuje fiszkę nowymi danymi zamówienia bez tworzenia jej od nowa."""
+        self.order = order
+        signature = card_signature(order)
+        if signature == self.signature:
+            return
+        self.signature = signature
+
+        delivery_date = get_delivery_date(order)
+        if delivery_date:
+            workdays_left = count_workdays(date.today(), delivery_date)
+        else:
+            workdays_left = None
+        grad_start, grad_end = get_gradient_for_shipping_days(workdays_left)
+        self.setStyleSheet(
+            "QFrame {{"
+            "    background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 {start}, stop:1 {end});"
+            "    border: 2px solid #7eb7e6;"
+            "    border-radius: 4px;"
+            "    max-width: 100%;"
+            "}}"
+            .format(start=grad_start, end=grad_end)
+        )
+
+        if hasattr(order, 'client') and order.client:
+            client_name = order.client.name
+        else:
+            client_name = "—"
+        self.klient_label.setText(client_name)
+        self.nr_label.setText("Zamówienie: {}".format(order.order_number))
 
     def _dialog_closed(self):
         self.arrow_btn.setArrowType(Qt.DownArrow)
@@ -175,8 +198,12 @@ class OrderCard(QFrame):
         msgbox.setTextInteractionFlags(Qt.TextSelectableByMouse)
         ret = msgbox.exec()
         if ret == QMessageBox.Yes:
-            done_orders_store.mark_done(self.order.id)
-            self.dashboard.refresh_cards()
+            try:
+                done_orders_store.mark_done(self.order.id)
+            except Exception as e:
+                show_db_error(self, e)
+                return
+            self.dashboard.request_refresh("done", force=True)
 
     def restore_to_dashboard(self):
         reply = QMessageBox.question(
@@ -189,8 +216,12 @@ class OrderCard(QFrame):
             QMessageBox.Yes | QMessageBox.No
         )
         if reply == QMessageBox.Yes:
-            done_orders_store.remove(self.order.id)
-            self.dashboard.refresh_cards()
+            try:
+                done_orders_store.remove(self.order.id)
+            except Exception as e:
+                show_db_error(self, e)
+                return
+            self.dashboard.request_refresh("done", force=True)
 
     def resizeEvent(self, event):
         parent = self.parent()
@@ -4,8 +4,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtGui import QFont
 from PySide6.QtCore import Qt
-from models.db import Session
-from models.orderitem import OrderItem
+from utils.numbers import format_decimal
 
 class OrderDetailsDialog(QDialog):
     def __init__(self, order, parent=None):
@@ -43,9 +42,8 @@ class OrderDetailsDialog(QDialog):
         layout.addSpacing(12)
 
         # --- Tabela pozycji produkcyjnych ---
-        session = Session()
-        order_items = session.query(OrderItem).filter_by(order_id=order.id).all()
-        session.close()
+        # order to migawka z models.order_snapshot - pozycje są już załadowane
+        order_items = order.items
         table_headers = ["#", "Materiał", "Wymiar", "Ilość", "Rodzaj", "Nawój", "Rdzeń"]
         prod_items = [item for item in order_items if getattr(item, "width", None) not in (None, '', 0)]
         table = QTableWidget(len(prod_items), len(table_headers))
@@ -53,11 +51,12 @@ class OrderDetailsDialog(QDialog):
         for row_idx, item in enumerate(prod_items):
             table.setItem(row_idx, 0, QTableWidgetItem(str(row_idx+1)))
             table.setItem(row_idx, 1, QTableWidgetItem(str(getattr(item, "material", "") or "")))
-            wymiar = f"{getattr(item, 'width', '') or ''} x {getattr(item, 'height', '') or ''}" if getattr(item, "height", None) not in (None, '', 0) else f"{getattr(item, 'width', '') or ''}"
+            width, height = format_decimal(getattr(item, "width", None)), format_decimal(getattr(item, "height", None))
+            wymiar = f"{width} x {height}" if getattr(item, "height", None) not in (None, '', 0) else width
             table.setItem(row_idx, 2, QTableWidgetItem(wymiar.strip()))
-            table.setItem(row_idx, 3, QTableWidgetItem(str(getattr(item, "ordered_quantity", "") or "")))
+            table.setItem(row_idx, 3, QTableWidgetItem(format_decimal(getattr(item, "ordered_quantity", None))))
             table.setItem(row_idx, 4, QTableWidgetItem(str(getattr(item, "quantity_type", "") or "")))
-            table.setItem(row_idx, 5, QTableWidgetItem(str(getattr(item, "roll_length", "") or "")))
+            table.setItem(row_idx, 5, QTableWidgetItem(format_decimal(getattr(item, "roll_length", None))))
             table.setItem(row_idx, 6, QTableWidgetItem(str(getattr(item, "core", "") or "")))
         table.verticalHeader().setVisible(False)
         table.setShowGrid(True)
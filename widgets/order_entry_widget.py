@@ -8,12 +8,18 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QDate
 from PySide6.QtGui import QFont, QFontMetrics, QColor, QPalette, QTextCharFormat
 from datetime import date
-from models.db import Session
+from sqlalchemy import func
+from models.unit_of_work import run_read, run_transaction
 from models.order import Order
 from models.client import Client
-from models.orderitem import OrderItem
+from models.orderitem import save_order_items
 from models.order_sequence import get_next_order_number
+from models.production_summary import order_weeks, refresh_summary_weeks, week_of
+from models.order_snapshot import load_order_snapshot, load_client_snapshots
+from utils.numbers import parse_decimal, parse_int, format_decimal
 from widgets.clients_db_widget import ClientsDBWidget, ClientEditDialog
+from widgets.connection_status import show_db_error
+from printing.pdf_cache import invalidate_orders
 
 HOLIDAYS_2025 = [
     datetime.date(2025, 1, 1),
@@ -138,6 +144,8 @@ class ClientSelectDialog(QDialog):
             }
         """)
         table.itemDoubleClicked.connect(self._handle_choose)
+        # Lista klientów ładuje się w tle - dopasowujemy rozmiar po jej nadejściu
+        self.clients_widget.refreshed.connect(self.adjust_table_size)
         self.choose_btn.clicked.connect(self._handle_choose)
         self.cancel_btn.clicked.connect(self.reject)
 
@@ -574,8 +582,8 @@ class OrderEntryWidget(QWidget):
 
         def update_zam_rolki():
             try:
-                val_ilosc = float(ilosc.text().replace(",", ".") or "0")
-                val_nawoj = float(naw_dlug.text().replace(",", ".") or "0")
+                val_ilosc = float(parse_decimal(ilosc.text()) or 0)
+                val_nawoj = float(parse_decimal(naw_dlug.text()) or 0)
                 typ = typ_ilosci.currentText().strip()
                 if typ == "tyś.":
                     if val_nawoj > 0 and val_ilosc > 0:
@@ -601,7 +609,8 @@ class OrderEntryWidget(QWidget):
             "zam. ilość": ilosc, "Typ ilości": typ_ilosci,
             "nawój/długość": naw_dlug, "Rdzeń": rdzen,
             "Rdzeń_inny": rdzen_inny_edit,
-            "zam. rolki": zam_rolki
+            "zam. rolki": zam_rolki,
+            "item_id": None   # id pozycji w bazie przy edycji zamówienia
         }
         self.prod_fields.append(prod_dict)
         self.prod_blocks.append(prod_block)
@@ -640,10 +649,9 @@ class OrderEntryWidget(QWidget):
         self.prod_container.updateGeometry()
 
     def fill_from_order(self, order, as_new=False):
-        session = Session()
-        client = session.query(Client).filter_by(id=order.client_id).first()
-        items = session.query(OrderItem).filter_by(order_id=order.id).all()
-        session.close()
+        snapshot = run_read(lambda session: load_order_snapshot(order.id, session))
+        client = snapshot.client if snapshot else None
+        items = snapshot.items if snapshot else []
         if as_new:
             self.nr_edit.setText("")
         else:
@@ -680,8 +688,10 @@ class OrderEntryWidget(QWidget):
         for idx, item in enumerate(items):
             self.add_prod_block(idx+1)
             p = self.prod_fields[-1]
-            p["Szerokość"].setText(str(item.width))
-            p["Wysokość"].setText(str(item.height))
+            if not as_new:
+                p["item_id"] = item.id
+            p["Szerokość"].setText(format_decimal(item.width))
+            p["Wysokość"].setText(format_decimal(item.height))
             if item.material in MATERIAL_OPTIONS:
                 p["Rodzaj materiału"].setCurrentText(item.material)
             else:
@@ -690,9 +700,9 @@ class OrderEntryWidget(QWidget):
                     p["Rodzaj materiału"].setCurrentIndex(idx_inny)
                     p["Rodzaj materiału"].setEditable(True)
                     p["Rodzaj materiału"].setCurrentText(item.material)
-            p["zam. ilość"].setText(str(item.ordered_quantity))
+            p["zam. ilość"].setText(format_decimal(item.ordered_quantity))
             p["Typ ilości"].setCurrentText(item.quantity_type)
-            p["nawój/długość"].setText(item.roll_length)
+            p["nawój/długość"].setText(format_decimal(item.roll_length))
             # obsługa "Rdzeń"
             if item.core and item.core not in RDZEN_OPTIONS:
                 idx_inny = p["Rdzeń"].findText("inny")
@@ -704,7 +714,7 @@ class OrderEntryWidget(QWidget):
                 p["Rdzeń"].setCurrentText(item.core or "")
                 p["Rdzeń_inny"].setVisible(False)
                 p["Rdzeń_inny"].setText("")
-            p["Cena"].setText(getattr(item, "price", "") or "")
+            p["Cena"].setText(format_decimal(getattr(item, "price", None)))
             if hasattr(item, "price_type"):
                 p["CenaTyp"].setCurrentText(item.price_type or "za 1 tyś")
 
@@ -734,19 +744,49 @@ class OrderEntryWidget(QWidget):
         dlg = ClientEditDialog(parent=self)
         if dlg.exec() == QDialog.Accepted:
             data = dlg.get_data()
-            session = Session()
-            client = Client(**data)
-            session.add(client)
-            session.commit()
+
+            def insert_client(session):
+                client = Client(**data)
+                session.add(client)
+                session.flush()
+                return load_client_snapshots(session, client_ids=[client.id])[0]
+
+            try:
+                client = run_transaction(insert_client)
+            except Exception as e:
+                show_db_error(self, e)
+                return
             if self.main_window and hasattr(self.main_window, "clients_db"):
                 try:
                     self.main_window.clients_db.refresh_clients()
                 except Exception:
                     pass
-            session.refresh(client)
-            session.close()
             self.fill_from_client(client)
 
+    def _item_values(self, p):
+        """Wartości jednej pozycji z formularza (klucze jak kolumny OrderItem)."""
+        try:
+            zam_rolki = parse_int(p["zam. rolki"].text())
+        except ValueError:
+            zam_rolki = None
+        if p["Rdzeń"].currentText() == "inny":
+            core_value = p["Rdzeń_inny"].text().strip()
+        else:
+            core_value = p["Rdzeń"].currentText().strip()
+        return {
+            "id": p["item_id"],
+            "width": p["Szerokość"].text().strip(),
+            "height": p["Wysokość"].text().strip(),
+            "material": p["Rodzaj materiału"].currentText().strip(),
+            "ordered_quantity": p["zam. ilość"].text().strip(),
+            "quantity_type": p["Typ ilości"].currentText().strip(),
+            "roll_length": p["nawój/długość"].text().strip(),
+            "core": core_value,
+            "price": p["Cena"].text().strip(),
+            "price_type": p["CenaTyp"].currentText().strip(),
+            "zam_rolki": zam_rolki,
+        }
+
     def save_order(self):
         if not self.zamawiajacy_fields[0].text().strip():
             QMessageBox.warning(self, "Błąd", "Podaj nazwę firmy.")
@@ -771,6 +811,15 @@ class OrderEntryWidget(QWidget):
             )
             return
 
+        # Pola liczbowe pozycji - akceptujemy "12,5", "10 000", "100 m" itp., ale nie dowolny tekst
+        for index, p in enumerate(self.prod_fields):
+            for label in ("Szerokość", "Wysokość", "zam. ilość", "nawój/długość", "Cena"):
+                try:
+                    parse_decimal(p[label].text())
+                except ValueError:
+                    QMessageBox.warning(self, "Błąd", f"Pozycja {index+1}: pole \"{label}\" musi być liczbą.")
+                    return
+
         confirm = QMessageBox(self)
         confirm.setWindowTitle("Potwierdzenie zapisu")
         confirm.setText("Jesteś pewny, że chcesz zapisać zamówienie?")
@@ -789,58 +838,49 @@ class OrderEntryWidget(QWidget):
             order_date_qdate.day()
         )
 
-        session = Session()
-        if self.edit_order:
-            order = session.query(Order).get(self.edit_order.id)
-            if order is None:
-                QMessageBox.critical(self, "Błąd", "Nie znaleziono zamówienia w bazie.")
-                session.close()
-                return
-            order.order_date = order_date
-            order.delivery_date = delivery_date
-            order.notes = self.uwagi_textedit.toPlainText().strip()
-            order.client_id = self.selected_client.id
-            order.payment_term = self.termin_platnosci_combo.currentText()
-            session.query(OrderItem).filter_by(order_id=order.id).delete()
-        else:
-            order_number = get_next_order_number(session)
-            self.nr_edit.setText(order_number)
-            order = Order(
-                order_number=order_number,
-                order_date=order_date,
-                delivery_date=delivery_date,
-                notes=self.uwagi_textedit.toPlainText().strip(),
-                client_id=self.selected_client.id,
-                payment_term=self.termin_platnosci_combo.currentText()
-            )
-            session.add(order)
-            session.flush()
-
-        for p in self.prod_fields:
-            zam_rolki_val = p["zam. rolki"].text().strip()
-            try:
-                zam_rolki = int(zam_rolki_val) if zam_rolki_val else None
-            except Exception:
-                zam_rolki = None
-            if p["Rdzeń"].currentText() == "inny":
-                core_value = p["Rdzeń_inny"].text().strip()
+        items = [self._item_values(p) for p in self.prod_fields]
+
+        def save(session):
+            # Cała transakcja jest budowana od zera - po zerwaniu połączenia run_transaction ją powtórzy
+            if self.edit_order:
+                order = session.query(Order).get(self.edit_order.id)
+                if order is None:
+                    return None
+                weeks = order_weeks(session, [order.id])
+                order.order_date = order_date
+                order.delivery_date = delivery_date
+                order.notes = self.uwagi_textedit.toPlainText().strip()
+                order.client_id = self.selected_client.id
+                order.payment_term = self.termin_platnosci_combo.currentText()
+                # Zmiana samych pozycji też musi przesunąć znacznik zmian zamówienia
+                order.updated_at = func.now()
             else:
-                core_value = p["Rdzeń"].currentText().strip()
-            item = OrderItem(
-                order_id=order.id,
-                width=p["Szerokość"].text().strip(),
-                height=p["Wysokość"].text().strip(),
-                material=p["Rodzaj materiału"].currentText().strip(),
-                ordered_quantity=p["zam. ilość"].text().strip(),
-                quantity_type=p["Typ ilości"].currentText().strip(),
-                roll_length=p["nawój/długość"].text().strip(),
-                core=core_value,
-                price=p["Cena"].text().strip(),
-                price_type=p["CenaTyp"].currentText().strip(),
-                zam_rolki=zam_rolki
-            )
-            session.add(item)
-        session.commit()
-        session.close()
+                order = Order(
+                    order_number=get_next_order_number(session),
+                    order_date=order_date,
+                    delivery_date=delivery_date,
+                    notes=self.uwagi_textedit.toPlainText().strip(),
+                    client_id=self.selected_client.id,
+                    payment_term=self.termin_platnosci_combo.currentText()
+                )
+                session.add(order)
+                session.flush()
+                weeks = set()
+            save_order_items(session, order.id, items)
+            refresh_summary_weeks(session, weeks | {week_of(delivery_date)})
+            return order.order_number
+
+        try:
+            order_number = run_transaction(save)
+        except Exception as e:
+            show_db_error(self, e)
+            return
+        if order_number is None:
+            QMessageBox.critical(self, "Błąd", "Nie znaleziono zamówienia w bazie.")
+            return
+        if self.edit_order:
+            # Wcześniej wygenerowane wydruki tego zamówienia są już nieaktualne
+            invalidate_orders([self.edit_order.id])
+        self.nr_edit.setText(order_number)
         if self.after_save_callback:
             self.after_save_callback()
@@ -1,20 +1,31 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableView,
     QHeaderView, QPushButton, QMessageBox, QSizePolicy, QDialog,
-    QAbstractItemView, QFrame, QScrollArea, QGroupBox, QGridLayout
+    QAbstractItemView, QScrollArea, QGroupBox, QGridLayout, QLineEdit, QComboBox,
+    QCheckBox, QDateEdit
 )
-from PySide6.QtGui import QFont, QColor, QDesktopServices
-from PySide6.QtCore import Qt, QSettings, QUrl
+from PySide6.QtGui import QFont
+from PySide6.QtCore import Qt, QSettings, QDate
 import os
-from decimal import Decimal, InvalidOperation
 
-from models.db import Session
-from models.client import Client
+from models.unit_of_work import run_read, run_transaction
 from models.order import Order
 from models.orderitem import OrderItem
+from models.order_snapshot import load_order_snapshot, load_order_snapshots, count_orders
+from models.production_summary import order_weeks, refresh_summary_weeks
+from widgets.orders_table_model import (
+    OrdersTableModel, MultiLineDelegate, format_currency, PRICE_COLUMN, PRODUCTION_COLUMN, SORT_KEYS
+)
 from widgets.order_details_dialog import OrderDetailsDialog
-from printing.order_confirmation import export_order_to_pdf
-from printing.production_ticket import export_production_ticket
+from widgets.order_entry_widget import MATERIAL_OPTIONS
+from widgets.data_loader import get_data_loader
+from widgets.connection_status import show_db_error
+from utils.numbers import format_decimal
+from printing.production_ticket import production_output_path
+from printing.render_jobs import order_to_plain
+from printing.pdf_cache import invalidate_orders
+from printing.pdf_output import open_pdf
+from widgets.pdf_render_service import get_render_service
 
 class OrdersDBWidget(QWidget):
     SETTINGS_ORG = "twoja_aplikacja"
@@ -90,38 +101,109 @@ class OrdersDBWidget(QWidget):
             button.setEnabled(False)
             button.setMinimumWidth(button.sizeHint().width() + 18)
             buttons_row.addWidget(button)
+
+        self.button_print_range = QPushButton("Bilety produkcji z zakresu dat")
+        self.button_print_range.setStyleSheet(self.button_orange)
+        self.button_print_range.setFont(QFont("Segoe UI", 10, QFont.Bold))
+        self.button_print_range.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Fixed)
+        self.button_print_range.setToolTip("Bilety wszystkich zamówień pasujących do filtrów (z zakresem dat wysyłki) w jednym PDF")
+        buttons_row.addWidget(self.button_print_range)
         buttons_row.addStretch(1)
         layout.addLayout(buttons_row)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(10)
-        self.table.setHorizontalHeaderLabels([
-            "Nr zamówienia", "Data zamówienia", "Data wysyłki",
-            "Klient", "Telefon", "Miasto", "Termin płatności", "Cena", "Dane produkcji", "Uwagi"
-        ])
+        # --- Pasek filtrów (wszystko liczone po stronie bazy) ---
+        filters_row = QHBoxLayout()
+        self.filter_client = QLineEdit()
+        self.filter_client.setPlaceholderText("Klient / nr klienta")
+        self.filter_client.setMinimumWidth(180)
+        self.filter_date_enabled = QCheckBox("Wysyłka od:")
+        self.filter_date_from = QDateEdit(QDate.currentDate().addDays(-30))
+        self.filter_date_from.setCalendarPopup(True)
+        self.filter_date_from.setDisplayFormat("yyyy-MM-dd")
+        self.filter_date_to = QDateEdit(QDate.currentDate().addDays(30))
+        self.filter_date_to.setCalendarPopup(True)
+        self.filter_date_to.setDisplayFormat("yyyy-MM-dd")
+        self.filter_material = QComboBox()
+        self.filter_material.setEditable(True)
+        self.filter_material.addItems([""] + [m for m in MATERIAL_OPTIONS if m != "Inny (dopisz ręcznie)"])
+        self.filter_material.lineEdit().setPlaceholderText("Materiał")
+        self.filter_material.setMinimumWidth(160)
+        self.filter_width = QLineEdit()
+        self.filter_width.setPlaceholderText("Szer.")
+        self.filter_width.setMaximumWidth(70)
+        self.filter_height = QLineEdit()
+        self.filter_height.setPlaceholderText("Wys.")
+        self.filter_height.setMaximumWidth(70)
+        self.filter_notes = QLineEdit()
+        self.filter_notes.setPlaceholderText("Uwagi zawierają...")
+        self.filter_notes.setMinimumWidth(160)
+        self.button_filter = QPushButton("Filtruj")
+        self.button_filter.setStyleSheet(self.button_violet)
+        self.button_clear_filters = QPushButton("Wyczyść")
+        self.button_clear_filters.setStyleSheet(self.button_red)
+        self.orders_count_label = QLabel("")
+        self.orders_count_label.setFont(QFont("Segoe UI", 10))
+
+        filters_row.addWidget(self.filter_client)
+        filters_row.addWidget(self.filter_date_enabled)
+        filters_row.addWidget(self.filter_date_from)
+        filters_row.addWidget(QLabel("do:"))
+        filters_row.addWidget(self.filter_date_to)
+        filters_row.addWidget(self.filter_material)
+        filters_row.addWidget(self.filter_width)
+        filters_row.addWidget(QLabel("x"))
+        filters_row.addWidget(self.filter_height)
+        filters_row.addWidget(self.filter_notes)
+        filters_row.addWidget(self.button_filter)
+        filters_row.addWidget(self.button_clear_filters)
+        filters_row.addStretch(1)
+        filters_row.addWidget(self.orders_count_label)
+        layout.addLayout(filters_row)
+
+        self.model = OrdersTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setItemDelegateForColumn(PRICE_COLUMN, MultiLineDelegate(parent=self.table))
+        self.table.setItemDelegateForColumn(PRODUCTION_COLUMN, MultiLineDelegate(separators=True, parent=self.table))
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(MultiLineDelegate.MIN_HEIGHT)
+        self.table.setWordWrap(False)
         self.table.setFont(QFont("Segoe UI", 11))
         self.table.horizontalHeader().setFont(QFont("Segoe UI", 11, QFont.Bold))
         self.table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.table.setSelectionMode(QAbstractItemView.SingleSelection)
         self.table.setStyleSheet("""
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: #409cff;
                 color: white;
             }
         """)
+        # Wysokość liczymy tylko dla nowo dociągniętych wierszy, nie dla całej tabeli
+        self.model.rowsInserted.connect(self._resize_inserted_rows)
+        self.model.page_failed.connect(self._page_failed)
+        # Sortowanie po kliknięciu w nagłówek wykonuje ORDER BY w bazie
+        self.table.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        # Kolumny bez sortowania w bazie (cena, dane produkcji) nie mogą przestawić wskaźnika
+        self.table.horizontalHeader().sortIndicatorChanged.connect(self._keep_sort_indicator)
 
         layout.addWidget(self.table, stretch=1)
 
-        self.table.itemSelectionChanged.connect(self.handle_selection)
+        self.table.selectionModel().selectionChanged.connect(self.handle_selection)
         self.button_view.clicked.connect(self.view_selected_order)
         self.button_edit.clicked.connect(self.edit_selected_order)
         self.button_copy.clicked.connect(self.copy_selected_order)
         self.button_delete.clicked.connect(self.delete_selected_order)
         self.button_print.clicked.connect(self.show_print_dialog)
+        self.button_print_range.clicked.connect(self.print_production_range)
+        self.button_filter.clicked.connect(self.apply_filters)
+        self.button_clear_filters.clicked.connect(self.clear_filters)
+        for edit in (self.filter_client, self.filter_width, self.filter_height, self.filter_notes):
+            edit.returnPressed.connect(self.apply_filters)
+        self.filter_material.lineEdit().returnPressed.connect(self.apply_filters)
 
         self.setMinimumSize(1200, 700)
         self.resize(1400, 800)
@@ -141,13 +223,13 @@ class OrdersDBWidget(QWidget):
 
     def save_column_widths(self):
         settings = QSettings(self.SETTINGS_ORG, self.SETTINGS_APP)
-        widths = [self.table.columnWidth(i) for i in range(self.table.columnCount())]
+        widths = [self.table.columnWidth(i) for i in range(self.model.columnCount())]
         settings.setValue(self.SETTINGS_COLUMNS, widths)
 
     def restore_column_widths(self):
         settings = QSettings(self.SETTINGS_ORG, self.SETTINGS_APP)
         widths = settings.value(self.SETTINGS_COLUMNS)
-        if widths and len(widths) == self.table.columnCount():
+        if widths and len(widths) == self.model.columnCount():
             for i, width in enumerate(widths):
                 try:
                     self.table.setColumnWidth(i, int(width))
@@ -155,139 +237,58 @@ class OrdersDBWidget(QWidget):
                     pass
 
     def format_currency(self, value):
-        try:
-            d = Decimal(str(value).replace(',', '.'))
-        except (InvalidOperation, TypeError):
-            return str(value)
-        return f"{d:,.2f} zł".replace(',', ' ').replace('.', ',')
+        return format_currency(value)
+
+    def _keep_sort_indicator(self, column, order):
+        if SORT_KEYS[column] is not None:
+            return
+        header = self.table.horizontalHeader()
+        header.blockSignals(True)
+        header.setSortIndicator(*self.model.sort_state())
+        header.blockSignals(False)
+
+    def _resize_inserted_rows(self, parent, first, last):
+        for row in range(first, last + 1):
+            self.table.resizeRowToContents(row)
+
+    def current_filters(self):
+        filters = {
+            "client": self.filter_client.text().strip(),
+            "material": self.filter_material.currentText().strip(),
+            "width": self.filter_width.text().strip(),
+            "height": self.filter_height.text().strip(),
+            "notes": self.filter_notes.text().strip(),
+        }
+        if self.filter_date_enabled.isChecked():
+            filters["date_from"] = self.filter_date_from.date().toPython()
+            filters["date_to"] = self.filter_date_to.date().toPython()
+        return {key: value for key, value in filters.items() if value}
+
+    def apply_filters(self):
+        self.model.set_filters(self.current_filters())
+        self._after_reload()
+
+    def clear_filters(self):
+        for edit in (self.filter_client, self.filter_width, self.filter_height, self.filter_notes):
+            edit.clear()
+        self.filter_material.setCurrentIndex(0)
+        self.filter_date_enabled.setChecked(False)
+        self.apply_filters()
 
     def refresh_orders(self):
-        session = Session()
-        def safe_order_number(order):
-            try:
-                return int(order.order_number)
-            except Exception:
-                return order.order_number or ""
-        orders = session.query(Order).all()
-        orders = sorted(orders, key=safe_order_number)
-
-        self.table.setRowCount(0)
-        for row_index, order in enumerate(orders):
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            client = session.query(Client).filter_by(id=order.client_id).first()
-            items = session.query(OrderItem).filter_by(order_id=order.id).all()
-            production_items = [
-                (item, index) for index, item in enumerate(items)
-                if item.width is not None and str(item.width).strip() != ""
-            ]
-
-            order_number_item = QTableWidgetItem(order.order_number or "")
-            order_number_item.setFont(QFont("Segoe UI", 10, QFont.Bold))
-            self.table.setItem(row, 0, order_number_item)
-
-            order_date_item = QTableWidgetItem(order.order_date.strftime("%Y-%m-%d") if order.order_date else "")
-            order_date_item.setFont(QFont("Segoe UI", 10))
-            self.table.setItem(row, 1, order_date_item)
-
-            delivery_date_item = QTableWidgetItem(order.delivery_date.strftime("%Y-%m-%d") if order.delivery_date else "")
-            delivery_date_item.setFont(QFont("Segoe UI", 10))
-            self.table.setItem(row, 2, delivery_date_item)
-
-            client_name_item = QTableWidgetItem(client.name if client else "")
-            client_name_item.setFont(QFont("Segoe UI", 10))
-            self.table.setItem(row, 3, client_name_item)
-
-            client_phone_item = QTableWidgetItem(client.phone if client else "")
-            client_phone_item.setFont(QFont("Segoe UI", 10))
-            self.table.setItem(row, 4, client_phone_item)
-
-            client_city_item = QTableWidgetItem(client.city if client else "")
-            client_city_item.setFont(QFont("Segoe UI", 10))
-            self.table.setItem(row, 5, client_city_item)
-
-            payment_term = getattr(order, "payment_term", None)
-            if not payment_term and items:
-                payment_term = getattr(items[0], "payment_term", None)
-            if not payment_term:
-                payment_term = ""
-            payment_term_item = QTableWidgetItem(payment_term)
-            payment_term_item.setFont(QFont("Segoe UI", 10))
-            self.table.setItem(row, 6, payment_term_item)
-
-            # Cena - obsługa wielu pozycji, wartości walutowe
-            if production_items:
-                price_lines = []
-                for item, _ in production_items:
-                    width = str(getattr(item, "width", "") or "")
-                    height = str(getattr(item, "height", "") or "")
-                    price = getattr(item, "price", "")
-                    price_type = getattr(item, "price_type", "")
-                    if price:
-                        prefix = f"{width}x{height}/"
-                        formatted_price = self.format_currency(price)
-                        if "rolk" in (price_type or "").lower():
-                            price_line = f"{prefix}{formatted_price} /rolkę"
-                        else:
-                            price_line = f"{prefix}{formatted_price} /tyś."
-                        price_lines.append(price_line)
-                price_display = "\n".join(price_lines)
-            else:
-                price_display = ""
-            price_item = QTableWidgetItem(price_display)
-            price_item.setFont(QFont("Segoe UI", 10))
-            price_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            self.table.setItem(row, 7, price_item)
-
-            def format_prod(item):
-                # Zamiana zam.tyś na zam. rolki
-                return (
-                    f"{item.material}, {item.width}x{item.height} mm, {item.ordered_quantity} {item.quantity_type}, "
-                    f"nawój: {item.roll_length}, rdzeń: {item.core}, "
-                    f"cena: {item.price} {item.price_type}, "
-                    f"zam. rolki: {getattr(item, 'zam_rolki', '')}"
-                )
-            prod_col = 8
-            if len(production_items) == 0:
-                production_label = QLabel("Brak pozycji")
-                production_label.setFont(QFont("Segoe UI", 10))
-                self.table.setCellWidget(row, prod_col, production_label)
-                self.table.setRowHeight(row, 28)
-            else:
-                production_widget = QWidget()
-                production_layout = QVBoxLayout(production_widget)
-                production_layout.setContentsMargins(0, 0, 0, 0)
-                production_layout.setSpacing(0)
-                height_per_row = 20
-                total_prod_rows = 0
-                for (item, index) in production_items:
-                    label = QLabel(f"{index+1}. {format_prod(item)}")
-                    label.setFont(QFont("Segoe UI", 10))
-                    production_layout.addWidget(label)
-                    total_prod_rows += 1
-                    if index < len(production_items)-1:
-                        separator = QFrame()
-                        separator.setFrameShape(QFrame.HLine)
-                        separator.setFrameShadow(QFrame.Sunken)
-                        separator.setStyleSheet("color: #e0e0e0;")
-                        production_layout.addWidget(separator)
-                        total_prod_rows += 1
-                self.table.setCellWidget(row, prod_col, production_widget)
-                self.table.setRowHeight(row, max(28, total_prod_rows * height_per_row))
-
-            notes_item = QTableWidgetItem(order.notes or "")
-            notes_item.setFont(QFont("Segoe UI", 10))
-            self.table.setItem(row, 9, notes_item)
-
-            base_background = "#ffffff" if row_index % 2 == 0 else "#f2f2f2"
-            for column in range(self.table.columnCount()):
-                item = self.table.item(row, column)
-                if item:
-                    item.setBackground(QColor(base_background))
-            cell_widget = self.table.cellWidget(row, prod_col)
-            if cell_widget:
-                cell_widget.setStyleSheet(f"background: {base_background};")
-        session.close()
+        self.model.reload()
+        self._after_reload()
+
+    def refresh_orders_by_id(self, order_ids):
+        """
+        Odświeża tylko wczytane wiersze zmienionych zamówień (powiadomienie z bazy).
+        Nowe zamówienia pojawią się przy następnym przeładowaniu - tu tylko liczymy je na nowo.
+        """
+        self.model.refresh_orders_by_id(order_ids)
+        self._update_count()
+
+    def _after_reload(self):
+        self._update_count()
         self.button_view.setEnabled(False)
         self.button_edit.setEnabled(False)
         self.button_copy.setEnabled(False)
@@ -297,8 +298,24 @@ class OrdersDBWidget(QWidget):
         self.table.clearSelection()
         self.highlight_selected_row()
 
-    def handle_selection(self):
-        selected = self.table.selectedItems()
+    def _update_count(self):
+        filters = self.model.filters()
+        self.orders_count_label.setText("Ładowanie…")
+        self.orders_count_label.setToolTip("")
+        get_data_loader().submit(
+            "orders_count",
+            lambda session: count_orders(filters, session),
+            on_result=lambda count: self.orders_count_label.setText(f"Znaleziono: {count}"),
+            on_error=lambda error: self.orders_count_label.setText("Błąd połączenia z bazą"),
+        )
+
+    def _page_failed(self, error):
+        # Dalsze strony nie będą pobierane - ponowna próba po "Filtruj" albo odświeżeniu
+        self.orders_count_label.setText("Błąd ładowania zamówień")
+        self.orders_count_label.setToolTip(str(error))
+
+    def handle_selection(self, *args):
+        selected = self.table.selectionModel().selectedRows()
         if not selected:
             self.button_view.setEnabled(False)
             self.button_edit.setEnabled(False)
@@ -309,12 +326,7 @@ class OrdersDBWidget(QWidget):
             self.table.clearSelection()
             self.highlight_selected_row()
             return
-        row = self.table.currentRow()
-        order_number = self.table.item(row, 0).text()
-        session = Session()
-        order = session.query(Order).filter_by(order_number=order_number).first()
-        self.selected_order_id = order.id if order else None
-        session.close()
+        self.selected_order_id = self.model.order_id(selected[0].row())
         if self.selected_order_id:
             self.button_view.setEnabled(True)
             self.button_edit.setEnabled(True)
@@ -335,10 +347,11 @@ class OrdersDBWidget(QWidget):
     def get_selected_order(self):
         if not self.selected_order_id:
             return None
-        session = Session()
-        order = session.query(Order).filter_by(id=self.selected_order_id).first()
-        session.close()
-        return order
+        try:
+            return run_read(lambda session: load_order_snapshot(self.selected_order_id, session))
+        except Exception as e:
+            show_db_error(self, e)
+            return None
 
     def view_selected_order(self):
         order = self.get_selected_order()
@@ -456,24 +469,29 @@ class OrdersDBWidget(QWidget):
         order = self.get_selected_order()
         if not order:
             return
-        session = Session()
         result = QMessageBox.question(self, "Potwierdź usunięcie", f"Czy na pewno usunąć zamówienie nr {order.order_number}?", QMessageBox.Yes | QMessageBox.No)
         if result != QMessageBox.Yes:
-            session.close()
             return
-        session.query(OrderItem).filter_by(order_id=order.id).delete()
-        session.delete(order)
-        session.commit()
-        session.close()
+
+        def delete_order(session):
+            weeks = order_weeks(session, [order.id])
+            session.query(OrderItem).filter_by(order_id=order.id).delete()
+            session.query(Order).filter_by(id=order.id).delete()
+            refresh_summary_weeks(session, weeks)
+
+        try:
+            run_transaction(delete_order)
+        except Exception as e:
+            show_db_error(self, e)
+            return
+        invalidate_orders([order.id])
         self.refresh_orders()
         if self.refresh_dashboard_callback:
             self.refresh_dashboard_callback()
 
     def show_order_dialog_v4(self, order):
-        session = Session()
-        client = session.query(Client).filter_by(id=order.client_id).first()
-        items = session.query(OrderItem).filter_by(order_id=order.id).all()
-        session.close()
+        client = order.client
+        items = order.items
         dialog = QDialog(self)
         dialog.setWindowTitle(f"Podgląd zamówienia {order.order_number}")
         dialog.resize(900, 700)
@@ -507,10 +525,11 @@ class OrdersDBWidget(QWidget):
                 continue
             # Zamiana zam.tyś na zam. rolki
             label = QLabel(
-                f"{index+1}. Szer: {item.width} mm, Wys: {item.height} mm, "
-                f"Materiał: {item.material}, Ilość: {item.ordered_quantity} {item.quantity_type}, "
-                f"Nawój: {item.roll_length}, Rdzeń: {item.core}, "
-                f"Cena: {item.price} {item.price_type}, Zam. rolki: {getattr(item, 'zam_rolki', '')}"
+                f"{index+1}. Szer: {format_decimal(item.width)} mm, Wys: {format_decimal(item.height)} mm, "
+                f"Materiał: {item.material}, Ilość: {format_decimal(item.ordered_quantity)} {item.quantity_type}, "
+                f"Nawój: {format_decimal(item.roll_length)}, Rdzeń: {item.core}, "
+                f"Cena: {format_decimal(item.price)} {item.price_type}, "
+                f"Zam. rolki: {format_decimal(getattr(item, 'zam_rolki', ''))}"
             )
             label.setFont(QFont("Segoe UI", 11))
             production_layout.addWidget(label)
@@ -575,15 +594,43 @@ class OrdersDBWidget(QWidget):
         button_production.clicked.connect(print_for_production_action)
         dialog.exec()
 
+    def print_production_range(self):
+        filters = self.current_filters()
+        if "date_from" not in filters:
+            QMessageBox.warning(self, "Brak zakresu dat", "Zaznacz \"Wysyłka od:\" i ustaw zakres dat wysyłki.")
+            return
+        self.button_print_range.setEnabled(False)
+        get_data_loader().submit(
+            "print_production_range",
+            lambda session: load_order_snapshots(session, filters=filters),
+            on_result=lambda orders: self._print_production_tickets(orders, filters),
+            on_error=self._print_range_failed,
+        )
+
+    def _print_range_failed(self, error):
+        self.button_print_range.setEnabled(True)
+        show_db_error(self, error)
+
+    def _print_production_tickets(self, orders, filters):
+        self.button_print_range.setEnabled(True)
+        if not orders:
+            QMessageBox.information(self, "Brak zamówień", "Żadne zamówienie nie pasuje do filtrów.")
+            return
+        filename = f"PRODUKCJA_{filters['date_from']:%Y-%m-%d}_{filters['date_to']:%Y-%m-%d}.pdf"
+        get_render_service().submit(
+            "production_batch", [order_to_plain(order) for order in orders], production_output_path(filename),
+            on_result=open_pdf, on_error=self._render_failed,
+        )
+
+    def _render_failed(self, error):
+        QMessageBox.critical(self, "Błąd PDF", f"Wystąpił błąd podczas generowania PDF:\n{error}")
+
     def print_for_client(self):
         order = self.get_selected_order()
         if not order:
             QMessageBox.warning(self, "Brak zamówienia", "Nie wybrano zamówienia do wydruku.")
             return
-        session = Session()
-        client = session.query(Client).filter_by(id=order.client_id).first()
-        items = session.query(OrderItem).filter_by(order_id=order.id).all()
-        session.close()
+        client = order.client
         output_dir = r"c:\potwierdzenia dla klienta"
         if not os.path.exists(output_dir):
             os.makedirs(output_dir, exist_ok=True)
@@ -591,21 +638,18 @@ class OrdersDBWidget(QWidget):
         safe_order = "".join(c for c in str(order.order_number) if c.isalnum() or c in "._-")
         filename = f"{safe_order}_{safe_name}.pdf"
         output_path = os.path.join(output_dir, filename)
-        try:
-            export_order_to_pdf(order, client, items, output_path)
-            QDesktopServices.openUrl(QUrl.fromLocalFile(output_path))
-        except Exception as e:
-            QMessageBox.critical(self, "Błąd PDF", f"Wystąpił błąd podczas generowania PDF:\n{e}")
+        # PDF powstaje w osobnym procesie - okno nie zamiera
+        get_render_service().submit(
+            "confirmation", order_to_plain(order), output_path,
+            on_result=open_pdf, on_error=self._render_failed,
+        )
 
     def print_for_production(self):
         order = self.get_selected_order()
         if not order:
             QMessageBox.warning(self, "Brak zamówienia", "Nie wybrano zamówienia do wydruku.")
             return
-        session = Session()
-        client = session.query(Client).filter_by(id=order.client_id).first()
-        items = session.query(OrderItem).filter_by(order_id=order.id).all()
-        session.close()
+        client = order.client
         output_dir = r"c:\produkcja"
         if not os.path.exists(output_dir):
             os.makedirs(output_dir, exist_ok=True)
@@ -613,8 +657,7 @@ class OrdersDBWidget(QWidget):
         safe_order = "".join(c for c in str(order.order_number) if c.isalnum() or c in "._-")
         filename = f"{safe_order}_{safe_name}_PRODUKCJA.pdf"
         output_path = os.path.join(output_dir, filename)
-        try:
-            export_production_ticket(order, client, items, output_path)
-            QDesktopServices.openUrl(QUrl.fromLocalFile(output_path))
-        except Exception as e:
-            QMessageBox.critical(self, "Błąd PDF", f"Wystąpił błąd podczas generowania PDF:\n{e}")
\ No newline at end of file
+        get_render_service().submit(
+            "production", order_to_plain(order), output_path,
+            on_result=open_pdf, on_error=self._render_failed,
+        )
\ No newline at end of file
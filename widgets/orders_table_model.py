@@ -0,0 +1,287 @@
+from PySide6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem, QStyle, QApplication
+from PySide6.QtGui import QFont, QColor, QFontMetrics
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QRect, QSize, Signal
+from decimal import Decimal, InvalidOperation
+
+from models.order_snapshot import load_order_snapshots
+from utils.numbers import format_decimal
+from widgets.data_loader import get_data_loader
+
+ORDER_COLUMNS = [
+    "Nr zamówienia", "Data zamówienia", "Data wysyłki",
+    "Klient", "Telefon", "Miasto", "Termin płatności", "Cena", "Dane produkcji", "Uwagi"
+]
+PRICE_COLUMN = 7
+PRODUCTION_COLUMN = 8
+# Klucze sortowania po stronie bazy (None = kolumna nie jest sortowalna)
+SORT_KEYS = [
+    "order_number", "order_date", "delivery_date",
+    "client", "phone", "city", "payment_term", None, None, "notes"
+]
+
+def format_currency(value):
+    try:
+        d = Decimal(str(value).replace(',', '.'))
+    except (InvalidOperation, TypeError):
+        return str(value)
+    return f"{d:,.2f} zł".replace(',', ' ').replace('.', ',')
+
+def format_production_item(item):
+    # Zamiana zam.tyś na zam. rolki
+    return (
+        f"{item.material}, {format_decimal(item.width)}x{format_decimal(item.height)} mm, "
+        f"{format_decimal(item.ordered_quantity)} {item.quantity_type}, "
+        f"nawój: {format_decimal(item.roll_length)}, rdzeń: {item.core}, "
+        f"cena: {format_decimal(item.price)} {item.price_type}, "
+        f"zam. rolki: {format_decimal(getattr(item, 'zam_rolki', ''))}"
+    )
+
+def order_row_values(order):
+    """Tekst wszystkich kolumn tabeli dla jednej migawki zamówienia."""
+    client = order.client
+    production_items = [
+        (item, index) for index, item in enumerate(order.items)
+        if item.width is not None and str(item.width).strip() != ""
+    ]
+
+    payment_term = getattr(order, "payment_term", None) or ""
+
+    # Cena - obsługa wielu pozycji, wartości walutowe
+    price_lines = []
+    for item, _ in production_items:
+        price = getattr(item, "price", "")
+        if price:
+            prefix = f"{format_decimal(item.width)}x{format_decimal(item.height)}/"
+            if "rolk" in (item.price_type or "").lower():
+                price_lines.append(f"{prefix}{format_currency(price)} /rolkę")
+            else:
+                price_lines.append(f"{prefix}{format_currency(price)} /tyś.")
+
+    if production_items:
+        production = "\n".join(f"{index+1}. {format_production_item(item)}" for item, index in production_items)
+    else:
+        production = "Brak pozycji"
+
+    return [
+        order.order_number or "",
+        order.order_date.strftime("%Y-%m-%d") if order.order_date else "",
+        order.delivery_date.strftime("%Y-%m-%d") if order.delivery_date else "",
+        client.name if client else "",
+        client.phone if client else "",
+        client.city if client else "",
+        payment_term,
+        "\n".join(price_lines),
+        production,
+        order.notes or "",
+    ]
+
+class OrdersTableModel(QAbstractTableModel):
+    """
+    Model tabeli zamówień pobierający dane stronami (canFetchMore/fetchMore)
+    w miarę przewijania - w pamięci są tylko już obejrzane wiersze.
+    """
+    PAGE_SIZE = 200
+    page_failed = Signal(object)   # wyjątek - strona nie została pobrana
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._order_ids = []
+        self._rows = []
+        self._has_more = True
+        self._fetching = False
+        self._filters = {}
+        self._sort_key = "order_number"
+        self._descending = False
+        # Id wierszy czekających na odświeżenie - dołączane do kolejnego zapytania
+        self._pending_ids = set()
+        self._font = QFont("Segoe UI", 10)
+        self._font_bold = QFont("Segoe UI", 10, QFont.Bold)
+        self._backgrounds = (QColor("#ffffff"), QColor("#f2f2f2"))
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(ORDER_COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return ORDER_COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role == Qt.DisplayRole:
+            return self._rows[row][column]
+        if role == Qt.FontRole:
+            return self._font_bold if column == 0 else self._font
+        if role == Qt.BackgroundRole:
+            return self._backgrounds[row % 2]
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignLeft | Qt.AlignVCenter)
+        if role == Qt.UserRole:
+            return self._order_ids[row]
+        return None
+
+    def order_id(self, row):
+        if 0 <= row < len(self._order_ids):
+            return self._order_ids[row]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._has_more and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._has_more or self._fetching:
+            return
+        # Strona jest pobierana w tle; nowsze żądanie (np. po zmianie filtra) unieważnia starsze
+        self._fetching = True
+        filters = dict(self._filters)
+        sort_key, descending, offset = self._sort_key, self._descending, len(self._rows)
+        get_data_loader().submit(
+            "orders_page",
+            lambda session: load_order_snapshots(
+                session, filters=filters, sort_key=sort_key, descending=descending,
+                limit=self.PAGE_SIZE, offset=offset
+            ),
+            on_result=self._append_page,
+            on_error=self._page_failed,
+        )
+
+    def _page_failed(self, error):
+        self._fetching = False
+        self._has_more = False
+        self.page_failed.emit(error)
+
+    def _append_page(self, orders):
+        self._fetching = False
+        self._has_more = len(orders) == self.PAGE_SIZE
+        if not orders:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(orders) - 1)
+        for order in orders:
+            self._order_ids.append(order.id)
+            self._rows.append(order_row_values(order))
+        self.endInsertRows()
+
+    def sort_state(self):
+        """Kolumna i kierunek bieżącego sortowania - do przywrócenia wskaźnika w nagłówku."""
+        return SORT_KEYS.index(self._sort_key), Qt.DescendingOrder if self._descending else Qt.AscendingOrder
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        sort_key = SORT_KEYS[column] if 0 <= column < len(SORT_KEYS) else None
+        if sort_key is None:
+            return
+        descending = order == Qt.DescendingOrder
+        if (sort_key, descending) == (self._sort_key, self._descending):
+            return
+        self._sort_key = sort_key
+        self._descending = descending
+        self.reload()
+
+    def set_filters(self, filters):
+        self._filters = dict(filters or {})
+        self.reload()
+
+    def filters(self):
+        return dict(self._filters)
+
+    def refresh_orders_by_id(self, order_ids):
+        """
+        Odświeża tylko wczytane wiersze podanych zamówień (np. po powiadomieniu
+        z bazy). Zamówienia usunięte lub niepasujące już do filtra znikają z tabeli.
+        Zwraca zbiór id, których nie ma wśród wczytanych wierszy (np. nowe zamówienia).
+        Nowe zapytanie zastępuje wcześniejsze, jeszcze niezakończone - obejmuje ich wiersze.
+        """
+        loaded = set(order_ids) & set(self._order_ids)
+        self._pending_ids = (self._pending_ids | loaded) & set(self._order_ids)
+        if self._pending_ids:
+            pending = set(self._pending_ids)
+            filters = dict(self._filters)
+            get_data_loader().submit(
+                "orders_rows",
+                lambda session: load_order_snapshots(session, order_ids=pending, filters=filters),
+                on_result=lambda orders: self._replace_rows(pending, orders),
+                on_error=lambda error: self._pending_ids.difference_update(pending),
+            )
+        return set(order_ids) - loaded
+
+    def _replace_rows(self, order_ids, orders):
+        self._pending_ids -= order_ids
+        by_id = {order.id: order for order in orders}
+        for row in reversed(range(len(self._order_ids))):
+            order_id = self._order_ids[row]
+            if order_id not in order_ids:
+                continue
+            if order_id in by_id:
+                self._rows[row] = order_row_values(by_id[order_id])
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(ORDER_COLUMNS) - 1))
+            else:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._order_ids[row]
+                del self._rows[row]
+                self.endRemoveRows()
+
+    def reload(self):
+        # Pełne przeładowanie zastępuje odświeżanie pojedynczych wierszy
+        get_data_loader().cancel("orders_rows")
+        self._pending_ids.clear()
+        self.beginResetModel()
+        self._order_ids = []
+        self._rows = []
+        self._has_more = True
+        self._fetching = False
+        self.endResetModel()
+        self.fetchMore()
+
+class MultiLineDelegate(QStyledItemDelegate):
+    """Rysuje wielolinijkowe komórki (ceny, dane produkcji) bez widgetów w komórkach."""
+    LINE_HEIGHT = 20
+    MIN_HEIGHT = 28
+
+    def __init__(self, separators=False, parent=None):
+        super().__init__(parent)
+        self.separators = separators
+        self._separator_color = QColor("#e0e0e0")
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        lines = (opt.text or "").split("\n")
+        opt.text = ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+
+        painter.save()
+        painter.setFont(opt.font)
+        if opt.state & QStyle.State_Selected:
+            text_color = opt.palette.highlightedText().color()
+        else:
+            text_color = opt.palette.text().color()
+        rect = opt.rect.adjusted(4, 0, -4, 0)
+        top = rect.top() + max(0, (rect.height() - len(lines) * self.LINE_HEIGHT) // 2)
+        for i, line in enumerate(lines):
+            line_rect = QRect(rect.left(), top + i * self.LINE_HEIGHT, rect.width(), self.LINE_HEIGHT)
+            painter.setPen(text_color)
+            painter.drawText(line_rect, Qt.AlignLeft | Qt.AlignVCenter, line)
+            if self.separators and i < len(lines) - 1:
+                painter.setPen(self._separator_color)
+                painter.drawLine(line_rect.left(), line_rect.bottom(), line_rect.right(), line_rect.bottom())
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        text = index.data(Qt.DisplayRole) or ""
+        lines = text.split("\n")
+        font = index.data(Qt.FontRole) or option.font
+        metrics = QFontMetrics(font)
+        width = max(metrics.horizontalAdvance(line) for line in lines) + 8
+        return QSize(width, max(self.MIN_HEIGHT, len(lines) * self.LINE_HEIGHT))
@@ -0,0 +1,147 @@
+import os
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PySide6.QtWidgets import QLabel
+from PySide6.QtGui import QFont
+from PySide6.QtCore import QObject, Signal
+from printing.render_jobs import render_job
+from printing.pdf_cache import pdf_cache, content_key
+
+MAX_RENDER_PROCESSES = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+class PdfRenderService(QObject):
+    """
+    Generowanie PDF w puli procesów, żeby okno nie zamierało przy dużych
+    zamówieniach i wydrukach zbiorczych. Zadania dostają zwykłe dane
+    (printing.render_jobs.order_to_plain). Postęp i wyniki wracają sygnałami Qt;
+    on_result(ścieżka) / on_error(wyjątek) są wołane w wątku GUI.
+    Zadania jeszcze czekające w kolejce można anulować.
+    Niezmienione zamówienie nie jest generowane ponownie - PDF jest kopiowany
+    z printing.pdf_cache.
+    """
+    progress = Signal(int, int)              # zakończone, wszystkie (w bieżącej serii)
+    job_finished = Signal(int, str)          # id zadania, ścieżka PDF
+    job_failed = Signal(int, object)         # id zadania, wyjątek
+    job_cancelled = Signal(int)
+    _future_done = Signal(int, object)       # z wątku puli -> wątek GUI
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._executor = None
+        self._futures = {}
+        self._callbacks = {}
+        self._cache_keys = {}
+        self._next_id = 0
+        self._total = 0
+        self._done = 0
+        self._future_done.connect(self._on_future_done)
+
+    def _get_executor(self):
+        # Pula startuje dopiero przy pierwszym wydruku; "spawn" działa tak samo na każdym systemie
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=MAX_RENDER_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def submit(self, kind, payload, output_path, on_result=None, on_error=None):
+        """Zleca zadanie printing.render_jobs.RENDERERS[kind]. Zwraca id zadania."""
+        self._next_id += 1
+        job_id = self._next_id
+        cache_prefix = "batch" if isinstance(payload, list) else f"{payload['order']['id']}_{kind}"
+        cache_key = content_key(kind, payload)
+        cached = pdf_cache.get(cache_prefix, cache_key)
+        if cached is not None:
+            try:
+                shutil.copyfile(cached, output_path)
+            except OSError:
+                pass
+            else:
+                self.job_finished.emit(job_id, output_path)
+                if on_result:
+                    on_result(output_path)
+                return job_id
+        future = self._get_executor().submit(render_job, kind, payload, output_path)
+        self._futures[job_id] = future
+        self._callbacks[job_id] = (on_result, on_error)
+        self._cache_keys[job_id] = (cache_prefix, cache_key)
+        self._total += 1
+        self.progress.emit(self._done, self._total)
+        future.add_done_callback(lambda f, job_id=job_id: self._future_done.emit(job_id, f))
+        return job_id
+
+    def cancel(self, job_id):
+        """Anuluje zadanie, które jeszcze nie wystartowało. Zwraca True, jeśli się udało."""
+        future = self._futures.get(job_id)
+        return future is not None and future.cancel()
+
+    def cancel_pending(self):
+        for job_id in list(self._futures):
+            self.cancel(job_id)
+
+    def pending_count(self):
+        return len(self._futures)
+
+    def _on_future_done(self, job_id, future):
+        self._futures.pop(job_id, None)
+        on_result, on_error = self._callbacks.pop(job_id, (None, None))
+        cache_prefix, cache_key = self._cache_keys.pop(job_id)
+        self._done += 1
+        if future.cancelled():
+            self.job_cancelled.emit(job_id)
+        else:
+            error = future.exception()
+            if error is not None:
+                self.job_failed.emit(job_id, error)
+                if on_error:
+                    on_error(error)
+            else:
+                path = future.result()
+                try:
+                    pdf_cache.put(cache_prefix, cache_key, path)
+                except OSError:
+                    # Pamięć podręczna jest opcjonalna - PDF i tak jest gotowy
+                    pass
+                self.job_finished.emit(job_id, path)
+                if on_result:
+                    on_result(path)
+        self.progress.emit(self._done, self._total)
+        if not self._futures:
+            self._done = self._total = 0
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+_render_service = None
+
+def get_render_service():
+    """Wspólna instancja PdfRenderService (tworzona przy pierwszym użyciu, w wątku GUI)."""
+    global _render_service
+    if _render_service is None:
+        _render_service = PdfRenderService()
+    return _render_service
+
+class RenderProgressLabel(QLabel):
+    """Postęp generowania PDF w pasku bocznym; klik anuluje zadania czekające w kolejce."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFont(QFont("Segoe UI", 9))
+        self.setStyleSheet("color: #d35400;")
+        self.setToolTip("Kliknij, aby anulować wydruki czekające w kolejce")
+        self.hide()
+        get_render_service().progress.connect(self._show)
+
+    def _show(self, done, total):
+        if total and done < total:
+            self.setText(f"● Generowanie PDF: {done}/{total}")
+            self.show()
+        else:
+            self.hide()
+
+    def mousePressEvent(self, event):
+        get_render_service().cancel_pending()
+        super().mousePressEvent(event)
\ No newline at end of file
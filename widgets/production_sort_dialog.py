@@ -1,34 +1,238 @@
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QHBoxLayout, QLabel, QHeaderView
+    QDialog, QVBoxLayout, QTableView, QTableWidget, QTableWidgetItem, QPushButton, QHBoxLayout,
+    QLabel, QHeaderView, QDateEdit, QCheckBox, QFileDialog, QMessageBox
 )
 from PySide6.QtGui import QFont, QColor, QBrush
-from PySide6.QtCore import Qt
-from widgets.production_sorter import get_weekly_production_summary
+from PySide6.QtCore import Qt, QDate, QAbstractTableModel, QModelIndex
+from widgets.production_sorter import (
+    PIVOT_DIMENSIONS, DIMENSION_LABELS, WEEKLY_DIMENSIONS, QUANTITY_LABEL,
+    get_production_pivot, format_pivot_value, write_pivot_csv
+)
+from widgets.data_loader import get_data_loader
+
+BUTTON_STYLE = """
+    QPushButton {
+        font-size: 14px;
+        font-weight: bold;
+        min-height: 36px;
+        border-radius: 7px;
+        border: 2px solid #197a3d;
+        background: #eaffea;
+        color: #197a3d;
+        padding: 8px 30px;
+        margin: 0 8px;
+    }
+    QPushButton:hover { background: #c5ffd7; }
+"""
+
+NUMERIC_DIMENSIONS = {"width", "height", "roll_length"}
+
+class ProductionPivotModel(QAbstractTableModel):
+    """
+    Wynik zestawienia pobierany stronami w tle (jak OrdersTableModel) - przy
+    wieloletnim zakresie w pamięci są tylko obejrzane wiersze.
+    """
+    PAGE_SIZE = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._dimensions = list(WEEKLY_DIMENSIONS)
+        self._start_date = None
+        self._end_date = None
+        self._rows = []
+        self._has_more = False
+        self._fetching = False
+        self._font = QFont("Segoe UI", 12)
+        self._font_bold = QFont("Segoe UI", 12, QFont.Bold)
+        self._quantity_brush = QBrush(QColor("#197a3d"))
+        self.on_page_loaded = None
+        self.on_error = None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._dimensions) + 1
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            if section < len(self._dimensions):
+                return DIMENSION_LABELS[self._dimensions[section]]
+            return QUANTITY_LABEL
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        is_quantity = column == len(self._dimensions)
+        if role == Qt.DisplayRole:
+            value = self._rows[row][column]
+            return f"{value:.2f}" if is_quantity else format_pivot_value(value)
+        if role == Qt.FontRole:
+            return self._font_bold if is_quantity else self._font
+        if role == Qt.ForegroundRole and is_quantity:
+            return self._quantity_brush
+        if role == Qt.TextAlignmentRole:
+            if is_quantity or self._dimensions[column] in NUMERIC_DIMENSIONS:
+                return int(Qt.AlignRight | Qt.AlignVCenter)
+            if self._dimensions[column] in ("day", "week"):
+                return int(Qt.AlignCenter)
+            return int(Qt.AlignLeft | Qt.AlignVCenter)
+        return None
+
+    def dimensions(self):
+        return list(self._dimensions)
+
+    def date_range(self):
+        return self._start_date, self._end_date
+
+    def set_query(self, dimensions, start_date, end_date):
+        self.beginResetModel()
+        self._dimensions = list(dimensions)
+        self._start_date = start_date
+        self._end_date = end_date
+        self._rows = []
+        self._has_more = True
+        self._fetching = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._has_more and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._has_more or self._fetching:
+            return
+        self._fetching = True
+        dimensions, start_date, end_date = list(self._dimensions), self._start_date, self._end_date
+        offset = len(self._rows)
+        get_data_loader().submit(
+            "production_pivot",
+            lambda session: get_production_pivot(
+                session, dimensions, start_date, end_date, limit=self.PAGE_SIZE, offset=offset
+            ),
+            on_result=self._append_page,
+            on_error=self._page_failed,
+        )
+
+    def _page_failed(self, error):
+        self._fetching = False
+        self._has_more = False
+        if self.on_error:
+            self.on_error(error)
+
+    def _append_page(self, rows):
+        self._fetching = False
+        self._has_more = len(rows) == self.PAGE_SIZE
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+        if self.on_page_loaded:
+            self.on_page_loaded(len(self._rows), self._has_more)
+
+class MaterialConsumptionDialog(QDialog):
+    """Zużycie materiału (m², mb) dla zakresu z zestawienia produkcji."""
+
+    def __init__(self, rows, period, title, parent=None):
+        from models.material_consumption import PERIOD_LABELS, CONSUMPTION_COLUMNS
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.resize(900, 600)
+        layout = QVBoxLayout(self)
+        table = QTableWidget(len(rows), 2 + len(CONSUMPTION_COLUMNS))
+        table.setHorizontalHeaderLabels([PERIOD_LABELS[period], "Materiał"] + CONSUMPTION_COLUMNS)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.setAlternatingRowColors(True)
+        table.verticalHeader().hide()
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        for row, (period_key, material, labels, *values) in enumerate(rows):
+            cells = [period_key, material, f"{labels:,.0f}".replace(",", " ")]
+            cells += [f"{value:,.2f}".replace(",", " ").replace(".", ",") for value in values]
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if column >= 2:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(row, column, item)
+        layout.addWidget(table)
+        btn_close = QPushButton("Zamknij")
+        btn_close.setStyleSheet(BUTTON_STYLE)
+        btn_close.clicked.connect(self.accept)
+        layout.addWidget(btn_close, alignment=Qt.AlignRight)
 
 class ProductionSortDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Zestawienie produkcji")
-        self.resize(950, 700)
+        self.resize(1050, 750)
         self.layout = QVBoxLayout(self)
 
         # Tytuł dialogu
-        title = QLabel("Zestawienie produkcji (grupowanie: tydzień, materiał, rozmiar)")
+        title = QLabel("Zestawienie produkcji")
         title.setFont(QFont("Segoe UI", 15, QFont.Bold))
         title.setStyleSheet("color: #197a3d; margin-bottom: 16px;")
         title.setAlignment(Qt.AlignCenter)
         self.layout.addWidget(title)
 
+        # Zakres dat dostawy
+        range_layout = QHBoxLayout()
+        self.all_dates_check = QCheckBox("Wszystkie daty")
+        self.all_dates_check.setChecked(True)
+        range_layout.addWidget(self.all_dates_check)
+        range_layout.addSpacing(16)
+        range_layout.addWidget(QLabel("Dostawa od:"))
+        today = QDate.currentDate()
+        self.date_from_edit = QDateEdit(QDate(today.year(), 1, 1))
+        self.date_from_edit.setCalendarPopup(True)
+        range_layout.addWidget(self.date_from_edit)
+        range_layout.addWidget(QLabel("do:"))
+        self.date_to_edit = QDateEdit(today)
+        self.date_to_edit.setCalendarPopup(True)
+        range_layout.addWidget(self.date_to_edit)
+        range_layout.addStretch()
+        self.layout.addLayout(range_layout)
+        self.all_dates_check.toggled.connect(self._update_date_edits)
+        self._update_date_edits(self.all_dates_check.isChecked())
+
+        # Wymiary grupowania
+        dims_layout = QHBoxLayout()
+        dims_layout.addWidget(QLabel("Grupuj po:"))
+        self.dimension_checks = {}
+        for key, label in PIVOT_DIMENSIONS:
+            check = QCheckBox(label)
+            check.setChecked(key in WEEKLY_DIMENSIONS)
+            self.dimension_checks[key] = check
+            dims_layout.addWidget(check)
+        dims_layout.addStretch()
+        self.layout.addLayout(dims_layout)
+
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setStyleSheet("color: #888;")
+        self.layout.addWidget(self.status_label)
+
         # Tabela
-        self.table = QTableWidget()
+        self.model = ProductionPivotModel(self)
+        self.model.on_page_loaded = self._page_loaded
+        self.model.on_error = lambda error: self.status_label.setText(f"Błąd pobierania danych: {error}")
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setAlternatingRowColors(True)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #b3b3b3;
                 font-size: 15px;
                 background: #fcfcfc;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: #eaffea;
                 color: #0e5f22;
             }
@@ -41,79 +245,114 @@ class ProductionSortDialog(QDialog):
                 padding: 8px;
             }
         """)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
+        self.table.horizontalHeader().setFont(QFont("Segoe UI", 13, QFont.Bold))
+        self.table.horizontalHeader().setDefaultAlignment(Qt.AlignCenter)
+        self.table.horizontalHeader().setHighlightSections(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().hide()
+        self.table.setShowGrid(True)
         self.layout.addWidget(self.table)
 
-        # Przycisk zamykania
+        # Przyciski
         btn_layout = QHBoxLayout()
+        self.btn_show = QPushButton("Pokaż")
+        self.btn_show.setStyleSheet(BUTTON_STYLE)
+        self.btn_show.clicked.connect(self.populate_table)
+        btn_layout.addWidget(self.btn_show)
+        self.btn_export = QPushButton("Eksport CSV")
+        self.btn_export.setStyleSheet(BUTTON_STYLE)
+        self.btn_export.clicked.connect(self.export_csv)
+        btn_layout.addWidget(self.btn_export)
+        self.btn_consumption = QPushButton("Zużycie materiału")
+        self.btn_consumption.setStyleSheet(BUTTON_STYLE)
+        self.btn_consumption.clicked.connect(self.show_consumption)
+        btn_layout.addWidget(self.btn_consumption)
         btn_layout.addStretch()
         self.btn_close = QPushButton("Zamknij")
         self.btn_close.setMinimumWidth(130)
-        self.btn_close.setStyleSheet("""
-            QPushButton {
-                font-size: 14px;
-                font-weight: bold;
-                min-height: 36px;
-                border-radius: 7px;
-                border: 2px solid #197a3d;
-                background: #eaffea;
-                color: #197a3d;
-                padding: 8px 30px;
-                margin: 0 8px;
-            }
-            QPushButton:hover { background: #c5ffd7; }
-        """)
+        self.btn_close.setStyleSheet(BUTTON_STYLE)
         self.btn_close.clicked.connect(self.accept)
         btn_layout.addWidget(self.btn_close)
         self.layout.addLayout(btn_layout)
 
+        self.finished.connect(self._cancel_jobs)
         self.populate_table()
 
-    def populate_table(self):
-        summary = get_weekly_production_summary()
-        self.table.setRowCount(len(summary))
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels([
-            "Tydzień", "Materiał", "Szerokość [mm]", "Wysokość [mm]", "Ilość [tyś.]"
-        ])
-
-        font_bold = QFont("Segoe UI", 13, QFont.Bold)
-        self.table.horizontalHeader().setFont(font_bold)
-        self.table.horizontalHeader().setDefaultAlignment(Qt.AlignCenter)
-        self.table.horizontalHeader().setHighlightSections(False)
+    def _cancel_jobs(self, *args):
+        loader = get_data_loader()
+        loader.cancel("production_pivot")
+        loader.cancel("production_pivot_csv")
+        loader.cancel("material_consumption")
 
-        for row, ((week, material, width, height), qty) in enumerate(summary):
-            week_item = QTableWidgetItem(str(week))
-            week_item.setTextAlignment(Qt.AlignCenter)
-            week_item.setFont(QFont("Segoe UI", 12))
+    def _update_date_edits(self, all_dates):
+        self.date_from_edit.setEnabled(not all_dates)
+        self.date_to_edit.setEnabled(not all_dates)
 
-            material_item = QTableWidgetItem(str(material))
-            material_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            material_item.setFont(QFont("Segoe UI", 12))
+    def selected_dimensions(self):
+        return [key for key, label in PIVOT_DIMENSIONS if self.dimension_checks[key].isChecked()]
 
-            width_item = QTableWidgetItem(str(width))
-            width_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            width_item.setFont(QFont("Segoe UI", 12))
+    def selected_range(self):
+        if self.all_dates_check.isChecked():
+            return None, None
+        return self.date_from_edit.date().toPython(), self.date_to_edit.date().toPython()
 
-            height_item = QTableWidgetItem(str(height))
-            height_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            height_item.setFont(QFont("Segoe UI", 12))
+    def populate_table(self):
+        dimensions = self.selected_dimensions()
+        if not dimensions:
+            QMessageBox.information(self, "Zestawienie produkcji", "Wybierz co najmniej jeden wymiar grupowania.")
+            return
+        start_date, end_date = self.selected_range()
+        self.status_label.setText("Ładowanie…")
+        self.model.set_query(dimensions, start_date, end_date)
 
-            qty_item = QTableWidgetItem(f"{qty:.2f}")
-            qty_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            qty_item.setFont(QFont("Segoe UI", 12, QFont.Bold))
-            qty_item.setForeground(QBrush(QColor("#197a3d")))
+    def _page_loaded(self, count, has_more):
+        more = " (przewiń, aby wczytać kolejne)" if has_more else ""
+        self.status_label.setText(f"Wierszy: {count}{more}")
 
-            self.table.setItem(row, 0, week_item)
-            self.table.setItem(row, 1, material_item)
-            self.table.setItem(row, 2, width_item)
-            self.table.setItem(row, 3, height_item)
-            self.table.setItem(row, 4, qty_item)
+    def export_csv(self):
+        filename, _ = QFileDialog.getSaveFileName(self, "Eksport zestawienia", "zestawienie_produkcji.csv", "CSV (*.csv)")
+        if not filename:
+            return
+        # Eksport obejmuje całe zestawienie, nie tylko wczytane strony tabeli
+        dimensions = self.model.dimensions()
+        start_date, end_date = self.model.date_range()
+        self.status_label.setText("Eksport…")
+        get_data_loader().submit(
+            "production_pivot_csv",
+            lambda session: get_production_pivot(session, dimensions, start_date, end_date),
+            on_result=lambda rows: self._write_csv(filename, dimensions, rows),
+            on_error=lambda error: self.status_label.setText(f"Błąd eksportu: {error}"),
+        )
 
-        # Styl nagłówków i kolumn
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
-        self.table.verticalHeader().hide()
-        self.table.setShowGrid(True)
\ No newline at end of file
+    def _write_csv(self, filename, dimensions, rows):
+        try:
+            write_pivot_csv(filename, dimensions, rows)
+        except OSError as e:
+            QMessageBox.critical(self, "Błąd eksportu", str(e))
+            return
+        self.status_label.setText(f"Zapisano {len(rows)} wierszy do {filename}")
+
+    def show_consumption(self):
+        # NumPy ładujemy dopiero tutaj - bez niego reszta programu działa normalnie
+        try:
+            from models.material_consumption import material_consumption
+        except ImportError as e:
+            QMessageBox.warning(self, "Zużycie materiału", f"Liczenie zużycia wymaga pakietu numpy:\n{e}")
+            return
+        # Podział po dniach, jeśli zaznaczony jest wymiar "Dzień dostawy", inaczej po tygodniach
+        period = "day" if self.dimension_checks["day"].isChecked() else "week"
+        start_date, end_date = self.selected_range()
+        self.status_label.setText("Liczenie zużycia materiału…")
+        get_data_loader().submit(
+            "material_consumption",
+            lambda session: material_consumption(session, start_date, end_date, period),
+            on_result=lambda rows: self._show_consumption(rows, period),
+            on_error=lambda error: self.status_label.setText(f"Błąd liczenia zużycia: {error}"),
+        )
+
+    def _show_consumption(self, rows, period):
+        self.status_label.setText("")
+        MaterialConsumptionDialog(rows, period, "Zużycie materiału", self).exec()
\ No newline at end of file
@@ -1,53 +1,126 @@
-from collections import defaultdict
+import csv
+from sqlalchemy import func, extract, Integer
 from models.order import Order
 from models.orderitem import OrderItem
+from models.client import Client
+from models.production_summary import ProductionSummary, quantity_in_thousands
 from models.db import Session
+from utils.numbers import format_decimal
 
-def get_weekly_production_summary(start_date=None, end_date=None):
-    session = Session()
-    query = session.query(Order, OrderItem).join(OrderItem, Order.id == OrderItem.order_id)
-    if start_date:
-        query = query.filter(Order.delivery_date >= start_date)
-    if end_date:
-        query = query.filter(Order.delivery_date <= end_date)
-
-    summary = defaultdict(float)
-    for order, item in query.all():
-        # UWAGA: Tylko pozycje z wypełnioną szerokością!
-        width = item.width
-        if width is None or str(width).strip() == "":
-            continue   # pomiń pozycje bez szerokości
-
-        week = order.delivery_date.isocalendar()[1]
-        material = item.material
-        height = item.height
-
-        qty = 0.0
-        try:
-            if item.quantity_type and item.quantity_type.lower().startswith('ty'):
-                # typ tyś – liczymy 1:1
-                qty = float(item.ordered_quantity)
-            elif item.quantity_type and item.quantity_type.lower().startswith('rol'):
-                # typ rolki – przeliczamy ilość rolek * nawój / 1000
-                rolls = float(item.ordered_quantity)
-                roll_length = float(item.roll_length)
-                qty = rolls * roll_length / 1000.0
-            else:
-                # fallback - liczymy 1:1
-                qty = float(item.ordered_quantity)
-        except Exception:
-            qty = 0.0
-
-        key = (week, material, width, height)
-        summary[key] += qty
-
-    session.close()
-
-    def safe_float(val):
-        try:
-            return float(val)
-        except (ValueError, TypeError):
-            return 0.0
-
-    result = sorted(summary.items(), key=lambda x: (x[0][0], x[0][1], safe_float(x[0][2]), safe_float(x[0][3])))
-    return result
\ No newline at end of file
+# Wymiary zestawienia: klucz -> nagłówek kolumny
+PIVOT_DIMENSIONS = [
+    ("day", "Dzień dostawy"),
+    ("week", "Tydzień"),
+    ("material", "Materiał"),
+    ("width", "Szerokość [mm]"),
+    ("height", "Wysokość [mm]"),
+    ("core", "Rdzeń"),
+    ("roll_length", "Nawój"),
+    ("client", "Klient"),
+]
+DIMENSION_LABELS = dict(PIVOT_DIMENSIONS)
+WEEKLY_DIMENSIONS = ["week", "material", "width", "height"]
+# Te wymiary są w tabeli production_summary - bez zakresu dat liczymy z niej
+SUMMARY_TABLE_DIMENSIONS = {"week", "material", "width", "height"}
+QUANTITY_LABEL = "Ilość [tyś.]"
+
+def format_week(iso_year, iso_week):
+    return f"{int(iso_year)}-T{int(iso_week):02d}"
+
+def _live_columns(dimension):
+    if dimension == "day":
+        return [Order.delivery_date]
+    if dimension == "week":
+        return [
+            extract("isoyear", Order.delivery_date).cast(Integer),
+            extract("week", Order.delivery_date).cast(Integer),
+        ]
+    if dimension == "client":
+        return [func.coalesce(func.nullif(Client.short_name, ""), Client.name)]
+    return [getattr(OrderItem, dimension)]
+
+def _summary_columns(dimension):
+    if dimension == "week":
+        return [ProductionSummary.iso_year, ProductionSummary.iso_week]
+    return [getattr(ProductionSummary, dimension)]
+
+def _dimension_value(dimension, values):
+    if dimension == "week":
+        return format_week(*values) if values[0] is not None else None
+    return values[0]
+
+def get_production_pivot(session, dimensions, start_date=None, end_date=None, limit=None, offset=0):
+    """
+    Zestawienie produkcji pogrupowane po wybranych wymiarach (klucze PIVOT_DIMENSIONS),
+    liczone w bazie. Zwraca wiersze (wartość wymiaru 1, ..., wartość wymiaru n, ilość [tyś.])
+    posortowane po wymiarach; limit / offset pozwalają pobierać wynik stronami.
+    Liczone są tylko pozycje z wypełnioną szerokością.
+    """
+    dimensions = list(dimensions)
+    from_summary = start_date is None and end_date is None and set(dimensions) <= SUMMARY_TABLE_DIMENSIONS
+    columns_for = _summary_columns if from_summary else _live_columns
+    groups = [columns_for(dimension) for dimension in dimensions]
+    columns = [column for group in groups for column in group]
+    if from_summary:
+        query = session.query(*columns, func.sum(ProductionSummary.quantity))
+    else:
+        query = (
+            session.query(*columns, func.sum(quantity_in_thousands()))
+            .select_from(Order)
+            .join(OrderItem, Order.id == OrderItem.order_id)
+            .filter(OrderItem.width.isnot(None), Order.delivery_date.isnot(None))
+        )
+        if "client" in dimensions:
+            query = query.outerjoin(Client, Client.id == Order.client_id)
+        if start_date:
+            query = query.filter(Order.delivery_date >= start_date)
+        if end_date:
+            query = query.filter(Order.delivery_date <= end_date)
+    if columns:
+        query = query.group_by(*columns).order_by(*columns)
+    if limit is not None:
+        query = query.limit(limit).offset(offset)
+
+    result = []
+    for row in query.all():
+        values = []
+        position = 0
+        for dimension, group in zip(dimensions, groups):
+            values.append(_dimension_value(dimension, row[position:position + len(group)]))
+            position += len(group)
+        values.append(float(row[-1] or 0))
+        result.append(tuple(values))
+    return result
+
+def get_weekly_production_summary(start_date=None, end_date=None, session=None):
+    """
+    Zestawienie produkcji: suma ilości [tyś.] dla tygodnia dostawy (ISO), materiału i rozmiaru.
+    Zwraca listę [((tydzień, materiał, szerokość, wysokość), ilość)] posortowaną chronologicznie;
+    tydzień ma postać "2025-T07". Bez zakresu dat wynik pochodzi z tabeli production_summary.
+    """
+    own_session = session is None
+    if own_session:
+        session = Session()
+    try:
+        rows = get_production_pivot(session, WEEKLY_DIMENSIONS, start_date, end_date)
+    finally:
+        if own_session:
+            session.close()
+    return [(row[:4], row[4]) for row in rows]
+
+def format_pivot_value(value):
+    if value is None:
+        return ""
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d")
+    return format_decimal(value)
+
+def write_pivot_csv(filename, dimensions, rows):
+    """Zapis zestawienia do CSV (średnik i przecinek dziesiętny - otwiera się wprost w Excelu)."""
+    with open(filename, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow([DIMENSION_LABELS[dimension] for dimension in dimensions] + [QUANTITY_LABEL])
+        for row in rows:
+            writer.writerow(
+                [format_pivot_value(value) for value in row[:-1]] + [f"{row[-1]:.2f}".replace(".", ",")]
+            )
\ No newline at end of file
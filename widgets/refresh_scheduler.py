@@ -0,0 +1,71 @@
+import time
+from PySide6.QtCore import QObject, QTimer, Signal
+from models.order_snapshot import get_change_token
+from widgets.data_loader import get_data_loader
+
+class RefreshScheduler(QObject):
+    """
+    Zbiera prośby o odświeżenie (aktywacja okna, zapis, przeciągnięcie, "zrobione")
+    i wykonuje co najwyżej jedno odświeżenie na serię próśb (debounce).
+    Przed odświeżeniem sprawdza tani znacznik zmian w bazie - jeśli nic się
+    nie zmieniło od ostatniego razu, odświeżenie jest pomijane.
+    """
+    refreshed = Signal(object)   # zbiór powodów, dla których wykonano odświeżenie
+
+    def __init__(self, refresh_callback, name, debounce_ms=250, max_delay_ms=1000, parent=None):
+        super().__init__(parent)
+        self.refresh_callback = refresh_callback
+        self.name = name
+        self.debounce_ms = debounce_ms
+        self.max_delay_ms = max_delay_ms
+        self.stats = {"requested": 0, "executed": 0, "skipped": 0}
+        self._reasons = set()
+        self._force = False
+        self._pending_reasons = set()
+        self._pending_force = False
+        self._first_request_at = None
+        self._last_token = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._flush)
+
+    def request(self, reason="", force=False):
+        """
+        Zgłasza potrzebę odświeżenia. force=True pomija sprawdzanie znacznika zmian
+        (np. gdy zmienił się stan, którego znacznik nie obejmuje).
+        """
+        self.stats["requested"] += 1
+        self._reasons.add(reason)
+        self._force = self._force or force
+        now = time.monotonic()
+        if self._first_request_at is None:
+            self._first_request_at = now
+        # Przy ciągłym strumieniu próśb nie odkładamy odświeżenia w nieskończoność
+        waited_ms = (now - self._first_request_at) * 1000
+        self._timer.start(max(0, min(self.debounce_ms, self.max_delay_ms - int(waited_ms))))
+
+    def _flush(self):
+        # Jeśli poprzednie sprawdzenie jeszcze trwa, nowe je zastąpi - powody się sumują
+        self._pending_reasons |= self._reasons
+        self._pending_force = self._pending_force or self._force
+        self._reasons, self._force, self._first_request_at = set(), False, None
+        get_data_loader().submit(
+            (self.name, "change_token"),
+            get_change_token,
+            on_result=self._check_token,
+            on_error=lambda error: self._check_token(None),
+        )
+
+    def _check_token(self, token):
+        reasons, force = self._pending_reasons, self._pending_force
+        self._pending_reasons, self._pending_force = set(), False
+        if not force and token is not None and token == self._last_token:
+            self.stats["skipped"] += 1
+            return
+        self._execute(reasons, token)
+
+    def _execute(self, reasons, token):
+        self._last_token = token
+        self.stats["executed"] += 1
+        self.refresh_callback()
+        self.refreshed.emit(reasons)